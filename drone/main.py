@@ -1,37 +1,150 @@
 """
 Script principal para simulação do drone de entregas.
 """
+import argparse
 import yaml
 import numpy as np
 import time
 import os
 from pathlib import Path
 
-from src.drone_simulator import DroneSimulator
 from src.pid_controller import DroneController
 from src.sensor import ProximitySensor
 from src.route_planner import RoutePlanner
+from src.planning_service import PlanningService
+from src.fleet_planner import FleetPlanner
+from src.mission_state import MissionState
+from src.replan_trigger import ReplanTrigger
+from src.patrol_planner import PatrolPlanner
+from src.trajectory import TrajectoryTracker
 from src.logger import SimulationLogger
+from src.phase_timer import PhaseTimer
 
 
 def load_config(config_path: str = "config/config.yaml") -> dict:
-    """Carrega configurações do arquivo YAML."""
+    """Carrega configurações do arquivo YAML (e o perfil PID de control.pid_profile, se houver)."""
     with open(config_path, 'r') as f:
         config = yaml.safe_load(f)
+
+    profile_path = config['control'].get('pid_profile')
+    if profile_path:
+        with open(profile_path, 'r') as f:
+            profile = yaml.safe_load(f)
+        # Ganhos do perfil substituem os de control.pid (laço a laço)
+        for loop, gains in profile['control']['pid'].items():
+            config['control']['pid'][loop].update(gains)
     return config
 
 
-def main():
+def create_simulator(config: dict):
+    """
+    Cria o simulador do backend escolhido em simulation.backend.
+    
+    O PyBullet só é importado quando usado: o backend 'numpy' roda sem ele.
+    """
+    backend = config['simulation'].get('backend', 'pybullet')
+    if backend == 'pybullet':
+        from src.drone_simulator import DroneSimulator
+        return DroneSimulator(config)
+    if backend == 'numpy':
+        from src.point_mass_simulator import PointMassSimulator
+        return PointMassSimulator(config)
+    raise ValueError(f"Backend de simulação desconhecido: {backend}")
+
+
+def create_patrol_planner(config: dict, bounds: list, start_pos: np.ndarray) -> PatrolPlanner:
+    """Cria a varredura de patrulha de uma região [x_min, x_max, y_min, y_max]."""
+    patrol_config = config.get('patrol', {})
+    return PatrolPlanner(
+        bounds,
+        config['sensor']['detection_radius'],
+        altitude=config['simulation']['base_position'][2],
+        pattern=patrol_config.get('pattern', 'lawnmower'),
+        overlap=patrol_config.get('overlap', 0.1),
+        start_pos=start_pos,
+        waypoint_tolerance=patrol_config.get('waypoint_tolerance', 2.0)
+    )
+
+
+def create_trajectory_tracker(config: dict):
+    """Cria o rastreador de trajetória (None se trajectory.enabled for falso)."""
+    trajectory_config = config.get('trajectory', {})
+    if not trajectory_config.get('enabled', False):
+        return None
+    return TrajectoryTracker(
+        trajectory_config,
+        config['drone']['max_velocity'],
+        config['drone']['max_acceleration'],
+        config['simulation']['base_position'][2]
+    )
+
+
+def create_phase_timer(config: dict, simulator) -> PhaseTimer:
+    """Cria o cronômetro de fases do loop (sem efeito se logging.profile_phases for falso)."""
+    return PhaseTimer(
+        enabled=config['logging'].get('profile_phases', False),
+        budget=simulator.timestep
+    )
+
+
+def report_phase_timings(timer: PhaseTimer, logger: SimulationLogger, final: bool = False):
+    """Envia a latência por fase ao logger (janela desde o último relatório, ou o total no fim)."""
+    timings = timer.summary(window=not final)
+    if timings:
+        logger.log_phase_timings(timings, timer.format_report(timings), final=final)
+
+
+def print_phase_timings(timer: PhaseTimer):
+    """Exibe a tabela de latência por fase acumulada (se a medição estiver ativa)."""
+    timings = timer.summary() if timer.enabled else {}
+    if timings:
+        print("LATÊNCIA POR FASE")
+        print(timer.format_report(timings))
+        print("=" * 60)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Lê os argumentos de linha de comando."""
+    parser = argparse.ArgumentParser(description='Simulação do drone de entregas')
+    parser.add_argument('--headless', action='store_true',
+                        help='Sem janela nem desenhos; física o mais rápido possível')
+    parser.add_argument('--backend', choices=('pybullet', 'numpy'), default=None,
+                        help='Backend de simulação (padrão: simulation.backend)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Medir a latência de cada fase do loop (logging.profile_phases)')
+    return parser.parse_args(argv)
+
+
+def print_real_time_factor(sim_time: float, wall_time: float):
+    """Exibe o tempo simulado e quantas vezes mais rápido que o tempo real ele rodou."""
+    factor = sim_time / wall_time if wall_time > 0 else float('inf')
+    print(f"Tempo simulado: {sim_time:.2f}s | Fator de tempo real: {factor:.1f}x")
+
+
+def main(argv=None):
     """Função principal da simulação."""
+    args = parse_args(argv)
     # Carregar configurações
     config = load_config()
+    if args.headless:
+        config['simulation']['headless'] = True
+    if args.backend:
+        config['simulation']['backend'] = args.backend
+    if args.profile:
+        config['logging']['profile_phases'] = True
     
     # Criar diretório de logs se não existir
     log_dir = Path(config['logging'].get('file', 'logs/drone_simulation.log')).parent
     log_dir.mkdir(parents=True, exist_ok=True)
     
+    # Modo frota: vários drones no mesmo mundo
+    if config.get('fleet', {}).get('num_drones', 1) > 1:
+        run_fleet(config)
+        return
+    
     # Inicializar componentes
-    simulator = DroneSimulator(config)
+    simulator = create_simulator(config)
+    headless = simulator.headless
     # Mesclar configurações de controle e drone
     control_config = config['control'].copy()
     control_config.update({
@@ -41,21 +154,46 @@ def main():
     controller = DroneController(control_config)
     sensor = ProximitySensor(config['sensor']['detection_radius'])
     route_planner = RoutePlanner(config['route_planning'])
+    # Planejamento em thread de fundo (não bloqueia o loop de física)
+    planning_service = (
+        PlanningService(route_planner)
+        if config['route_planning'].get('async_planning', False) else None
+    )
     # Mesclar configurações de logging e node_red para o logger
     logger_config = config['logging'].copy()
     logger_config['node_red'] = config.get('node_red', {})
-    logger = SimulationLogger(logger_config)
+    logger = SimulationLogger(logger_config, clock=lambda: simulator.sim_time)
+    
+    # Contadores e pontos pendentes atualizados por eventos (sem varrer listas a cada passo)
+    mission = MissionState(len(simulator.point_store))
+    
+    def on_mission_event(event, point):
+        if event == 'delivered':
+            simulator.update_point_visualization(point, delivered=True)
+    
+    mission.subscribe(on_mission_event)
+    
+    # Replanejamento disparado por detecções, entregas e desvios do trecho atual
+    replan_trigger = ReplanTrigger(config['route_planning'])
+    mission.subscribe(replan_trigger.on_mission_event)
+    
+    # Trajetória de jerk mínimo pelos próximos pontos da rota (feed-forward ao controlador)
+    trajectory = create_trajectory_tracker(config)
     
     # Estado da simulação
     base_position = np.array(config['simulation']['base_position'])
     current_route = []
     current_target = None
-    last_replan_time = time.time()
-    replan_interval = config['route_planning'].get('replan_interval', 1.0)
+    leg_start = None
+    submitted_reason = None
     
-    # Modo de patrulha: se não há pontos detectados, começar a patrulhar
-    patrol_mode = True
-    patrol_target = None
+    # Patrulha de cobertura da área enquanto não há pontos a entregar
+    area_size = config['environment'].get('area_size', [50, 50])
+    patrol_planner = create_patrol_planner(
+        config,
+        [-area_size[0] / 2.0, area_size[0] / 2.0, -area_size[1] / 2.0, area_size[1] / 2.0],
+        base_position
+    )
     
     # Variáveis de controle
     running = True
@@ -64,6 +202,11 @@ def main():
     sensor_update_rate = config['sensor'].get('update_rate', 10)
     sensor_update_interval = 1.0 / sensor_update_rate
     
+    # Latência por fase do loop (física, sensor, planejamento, controle, desenho, logging)
+    timer = create_phase_timer(config, simulator)
+    timing_interval = config['logging'].get('profile_interval', 10.0)
+    last_timing_report = 0.0
+    
     print("=" * 60)
     print("DRONE DE ENTREGAS - SIMULAÇÃO INICIADA")
     print("=" * 60)
@@ -72,28 +215,36 @@ def main():
     print(f"Algoritmo de rota: {config['route_planning']['algorithm']}")
     print("=" * 60)
     
+    wall_start = time.perf_counter()
     try:
         while running:
+            timer.start()
             # Atualizar estado do drone
             simulator.step_simulation()
             drone_pos = simulator.position
             drone_vel = simulator.velocity
             drone_attitude = simulator.get_euler_angles()
             
-            current_time = time.time()
+            # Relógio da simulação (sensor e replanejamento independem da velocidade de execução)
+            current_time = simulator.sim_time
             dt = simulator.timestep
+            timer.lap('physics')
             
             # Atualizar detecção de pontos (a uma taxa menor)
             if current_time - last_sensor_update >= sensor_update_interval:
-                all_points = simulator.get_all_delivery_points()
-                detected = sensor.detect_points(drone_pos, all_points)
+                detected = sensor.detect_points(drone_pos, simulator.point_store)
+                # Novos pontos ganham linha/coluna na matriz de distâncias do planejador
+                if planning_service is not None:
+                    planning_service.register_points(detected)
+                else:
+                    route_planner.register_points(detected)
                 
                 # Registrar novas detecções
                 for point in detected:
-                    if not hasattr(point, '_logged') or not point._logged:
+                    if mission.on_detected(point):
                         logger.log_detection(point, drone_pos)
-                        point._logged = True
                 
+                patrol_planner.mark_swept(drone_pos)
                 last_sensor_update = current_time
             
             # Verificar se chegou ao ponto atual
@@ -104,35 +255,72 @@ def main():
                     config['route_planning']['min_distance_threshold']
                 )):
                 logger.log_delivery(current_target, drone_pos)
-                simulator.update_point_visualization(current_target, delivered=True)
+                # Com planejamento assíncrono só a thread de fundo altera o planejador
+                if planning_service is not None:
+                    planning_service.mark_delivered(current_target)
+                else:
+                    route_planner.mark_delivered(current_target)
+                mission.on_delivered(current_target)
                 current_target = None
+            timer.lap('sensing')
             
-            # Replanejamento
-            undelivered_points = sensor.get_undelivered_points()
+            # Desvio grande do trecho em direção ao alvo atual também pede replanejamento
+            if current_target is not None and leg_start is not None:
+                replan_trigger.check_deviation(drone_pos, leg_start, current_target.position, current_time)
             
             # Replanejar se:
-            # 1. Não há rota atual
-            # 2. Rota atual está vazia (todos entregues)
-            # 3. Passou tempo suficiente desde último replanejamento
-            should_replan = (
-                not current_route or
-                all(p.delivered for p in current_route) or
-                (current_time - last_replan_time >= replan_interval and undelivered_points)
-            )
+            # 1. Não há rota atual ou todos os pontos dela foram entregues (imediato)
+            # 2. Houve detecção/entrega/desvio (após o debounce)
+            # 3. A rota está há mais de replan_max_staleness sem replanejamento
+            if mission.has_undelivered and (not current_route or mission.route_complete):
+                replan_reason = "route_complete"
+            else:
+                replan_reason = replan_trigger.poll(current_time, mission.has_undelivered)
             
-            if should_replan and undelivered_points:
-                # Replanejar rota
-                current_route = route_planner.plan_route(
-                    drone_pos,
-                    undelivered_points,
-                    base_position,
-                    return_to_base=True
-                )
-                
-                if current_route:
-                    logger.log_replan(current_route, reason="periodic_update")
-                    simulator.draw_route(current_route, drone_pos)
-                    last_replan_time = current_time
+            if replan_reason is not None:
+                undelivered_points = mission.undelivered_points()
+                if planning_service is not None:
+                    # Pedido assíncrono: segue voando a rota atual até a nova ficar pronta.
+                    # Eventos novos sempre geram um pedido (o serviço descarta os superados);
+                    # rota concluída só pede de novo se não houver pedido em andamento
+                    if replan_reason != "route_complete" or not planning_service.busy:
+                        planning_service.submit(
+                            drone_pos,
+                            current_route,
+                            undelivered_points,
+                            base_position
+                        )
+                        submitted_reason = replan_reason
+                        replan_trigger.mark_replanned(current_time)
+                else:
+                    # Replanejar rota (pontos já na rota não são duplicados)
+                    current_route = route_planner.replan_route(
+                        drone_pos,
+                        current_route,
+                        undelivered_points,
+                        base_position
+                    )
+                    logger.update_plan_cache_stats(route_planner.cache_hits, route_planner.cache_misses)
+                    
+                    mission.set_route(current_route)
+                    replan_trigger.mark_replanned(current_time)
+                    leg_start = drone_pos.copy()
+                    # Rota vinda do cache: nada mudou, não registrar nem redesenhar
+                    if current_route and not route_planner.last_plan_cached:
+                        logger.log_replan(current_route, reason=replan_reason)
+                        simulator.draw_route(current_route, drone_pos)
+            
+            # Trocar para a rota planejada em segundo plano, se já estiver pronta
+            if planning_service is not None:
+                planned_route = planning_service.poll()
+                logger.update_plan_cache_stats(route_planner.cache_hits, route_planner.cache_misses)
+                if planned_route:
+                    current_route = planned_route
+                    mission.set_route(current_route)
+                    leg_start = drone_pos.copy()
+                    if not planning_service.last_result_cached:
+                        logger.log_replan(current_route, reason=submitted_reason)
+                        simulator.draw_route(current_route, drone_pos)
             
             # Obter próximo alvo
             if current_target is None and current_route:
@@ -140,11 +328,22 @@ def main():
                 if current_target is None:
                     # Remover pontos entregues da rota
                     current_route = [p for p in current_route if not p.delivered]
+                    mission.set_route(current_route)
                     if current_route:
                         current_target = route_planner.get_next_target(drone_pos, current_route)
+                leg_start = drone_pos.copy()
+            timer.lap('planning')
             
             # Calcular controle
-            if current_target is not None:
+            target_vel = target_acc = None
+            if current_target is not None and trajectory is not None:
+                # Seguir a trajetória suave: a entrega é por proximidade horizontal,
+                # então o drone passa pelos pontos sem parar nem descer
+                target_pos, target_vel, target_acc = trajectory.reference(
+                    step_count * dt, drone_pos, drone_vel, current_target, current_route
+                )
+                controller.set_speed_multiplier(1.0)
+            elif current_target is not None:
                 # Ir ao ponto de entrega (velocidade normal)
                 # Primeiro ir horizontalmente, depois descer para entregar
                 horizontal_dist = np.linalg.norm(drone_pos[:2] - current_target.position[:2])
@@ -158,59 +357,45 @@ def main():
                         current_target.position[1], 
                         current_target.position[2] + 0.5
                     ])
-                patrol_mode = False
                 # Usar velocidade normal para entrega
                 controller.set_speed_multiplier(1.0)
-            elif undelivered_points:
+            elif mission.has_undelivered:
                 # Se há pontos detectados mas não entregues, ir ao mais próximo (velocidade normal)
-                nearest_point = min(undelivered_points, 
-                                  key=lambda p: np.linalg.norm(drone_pos[:2] - p.position[:2]))
-                target_pos = np.array([nearest_point.position[0], nearest_point.position[1], drone_pos[2]])
-                patrol_mode = False
-                # Usar velocidade normal para ir ao ponto detectado
-                controller.set_speed_multiplier(1.0)
-            elif patrol_mode:
-                # Modo patrulha: mover-se em padrão circular para detectar pontos
-                # Usar raio maior baseado no tamanho da área
-                import math
-                area_size = config['environment'].get('area_size', [50, 50])
-                max_radius = min(area_size) / 2.0  # Metade do menor lado da área
-                patrol_radius = min(max_radius, 20.0)  # Máximo de 20m
-                
-                if patrol_target is None or np.linalg.norm(drone_pos[:2] - patrol_target[:2]) < 2.0:
-                    # Criar novo alvo de patrulha (círculo ao redor da base)
-                    # Usar ângulo que aumenta mais devagar para patrulha mais eficiente
-                    angle_step = 0.2  # Graus por frame (reduzido para movimento mais lento)
-                    angle = (step_count * angle_step) % 360 * math.pi / 180.0
-                    patrol_target = np.array([
-                        base_position[0] + patrol_radius * math.cos(angle),
-                        base_position[1] + patrol_radius * math.sin(angle),
-                        drone_pos[2]  # Manter altura atual
-                    ])
-                target_pos = patrol_target
+                nearest_point = sensor.nearest_undelivered(drone_pos)
+                if nearest_point is not None:
+                    target_pos = np.array([nearest_point.position[0], nearest_point.position[1], drone_pos[2]])
+                    # Usar velocidade normal para ir ao ponto detectado
+                    controller.set_speed_multiplier(1.0)
+                else:
+                    # Sensor sem ponto pendente (fora de sincronia com a missão): seguir a patrulha
+                    target_pos = patrol_planner.next_waypoint(drone_pos)
+                    controller.set_speed_multiplier(0.5)
+            elif not mission.all_delivered:
+                # Modo patrulha: varredura da área, retomada de onde parou após as entregas
+                target_pos = patrol_planner.next_waypoint(drone_pos)
                 # Reduzir velocidade durante patrulha (50% da velocidade normal)
                 controller.set_speed_multiplier(0.5)
             else:
-                # Se não há alvo, retornar à base
+                # Todas as entregas feitas: retornar à base
                 target_pos = base_position
-                if np.linalg.norm(drone_pos[:2] - base_position[:2]) < 1.0:
-                    patrol_mode = True  # Reativar patrulha se estiver na base
-                    # Reduzir velocidade durante patrulha
-                    controller.set_speed_multiplier(0.5)
-                else:
-                    # Velocidade normal para retornar à base
-                    controller.set_speed_multiplier(1.0)
+                controller.set_speed_multiplier(1.0)
             
             force, torque = controller.compute_control(
                 drone_pos,
                 target_pos,
                 drone_vel,
                 drone_attitude,
-                dt
+                dt,
+                target_vel,
+                target_acc
             )
             
+            # Aplicar controle
+            simulator.apply_control(force, torque)
+            timer.lap('control')
+            
             # Debug: imprimir forças periodicamente
-            if step_count % 240 == 0:  # A cada segundo
+            if not headless and step_count % 240 == 0:  # A cada segundo
                 print(f"Drone pos: {drone_pos}, Target: {target_pos}")
                 print(f"Force: {force}, Torque: {torque}")
                 print(f"Velocity: {drone_vel}")
@@ -218,11 +403,9 @@ def main():
                 print(f"Force Z (thrust): {force[2]:.2f}N (should be ~9.81N for hover)")
                 print("---")
             
-            # Aplicar controle
-            simulator.apply_control(force, torque)
-            
             # Atualizar visualização
             simulator.draw_target_marker(target_pos if current_target is not None else None)
+            timer.lap('drawing')
             
             # Logging periódico
             if step_count % 100 == 0:  # A cada ~0.4s (100 steps * 1/240s)
@@ -231,21 +414,26 @@ def main():
                     drone_vel,
                     target_pos if current_target is not None else None,
                     current_route,
-                    sensor.get_all_detected()
+                    None,
+                    detected_count=mission.detected_count,
+                    delivered_count=mission.delivered_count
                 )
+            timer.lap('logging')
             
             # Verificar condição de término
-            all_delivered = all(p.delivered for p in simulator.get_all_delivery_points())
-            at_base = np.linalg.norm(drone_pos - base_position) < 1.0
-            
-            if all_delivered and at_base:
+            if mission.all_delivered and np.linalg.norm(drone_pos - base_position) < 1.0:
                 print("\n" + "=" * 60)
                 print("TODAS AS ENTREGAS CONCLUÍDAS!")
                 print("=" * 60)
-                time.sleep(2)
+                if not headless:
+                    time.sleep(2)
                 running = False
             
             step_count += 1
+            timer.stop()
+            if timer.enabled and timing_interval > 0 and current_time - last_timing_report >= timing_interval:
+                report_phase_timings(timer, logger)
+                last_timing_report = current_time
             
             # Limitar tempo de simulação (segurança)
             if step_count > 1000000:  # ~1 hora de simulação
@@ -257,6 +445,10 @@ def main():
     
     finally:
         # Finalizar
+        if planning_service is not None:
+            planning_service.shutdown()
+        if timer.enabled:
+            report_phase_timings(timer, logger, final=True)
         logger.close()
         simulator.close()
         
@@ -272,7 +464,248 @@ def main():
         print(f"Pontos entregues: {metrics['points_delivered']}")
         print(f"Tempo médio por entrega: {metrics['avg_delivery_time']:.2f}s")
         print(f"Eficiência: {metrics['efficiency']:.2%}")
+        print(f"Cache de rotas: {metrics['plan_cache_hits']} acertos / {metrics['plan_cache_misses']} falhas")
+        print_real_time_factor(simulator.sim_time, time.perf_counter() - wall_start)
+        print("=" * 60)
+        print_phase_timings(timer)
+
+
+def run_fleet(config: dict):
+    """
+    Simulação com vários drones (fleet.num_drones > 1).
+    
+    Os pontos detectados são agrupados entre os drones e cada drone voa a
+    sua própria sub-rota, voltando à sua posição inicial ao final.
+    """
+    simulator = create_simulator(config)
+    num_drones = simulator.num_drones
+    control_config = config['control'].copy()
+    control_config.update({
+        'max_velocity': config['drone']['max_velocity'],
+        'max_acceleration': config['drone']['max_acceleration']
+    })
+    controllers = [DroneController(control_config) for _ in range(num_drones)]
+    trajectories = [create_trajectory_tracker(config) for _ in range(num_drones)]
+    sensor = ProximitySensor(config['sensor']['detection_radius'])
+    fleet_planner = FleetPlanner(config['route_planning'], num_drones)
+    logger_config = config['logging'].copy()
+    logger_config['node_red'] = config.get('node_red', {})
+    logger = SimulationLogger(logger_config, clock=lambda: simulator.sim_time)
+    mission = MissionState(len(simulator.point_store))
+    
+    # Pontos não entregues da rota de cada drone, atualizados pelos eventos de
+    # entrega (o teste de drone ocioso não varre as rotas a cada passo)
+    route_owner = {}
+    route_pending = [0] * num_drones
+    
+    def on_mission_event(event, point):
+        if event == 'delivered':
+            simulator.update_point_visualization(point, delivered=True)
+            owner = route_owner.pop(point.id, None)
+            if owner is not None:
+                route_pending[owner] -= 1
+    
+    mission.subscribe(on_mission_event)
+    replan_trigger = ReplanTrigger(config['route_planning'])
+    mission.subscribe(replan_trigger.on_mission_event)
+    
+    # Estado da frota
+    home_positions = simulator.start_positions.copy()
+    routes = [[] for _ in range(num_drones)]
+    targets = [None] * num_drones
+    threshold = config['route_planning']['min_distance_threshold']
+    area_size = config['environment'].get('area_size', [50, 50])
+    # Cada drone varre uma faixa horizontal da área
+    band = area_size[1] / num_drones
+    patrol_planners = [
+        create_patrol_planner(
+            config,
+            [-area_size[0] / 2.0, area_size[0] / 2.0,
+             -area_size[1] / 2.0 + i * band, -area_size[1] / 2.0 + (i + 1) * band],
+            home_positions[i]
+        )
+        for i in range(num_drones)
+    ]
+    
+    running = True
+    step_count = 0
+    last_sensor_update = 0
+    sensor_update_interval = 1.0 / config['sensor'].get('update_rate', 10)
+    timer = create_phase_timer(config, simulator)
+    timing_interval = config['logging'].get('profile_interval', 10.0)
+    last_timing_report = 0.0
+    
+    print("=" * 60)
+    print("DRONES DE ENTREGAS (FROTA) - SIMULAÇÃO INICIADA")
+    print("=" * 60)
+    print(f"Drones: {num_drones}")
+    print(f"Pontos de entrega: {len(simulator.get_all_delivery_points())}")
+    print(f"Raio de detecção: {config['sensor']['detection_radius']}m")
+    print(f"Algoritmo de rota: {config['route_planning']['algorithm']}")
+    print("=" * 60)
+    
+    wall_start = time.perf_counter()
+    try:
+        while running:
+            timer.start()
+            simulator.step_simulation()
+            positions = simulator.positions
+            # Relógio da simulação (sensor e replanejamento independem da velocidade de execução)
+            current_time = simulator.sim_time
+            dt = simulator.timestep
+            timer.lap('physics')
+            
+            # Detecção (todos os drones alimentam o mesmo sensor)
+            if current_time - last_sensor_update >= sensor_update_interval:
+                for i in range(num_drones):
+                    for point in sensor.detect_points(positions[i], simulator.point_store):
+                        if mission.on_detected(point):
+                            logger.log_detection(point, positions[i])
+                    patrol_planners[i].mark_swept(positions[i])
+                last_sensor_update = current_time
+            
+            # Entregas
+            for i, target in enumerate(targets):
+                if target is None:
+                    continue
+                if target.delivered:
+                    # Entregue por outro drone
+                    targets[i] = None
+                elif sensor.check_delivery(positions[i], target, threshold):
+                    logger.log_delivery(target, positions[i], drone_index=i)
+                    fleet_planner.mark_delivered(target)
+                    mission.on_delivered(target)
+                    targets[i] = None
+            timer.lap('sensing')
+            
+            # Replanejar quando há novos pontos, entregas ou algum drone ficou sem rota
+            has_undelivered = mission.has_undelivered
+            pinned = {i: t for i, t in enumerate(targets) if t is not None}
+            idle = any(
+                targets[i] is None and route_pending[i] == 0
+                for i in range(num_drones)
+            )
+            if idle and len(mission.undelivered) > len(pinned):
+                # Há pontos livres que o drone ocioso poderia assumir
+                replan_trigger.notify('idle', current_time)
+            replan_reason = replan_trigger.poll(current_time, has_undelivered)
+            if replan_reason is not None:
+                routes = fleet_planner.plan(positions, mission.undelivered_points(), home_positions, pinned)
+                route_owner = {p.id: i for i, route in enumerate(routes) for p in route if not p.delivered}
+                route_pending[:] = [0] * num_drones
+                for owner in route_owner.values():
+                    route_pending[owner] += 1
+                for i, route in enumerate(routes):
+                    logger.log_replan(route, reason=replan_reason, drone_index=i)
+                    simulator.draw_route(route, positions[i], drone_index=i)
+                logger.update_fleet_replan_count(fleet_planner.replan_count)
+                replan_trigger.mark_replanned(current_time)
+            
+            all_delivered = mission.all_delivered
+            timer.lap('planning')
+            
+            # Controle de cada drone (as fases somam os trechos de todos os drones)
+            for i in range(num_drones):
+                drone_pos = positions[i]
+                if targets[i] is None:
+                    targets[i] = fleet_planner.planners[i].get_next_target(drone_pos, routes[i])
+                target = targets[i]
+                timer.lap('planning')
+                
+                target_vel = target_acc = None
+                if target is not None and trajectories[i] is not None:
+                    target_pos, target_vel, target_acc = trajectories[i].reference(
+                        step_count * dt, drone_pos, simulator.velocities[i], target, routes[i]
+                    )
+                    controllers[i].set_speed_multiplier(1.0)
+                elif target is not None:
+                    # Mesma aproximação do drone único: horizontal, depois descer
+                    if np.linalg.norm(drone_pos[:2] - target.position[:2]) > 1.0:
+                        target_pos = np.array([target.position[0], target.position[1], drone_pos[2]])
+                    else:
+                        target_pos = target.position + np.array([0.0, 0.0, 0.5])
+                    controllers[i].set_speed_multiplier(1.0)
+                elif all_delivered:
+                    # Nada a fazer: voltar para casa
+                    target_pos = home_positions[i]
+                    controllers[i].set_speed_multiplier(1.0)
+                else:
+                    # Patrulha da própria faixa (pontos pendentes estão com outros drones)
+                    target_pos = patrol_planners[i].next_waypoint(drone_pos)
+                    controllers[i].set_speed_multiplier(0.5)
+                
+                force, torque = controllers[i].compute_control(
+                    drone_pos,
+                    target_pos,
+                    simulator.velocities[i],
+                    simulator.get_euler_angles(i),
+                    dt,
+                    target_vel,
+                    target_acc
+                )
+                simulator.apply_control(force, torque, drone_index=i)
+                timer.lap('control')
+                simulator.draw_target_marker(target_pos if target is not None else None, drone_index=i)
+                timer.lap('drawing')
+                
+                if step_count % 100 == 0:
+                    logger.log_state(
+                        drone_pos,
+                        simulator.velocities[i],
+                        target_pos if target is not None else None,
+                        routes[i],
+                        None,
+                        drone_index=i,
+                        detected_count=mission.detected_count,
+                        delivered_count=mission.delivered_count
+                    )
+                timer.lap('logging')
+            
+            # Término: tudo entregue e todos os drones em casa
+            at_home = np.all(np.linalg.norm(positions - home_positions, axis=1) < 1.0)
+            if all_delivered and at_home:
+                print("\n" + "=" * 60)
+                print("TODAS AS ENTREGAS CONCLUÍDAS!")
+                print("=" * 60)
+                running = False
+            
+            step_count += 1
+            timer.stop()
+            if timer.enabled and timing_interval > 0 and current_time - last_timing_report >= timing_interval:
+                report_phase_timings(timer, logger)
+                last_timing_report = current_time
+            if step_count > 1000000:
+                print("Tempo máximo de simulação atingido")
+                running = False
+    
+    except KeyboardInterrupt:
+        print("\nSimulação interrompida pelo usuário")
+    
+    finally:
+        fleet_planner.shutdown()
+        if timer.enabled:
+            report_phase_timings(timer, logger, final=True)
+        logger.close()
+        simulator.close()
+        
+        metrics = logger.get_metrics_summary()
+        print("\n" + "=" * 60)
+        print("MÉTRICAS FINAIS (FROTA)")
+        print("=" * 60)
+        for index, drone in metrics['drones'].items():
+            print(f"Drone {index}: {drone['points_delivered']} entregas, "
+                  f"{drone['total_distance']:.2f}m, {drone['replan_count']} replanejamentos")
+        print("-" * 60)
+        print(f"Tempo total: {metrics['elapsed_time']:.2f}s")
+        print(f"Distância total: {metrics['total_distance']:.2f}m")
+        print(f"Replanejamentos: {metrics['replan_count']}")
+        print(f"Pontos detectados: {metrics['points_detected']}")
+        print(f"Pontos entregues: {metrics['points_delivered']}")
+        print(f"Tempo médio por entrega: {metrics['avg_delivery_time']:.2f}s")
+        print(f"Eficiência: {metrics['efficiency']:.2%}")
+        print_real_time_factor(simulator.sim_time, time.perf_counter() - wall_start)
         print("=" * 60)
+        print_phase_timings(timer)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,234 @@
+"""
+Benchmark do planejador de rotas (sem PyBullet).
+
+Gera instâncias reprodutíveis (uniforme, agrupada, grade), executa todos os
+algoritmos registrados no RoutePlanner e registra tempo, pico de memória e
+comprimento da rota relativo à melhor rota encontrada na instância.
+
+Uso (a partir do diretório drone/):
+    python scripts/benchmark_route_planner.py --sizes 10 100 1000 --output bench
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.exact_solver import HeldKarpSolver
+from src.route_planner import RoutePlanner
+from src.sensor import DeliveryPointStore
+
+DISTRIBUTIONS = ('uniform', 'clustered', 'grid')
+
+# Algoritmos que usam a matriz de distâncias O(n²); ignorados acima de --max-matrix-points
+MATRIX_ALGORITHMS = ('nearest_neighbor', 'greedy', '2opt', 'held_karp')
+
+
+def generate_instance(distribution: str, num_points: int, area_size: float, seed: int) -> np.ndarray:
+    """
+    Gera posições (n, 3) de pontos de entrega no chão (z = 0.1).
+
+    Args:
+        distribution: 'uniform', 'clustered' ou 'grid'
+        num_points: Número de pontos
+        area_size: Lado da área quadrada (metros)
+        seed: Semente do gerador aleatório
+    """
+    rng = np.random.default_rng(seed)
+    half = area_size / 2.0
+
+    if distribution == 'uniform':
+        xy = rng.uniform(-half, half, (num_points, 2))
+    elif distribution == 'clustered':
+        num_clusters = max(1, int(np.sqrt(num_points) / 2))
+        centers = rng.uniform(-half, half, (num_clusters, 2))
+        labels = rng.integers(0, num_clusters, num_points)
+        xy = centers[labels] + rng.normal(0.0, area_size / (4 * num_clusters + 4), (num_points, 2))
+        xy = np.clip(xy, -half, half)
+    elif distribution == 'grid':
+        side = int(np.ceil(np.sqrt(num_points)))
+        coords = np.linspace(-half, half, side)
+        gx, gy = np.meshgrid(coords, coords)
+        xy = np.column_stack((gx.ravel(), gy.ravel()))[:num_points]
+        # Pequena perturbação para evitar empates exatos
+        xy = xy + rng.normal(0.0, 1e-3, xy.shape)
+    else:
+        raise ValueError(f"Distribuição desconhecida: {distribution}")
+
+    return np.column_stack((xy, np.full(num_points, 0.1)))
+
+
+def algorithm_names() -> List[str]:
+    """Algoritmos avaliados: os registrados no RoutePlanner + 2opt + Held-Karp."""
+    names = list(RoutePlanner({}).algorithms)
+    return names + ['2opt', 'held_karp']
+
+
+def tour_length(positions: np.ndarray, base_pos: np.ndarray) -> float:
+    """Comprimento do percurso base -> posições (em ordem) -> base."""
+    path = np.vstack((base_pos, positions, base_pos))
+    return float(np.linalg.norm(np.diff(path, axis=0), axis=1).sum())
+
+
+def run_algorithm(name: str, positions: np.ndarray, base_pos: np.ndarray) -> Dict:
+    """
+    Executa um algoritmo em uma instância e mede tempo e memória.
+
+    Returns:
+        Dicionário com tempo (s), pico de memória (MB) e comprimento (m)
+    """
+    store = DeliveryPointStore.from_positions(positions)
+    points = store.views()
+
+    # Cache e solução exata desativados: mede só o algoritmo escolhido
+    config = {'algorithm': name, 'exact_max_points': 0, 'plan_cache_size': 0, 'replan_mode': 'full'}
+    if name == 'held_karp':
+        config['exact_max_points'] = len(points)
+    planner = RoutePlanner(config)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    route = planner.plan_route(base_pos, points, base_pos, return_to_base=True)
+    wall_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if len(route) != len(points):
+        raise RuntimeError(f"{name}: rota com {len(route)} de {len(points)} pontos")
+    # Algoritmos O(n) não podem ter passado pela matriz de distâncias (mediria O(n²))
+    if name not in MATRIX_ALGORITHMS and len(planner.distances):
+        raise RuntimeError(f"{name}: a matriz de distâncias foi construída")
+
+    return {
+        'wall_time_s': wall_time,
+        'peak_memory_mb': peak / 1e6,
+        'tour_length_m': tour_length(store.positions[[p.index for p in route]], base_pos)
+    }
+
+
+def git_revision() -> str:
+    """Commit atual do repositório (ou 'unknown')."""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_benchmark(sizes: List[int], distributions: List[str], algorithms: List[str],
+                  area_size: float, seed: int, max_matrix_points: int,
+                  max_exact_points: int) -> List[Dict]:
+    """Executa todas as combinações e retorna uma linha de resultado por execução."""
+    # Acima do limite o solver recusa a instância e o planejador cairia no nearest neighbor
+    max_exact_points = min(max_exact_points, HeldKarpSolver.HARD_LIMIT)
+    base_pos = np.array([0.0, 0.0, 2.0])
+    results = []
+
+    for distribution in distributions:
+        for size in sizes:
+            positions = generate_instance(distribution, size, area_size, seed)
+            instance_rows = []
+
+            for name in algorithms:
+                row = {
+                    'distribution': distribution,
+                    'num_points': size,
+                    'algorithm': name,
+                    'seed': seed
+                }
+                too_big = (
+                    (name in MATRIX_ALGORITHMS and size > max_matrix_points) or
+                    (name == 'held_karp' and size > max_exact_points)
+                )
+                if too_big:
+                    row.update({'status': 'skipped', 'wall_time_s': None,
+                                'peak_memory_mb': None, 'tour_length_m': None})
+                else:
+                    row.update(run_algorithm(name, positions, base_pos))
+                    row['status'] = 'ok'
+                instance_rows.append(row)
+                print(f"{distribution:>9} n={size:<6} {name:<28} {row['status']:>7}"
+                      + (f"  {row['wall_time_s']:.4f}s  {row['tour_length_m']:.1f}m"
+                         if row['status'] == 'ok' else ''))
+
+            lengths = [r['tour_length_m'] for r in instance_rows if r['status'] == 'ok']
+            best = min(lengths) if lengths else None
+            for row in instance_rows:
+                row['relative_to_best'] = (
+                    row['tour_length_m'] / best if row['status'] == 'ok' and best else None
+                )
+            results.extend(instance_rows)
+
+    return results
+
+
+def write_results(results: List[Dict], output: str, metadata: Dict):
+    """Grava os resultados em <output>.json e <output>.csv."""
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(f"{output}.json", 'w') as f:
+        json.dump({'metadata': metadata, 'results': results}, f, indent=2)
+
+    fields = ['distribution', 'num_points', 'algorithm', 'seed', 'status',
+              'wall_time_s', 'peak_memory_mb', 'tour_length_m', 'relative_to_best']
+    with open(f"{output}.csv", 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for row in results:
+            writer.writerow({key: row.get(key) for key in fields})
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Benchmark do planejador de rotas do drone')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000],
+                        help='Números de pontos das instâncias')
+    parser.add_argument('--distributions', nargs='+', default=list(DISTRIBUTIONS),
+                        choices=DISTRIBUTIONS, help='Distribuições das instâncias')
+    parser.add_argument('--algorithms', nargs='+', default=None, choices=algorithm_names(),
+                        help='Algoritmos a avaliar (padrão: todos)')
+    parser.add_argument('--area-size', type=float, default=50.0, help='Lado da área (m)')
+    parser.add_argument('--seed', type=int, default=42, help='Semente das instâncias')
+    parser.add_argument('--max-matrix-points', type=int, default=3000,
+                        help='Maior instância para algoritmos com matriz O(n²)')
+    parser.add_argument('--max-exact-points', type=int, default=12,
+                        help=f'Maior instância para Held-Karp (até {HeldKarpSolver.HARD_LIMIT})')
+    parser.add_argument('--output', type=str, default='benchmark_route_planner',
+                        help='Prefixo dos arquivos de saída (.json e .csv)')
+    args = parser.parse_args()
+    if args.max_exact_points > HeldKarpSolver.HARD_LIMIT:
+        parser.error(f"--max-exact-points acima do limite do Held-Karp ({HeldKarpSolver.HARD_LIMIT})")
+
+    algorithms = args.algorithms or algorithm_names()
+    metadata = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'area_size': args.area_size,
+        'seed': args.seed
+    }
+
+    results = run_benchmark(args.sizes, args.distributions, algorithms, args.area_size,
+                            args.seed, args.max_matrix_points, args.max_exact_points)
+    write_results(results, args.output, metadata)
+    print(f"\nResultados salvos em: {args.output}.json / {args.output}.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+"""
+Ajuste automático dos ganhos PID do DroneController (sem PyBullet).
+
+Cada candidato é um vetor de ganhos avaliado com o BatchSimulator
+(dinâmica NumPy, sem janela): missões de entrega geradas como na
+simulação (generate_delivery_points + rota do RoutePlanner, voadas na
+altura da base e de volta à base; tempo total) e uma resposta ao degrau
+(tempo de acomodação e sobressinal). Cada geração de candidatos é dividida
+entre processos, e cada processo simula a sua parte em lote. Resultados
+ficam em cache por vetor de ganhos e os melhores ganhos são gravados em um
+perfil YAML (carregado com control.pid_profile no config.yaml).
+
+Métodos: busca aleatória ou CMA-ES. Otimização bayesiana não é oferecida:
+exigiria um processo gaussiano (scipy/scikit-learn), que o projeto não usa,
+e o CMA-ES aproveita melhor a avaliação em lote de uma geração inteira.
+
+Uso (a partir do diretório drone/):
+    python scripts/tune_pid_gains.py --method cmaes --generations 20 --output config/pid_profiles/tuned.yaml
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import yaml
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.batch_simulator import BatchSimulator
+from src.point_generator import generate_delivery_points
+from src.route_planner import RoutePlanner
+
+METHODS = ('random', 'cmaes')
+
+# Espaço de busca: (nome, mínimo, máximo). Ganhos de x e y são iguais (simetria)
+PARAMETERS = (
+    ('position.kp.xy', 0.2, 10.0),
+    ('position.kp.z', 0.2, 10.0),
+    ('position.ki.xy', 0.0, 1.0),
+    ('position.ki.z', 0.0, 1.0),
+    ('position.kd.xy', 0.0, 3.0),
+    ('position.kd.z', 0.0, 3.0),
+    ('attitude.kp', 0.1, 10.0),
+    ('attitude.kd', 0.0, 2.0),
+)
+LOWER = np.array([p[1] for p in PARAMETERS])
+UPPER = np.array([p[2] for p in PARAMETERS])
+
+# Degrau da resposta ao degrau (relativo à base)
+DEFAULT_STEP = [6.0, 0.0, 1.0]
+
+# Pontuação de candidatos que não terminam a missão ou caem
+FAILURE_PENALTY = 1000.0
+
+
+def vector_to_gains(vector: np.ndarray) -> Dict:
+    """Converte um vetor de ganhos (PARAMETERS) no formato de control.pid."""
+    kp_xy, kp_z, ki_xy, ki_z, kd_xy, kd_z, att_kp, att_kd = (float(v) for v in vector)
+    return {
+        'position': {'kp': [kp_xy, kp_xy, kp_z], 'ki': [ki_xy, ki_xy, ki_z], 'kd': [kd_xy, kd_xy, kd_z]},
+        'attitude': {'kp': [att_kp] * 3, 'ki': [0.0] * 3, 'kd': [att_kd] * 3}
+    }
+
+
+def gains_to_vector(pid: Dict) -> np.ndarray:
+    """Converte control.pid em um vetor de ganhos (usa x para xy e roll para a atitude)."""
+    position, attitude = pid['position'], pid['attitude']
+    return np.array([
+        position['kp'][0], position['kp'][2], position['ki'][0], position['ki'][2],
+        position['kd'][0], position['kd'][2], attitude['kp'][0], attitude['kd'][0]
+    ], dtype=float)
+
+
+def cache_key(vector: np.ndarray) -> str:
+    """Chave do cache: ganhos arredondados a 4 casas."""
+    return ','.join(f"{v:.4f}" for v in vector)
+
+
+def build_delivery_missions(config: Dict, num_missions: int, num_points: int,
+                            area: Optional[float], seed: int) -> List[List[List[float]]]:
+    """
+    Gera missões de entrega como as da simulação.
+
+    Cada missão sorteia pontos com generate_delivery_points (mesma
+    amostragem e espaçamento do ambiente), ordena-os com o RoutePlanner
+    configurado e vira uma lista de waypoints: cada ponto na altura da base
+    (a entrega é por proximidade horizontal) e, no fim, a própria base.
+
+    Returns:
+        Lista (por missão) de waypoints [x, y, z]
+    """
+    base = np.array(config['simulation']['base_position'], dtype=float)
+    environment = dict(config['environment'], num_delivery_points=num_points)
+    if area:
+        environment['area_size'] = [area, area]
+
+    missions = []
+    for k in range(num_missions):
+        points = generate_delivery_points(environment, seed=seed + k).views()
+        planner = RoutePlanner({**config['route_planning'], 'plan_cache_size': 0, 'anytime_budget': 0.0})
+        route = planner.plan_route(base, points, base)
+        waypoints = [[float(p.position[0]), float(p.position[1]), float(base[2])] for p in route]
+        missions.append(waypoints + [base.tolist()])
+    return missions
+
+
+def evaluate_chunk(config: Dict, vectors: np.ndarray, settings: Dict) -> List[Dict]:
+    """
+    Avalia um bloco de candidatos em lote (executado em um processo do pool).
+
+    Returns:
+        Métricas e pontuação de cada candidato, na ordem de `vectors`
+    """
+    stacked = [vector_to_gains(v) for v in vectors]
+    gains = {
+        loop: {key: np.array([g[loop][key] for g in stacked]) for key in ('kp', 'ki', 'kd')}
+        for loop in ('position', 'attitude')
+    }
+    simulator = BatchSimulator(config, len(vectors), gains=gains)
+    base = simulator.base_position
+
+    step = simulator.step_response(base + np.asarray(settings['step']),
+                                   duration=settings['step_duration'],
+                                   settle_band=settings['settle_band'])
+    # Tempo total das missões (nan se alguma não terminou)
+    mission_time = np.zeros(len(vectors))
+    crashed = np.zeros(len(vectors), dtype=bool)
+    for waypoints in settings['missions']:
+        mission = simulator.run(np.asarray(waypoints), max_time=settings['max_time'],
+                                tolerance=settings['tolerance'])
+        mission_time += mission['completion_time']
+        crashed |= mission['crashed']
+
+    results = []
+    for i in range(len(vectors)):
+        metrics = {
+            'settle_time': float(step['settle_time'][i]),
+            'overshoot': float(step['overshoot'][i]),
+            'mission_time': float(mission_time[i]),
+            'crashed': bool(crashed[i])
+        }
+        metrics['score'] = score(metrics, settings)
+        results.append(metrics)
+    return results
+
+
+def score(metrics: Dict, settings: Dict) -> float:
+    """Pontuação a minimizar: tempo das missões + pesos × acomodação e sobressinal."""
+    failed = (metrics['crashed'] or np.isnan(metrics['mission_time'])
+              or np.isnan(metrics['settle_time']))
+    if failed:
+        return FAILURE_PENALTY + (0.0 if np.isnan(metrics['settle_time']) else metrics['settle_time'])
+    return (metrics['mission_time']
+            + settings['settle_weight'] * metrics['settle_time']
+            + settings['overshoot_weight'] * metrics['overshoot'])
+
+
+class CMAES:
+    """
+    CMA-ES (μ/μ_w, λ) no espaço normalizado [0, 1]^n.
+
+    Versão compacta do tutorial de Hansen: adaptação do passo pelo caminho
+    evolutivo p_σ e da covariância por atualizações rank-one e rank-μ.
+    Candidatos fora dos limites são projetados na caixa antes de avaliar.
+    """
+
+    def __init__(self, mean: np.ndarray, sigma: float, population: int, rng: np.random.Generator):
+        n = len(mean)
+        self.n = n
+        self.mean = np.array(mean, dtype=float)
+        self.sigma = sigma
+        self.population = population
+        self.rng = rng
+
+        mu = population // 2
+        weights = np.log(mu + 0.5) - np.log(np.arange(1, mu + 1))
+        self.weights = weights / weights.sum()
+        self.mu = mu
+        self.mueff = 1.0 / np.sum(self.weights ** 2)
+
+        self.cc = (4 + self.mueff / n) / (n + 4 + 2 * self.mueff / n)
+        self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+        self.c1 = 2 / ((n + 1.3) ** 2 + self.mueff)
+        self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1 / self.mueff) / ((n + 2) ** 2 + self.mueff))
+        self.damps = 1 + 2 * max(0.0, np.sqrt((self.mueff - 1) / (n + 1)) - 1) + self.cs
+        self.chi_n = np.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n ** 2))
+
+        self.pc = np.zeros(n)
+        self.ps = np.zeros(n)
+        self.C = np.eye(n)
+        self.generation = 0
+
+    def ask(self) -> np.ndarray:
+        """Sorteia uma geração (λ, n), já projetada em [0, 1]."""
+        eigenvalues, self.B = np.linalg.eigh(self.C)
+        self.D = np.sqrt(np.maximum(eigenvalues, 1e-20))
+        z = self.rng.standard_normal((self.population, self.n))
+        samples = self.mean + self.sigma * (z * self.D) @ self.B.T
+        return np.clip(samples, 0.0, 1.0)
+
+    def tell(self, samples: np.ndarray, scores: np.ndarray):
+        """Atualiza média, passo e covariância com a geração avaliada."""
+        order = np.argsort(scores)[:self.mu]
+        y = (samples[order] - self.mean) / self.sigma
+        y_mean = self.weights @ y
+        self.mean = self.mean + self.sigma * y_mean
+
+        inv_sqrt_c = self.B @ np.diag(1.0 / self.D) @ self.B.T
+        self.ps = (1 - self.cs) * self.ps + np.sqrt(self.cs * (2 - self.cs) * self.mueff) * inv_sqrt_c @ y_mean
+        self.generation += 1
+        ps_norm = np.linalg.norm(self.ps) / np.sqrt(1 - (1 - self.cs) ** (2 * self.generation))
+        hsig = float(ps_norm / self.chi_n < 1.4 + 2 / (self.n + 1))
+        self.pc = (1 - self.cc) * self.pc + hsig * np.sqrt(self.cc * (2 - self.cc) * self.mueff) * y_mean
+
+        rank_mu = (y * self.weights[:, None]).T @ y
+        self.C = ((1 - self.c1 - self.cmu) * self.C
+                  + self.c1 * (np.outer(self.pc, self.pc) + (1 - hsig) * self.cc * (2 - self.cc) * self.C)
+                  + self.cmu * rank_mu)
+        self.sigma *= np.exp((self.cs / self.damps) * (np.linalg.norm(self.ps) / self.chi_n - 1))
+
+
+class Tuner:
+    """Avalia gerações de candidatos no pool de processos, com cache por vetor de ganhos."""
+
+    def __init__(self, config: Dict, settings: Dict, workers: int, cache_path: Optional[str]):
+        self.config = config
+        self.settings = settings
+        self.workers = max(1, workers)
+        self.cache_path = cache_path
+        self.cache: Dict[str, Dict] = {}
+        self.evaluations = 0
+        self.cache_hits = 0
+
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path) as f:
+                data = json.load(f)
+            # Cache só vale para as mesmas missões e pesos
+            if data.get('settings') == settings:
+                self.cache = data['results']
+
+        self.pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+
+    def evaluate(self, vectors: np.ndarray) -> List[Dict]:
+        """Avalia os candidatos (ganhos reais), reaproveitando o cache."""
+        keys = [cache_key(v) for v in vectors]
+        missing = sorted({k: i for i, k in enumerate(keys) if k not in self.cache}.values())
+        self.cache_hits += len(vectors) - len(missing)
+
+        if missing:
+            todo = vectors[missing]
+            chunks = [c for c in np.array_split(todo, min(self.workers, len(todo))) if len(c)]
+            if self.pool is None:
+                results = [evaluate_chunk(self.config, c, self.settings) for c in chunks]
+            else:
+                futures = [self.pool.submit(evaluate_chunk, self.config, c, self.settings) for c in chunks]
+                results = [f.result() for f in futures]
+            for index, metrics in zip(missing, (m for chunk in results for m in chunk)):
+                self.cache[keys[index]] = metrics
+            self.evaluations += len(missing)
+            self.save_cache()
+
+        return [self.cache[k] for k in keys]
+
+    def save_cache(self):
+        """Grava o cache em disco (JSON)."""
+        if not self.cache_path:
+            return
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.cache_path, 'w') as f:
+            json.dump({'settings': self.settings, 'results': self.cache}, f)
+
+    def shutdown(self):
+        """Encerra o pool de processos."""
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+def tune(tuner: Tuner, method: str, generations: int, population: int, seed: int,
+         initial: np.ndarray, sigma: float) -> Dict:
+    """
+    Executa a busca e retorna o melhor candidato encontrado.
+
+    Returns:
+        Dicionário com vector, metrics e history (melhor pontuação por geração)
+    """
+    rng = np.random.default_rng(seed)
+    span = UPPER - LOWER
+    best = {'vector': initial, 'metrics': tuner.evaluate(initial[None])[0]}
+    history = []
+    cmaes = CMAES((initial - LOWER) / span, sigma, population, rng) if method == 'cmaes' else None
+
+    for generation in range(generations):
+        if cmaes is not None:
+            normalized = cmaes.ask()
+        else:
+            normalized = rng.random((population, len(PARAMETERS)))
+        vectors = LOWER + normalized * span
+        results = tuner.evaluate(vectors)
+        scores = np.array([r['score'] for r in results])
+        if cmaes is not None:
+            cmaes.tell(normalized, scores)
+
+        i = int(np.argmin(scores))
+        if scores[i] < best['metrics']['score']:
+            best = {'vector': vectors[i], 'metrics': results[i]}
+        history.append(best['metrics']['score'])
+        print(f"Geração {generation + 1:>3}/{generations}: melhor da geração {scores[i]:8.3f}  "
+              f"melhor geral {best['metrics']['score']:8.3f}  "
+              f"(avaliações: {tuner.evaluations}, cache: {tuner.cache_hits})")
+
+    best['history'] = history
+    return best
+
+
+def git_revision() -> str:
+    """Commit atual do repositório (ou 'unknown')."""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def write_profile(path: str, best: Dict, baseline: Dict, metadata: Dict):
+    """Grava o perfil YAML com os melhores ganhos (formato de control.pid)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    profile = {
+        'control': {'pid': vector_to_gains(np.round(best['vector'], 4))},
+        'tuning': {
+            **metadata,
+            'score': round(best['metrics']['score'], 4),
+            'baseline_score': round(baseline['score'], 4),
+            'metrics': {k: (round(v, 4) if isinstance(v, float) else v) for k, v in best['metrics'].items()},
+            'baseline_metrics': {k: (round(v, 4) if isinstance(v, float) else v) for k, v in baseline.items()}
+        }
+    }
+    with open(path, 'w') as f:
+        f.write("# Perfil de ganhos PID gerado por scripts/tune_pid_gains.py\n")
+        f.write("# Use com control.pid_profile no config.yaml\n")
+        yaml.safe_dump(profile, f, sort_keys=False, default_flow_style=None)
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Ajuste automático dos ganhos PID do drone')
+    parser.add_argument('--config', type=str, default='config/config.yaml', help='Arquivo de configuração')
+    parser.add_argument('--method', choices=METHODS, default='cmaes', help='Método de busca')
+    parser.add_argument('--generations', type=int, default=20, help='Número de gerações')
+    parser.add_argument('--population', type=int, default=16, help='Candidatos por geração')
+    parser.add_argument('--sigma', type=float, default=0.2, help='Passo inicial do CMA-ES (espaço normalizado)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Processos do pool')
+    parser.add_argument('--seed', type=int, default=42, help='Semente da busca')
+    parser.add_argument('--missions', type=int, default=2, help='Missões de entrega por candidato')
+    parser.add_argument('--mission-points', type=int, default=4, help='Pontos de entrega por missão')
+    parser.add_argument('--mission-area', type=float, default=20.0,
+                        help='Lado da área das missões (m); 0 usa environment.area_size')
+    parser.add_argument('--max-time', type=float, default=120.0, help='Tempo máximo de cada missão (s)')
+    parser.add_argument('--step-duration', type=float, default=10.0, help='Duração da resposta ao degrau (s)')
+    parser.add_argument('--settle-band', type=float, default=0.2, help='Faixa de acomodação (m)')
+    parser.add_argument('--settle-weight', type=float, default=1.0, help='Peso do tempo de acomodação')
+    parser.add_argument('--overshoot-weight', type=float, default=10.0, help='Peso do sobressinal (por metro)')
+    parser.add_argument('--cache', type=str, default='logs/pid_tuning_cache.json',
+                        help='Cache de avaliações (JSON); vazio desativa')
+    parser.add_argument('--output', type=str, default='config/pid_profiles/tuned.yaml',
+                        help='Perfil YAML com os melhores ganhos')
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+
+    settings = {
+        'missions': build_delivery_missions(config, args.missions, args.mission_points,
+                                            args.mission_area, args.seed),
+        'step': DEFAULT_STEP,
+        'max_time': args.max_time,
+        'step_duration': args.step_duration,
+        'settle_band': args.settle_band,
+        'tolerance': config['route_planning'].get('min_distance_threshold', 0.5),
+        'settle_weight': args.settle_weight,
+        'overshoot_weight': args.overshoot_weight,
+        'timestep': str(config['simulation']['timestep']),
+        'drone': config['drone']
+    }
+
+    initial = np.clip(gains_to_vector(config['control']['pid']), LOWER, UPPER)
+    tuner = Tuner(config, settings, args.workers, args.cache or None)
+    try:
+        baseline = tuner.evaluate(initial[None])[0]
+        print(f"Ganhos atuais: pontuação {baseline['score']:.3f}")
+        best = tune(tuner, args.method, args.generations, args.population, args.seed,
+                    initial, args.sigma)
+    finally:
+        tuner.shutdown()
+
+    metadata = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'method': args.method,
+        'generations': args.generations,
+        'population': args.population,
+        'seed': args.seed,
+        'evaluations': tuner.evaluations
+    }
+    write_profile(args.output, best, baseline, metadata)
+
+    print(f"\nMelhor pontuação: {best['metrics']['score']:.3f} (atual: {baseline['score']:.3f})")
+    print(f"Tempo das missões: {best['metrics']['mission_time']:.2f}s | "
+          f"acomodação: {best['metrics']['settle_time']:.2f}s | "
+          f"sobressinal: {best['metrics']['overshoot']:.3f}m")
+    print(f"Perfil salvo em: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
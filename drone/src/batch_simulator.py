@@ -0,0 +1,214 @@
+"""
+Simulação vetorizada de muitos drones independentes (varreduras de parâmetros).
+"""
+import numpy as np
+from typing import Dict, Optional
+
+from src.pid_controller import BatchDroneController
+from src.point_mass_simulator import (
+    MIN_THRUST_RATIO, RigidBodyIntegrator, parse_timestep, quaternion_to_euler, stabilize_control
+)
+
+
+class BatchSimulator:
+    """
+    N rollouts independentes do drone avançados juntos, um passo por vez.
+
+    Cada rollout é um drone com sua própria cópia do controlador (ganhos
+    PID por rollout) voando uma sequência de waypoints. O estado fica em
+    arrays (N, 3) e cada passo é um punhado de operações NumPy sobre todos
+    os rollouts: a dinâmica é a do PointMassSimulator e o controle é o
+    BatchDroneController (versão vetorizada do DroneController).
+    """
+
+    def __init__(self, config: dict, num_rollouts: int, gains: Optional[Dict] = None):
+        """
+        Inicializa os rollouts.
+
+        Args:
+            config: Configurações da simulação (mesmo formato do config.yaml)
+            num_rollouts: Número N de drones independentes
+            gains: Ganhos PID por rollout, no formato de control.pid
+                ({'position': {'kp': ..., ...}, 'attitude': {...}}); cada
+                ganho pode ser (3,) ou (N, 3). Omitidos vêm de control.pid
+        """
+        self.config = config
+        self.num_rollouts = num_rollouts
+        self.timestep = parse_timestep(config['simulation']['timestep'])
+
+        pid = {
+            loop: {**config['control']['pid'][loop], **((gains or {}).get(loop, {}))}
+            for loop in ('position', 'attitude')
+        }
+        self.controller = BatchDroneController(
+            {
+                'pid': pid,
+                'max_velocity': config['drone']['max_velocity'],
+                'max_acceleration': config['drone']['max_acceleration']
+            },
+            num_rollouts
+        )
+
+        mass = config['drone'].get('mass', 1.0)
+        gravity = config['simulation']['gravity']
+        self.hover_force = np.array([0.0, 0.0, mass * abs(gravity)])
+        self.min_thrust = mass * abs(gravity) * MIN_THRUST_RATIO
+        self.integrator = RigidBodyIntegrator(mass, gravity, self.timestep)
+
+        self.base_position = np.array(config['simulation']['base_position'], dtype=float)
+        self.reset()
+
+    def reset(self):
+        """Recoloca todos os drones parados na base e zera os controladores."""
+        n = self.num_rollouts
+        self.positions = np.tile(self.base_position, (n, 1))
+        self.velocities = np.zeros((n, 3))
+        self.orientations = np.tile([0.0, 0.0, 0.0, 1.0], (n, 1))
+        self.angular_velocities = np.zeros((n, 3))
+        self.controller.reset()
+
+    def run(
+        self,
+        waypoints: np.ndarray,
+        max_time: float = 60.0,
+        tolerance: float = 0.5,
+        crash_altitude: float = 0.3
+    ) -> Dict[str, np.ndarray]:
+        """
+        Voa todos os rollouts pelos waypoints, em ordem, partindo da base.
+
+        Um waypoint é atingido a menos de `tolerance` metros; o rollout
+        termina no último waypoint (e continua pairando nele até os demais
+        terminarem ou max_time acabar).
+
+        Args:
+            waypoints: (K, 3) comum a todos ou (N, K, 3) por rollout
+            max_time: Tempo simulado máximo (s)
+            tolerance: Distância para considerar um waypoint atingido (m)
+            crash_altitude: Abaixo desta altura o rollout é marcado como queda
+
+        Returns:
+            Métricas por rollout (arrays (N,)):
+            completed, completion_time (nan se não terminou),
+            waypoints_reached, path_length, final_error, max_speed,
+            max_tilt, rms_altitude_error, control_effort, crashed
+        """
+        n = self.num_rollouts
+        waypoints = np.broadcast_to(np.asarray(waypoints, dtype=float), (n,) + np.shape(waypoints)[-2:])
+        num_waypoints = waypoints.shape[1]
+        dt = self.timestep
+        rows = np.arange(n)
+
+        index = np.zeros(n, dtype=int)
+        completion_time = np.full(n, np.nan)
+        path_length = np.zeros(n)
+        max_speed = np.zeros(n)
+        max_tilt = np.zeros(n)
+        altitude_error_sq = np.zeros(n)
+        control_effort = np.zeros(n)
+        crashed = np.zeros(n, dtype=bool)
+        active_steps = np.zeros(n)
+
+        self.reset()
+        for step in range(int(np.ceil(max_time / dt))):
+            active = np.isnan(completion_time)
+            if not active.any():
+                break
+            targets = waypoints[rows, np.minimum(index, num_waypoints - 1)]
+            eulers = quaternion_to_euler(self.orientations)
+
+            forces, torques = self.controller.compute_control(
+                self.positions, targets, self.velocities, eulers, dt
+            )
+            forces, torques = stabilize_control(forces, torques, eulers,
+                                                self.angular_velocities, self.min_thrust)
+            previous = self.positions.copy()
+            self.integrator.step(self.positions, self.velocities, self.orientations,
+                                 self.angular_velocities, forces, torques)
+
+            # Métricas (só enquanto o rollout não terminou)
+            moved = np.sqrt(np.einsum('ij,ij->i', self.positions - previous, self.positions - previous))
+            speed = np.sqrt(np.einsum('ij,ij->i', self.velocities, self.velocities))
+            tilt = np.abs(eulers[:, :2]).max(axis=1)
+            effort = forces - self.hover_force
+            path_length += np.where(active, moved, 0.0)
+            np.maximum(max_speed, np.where(active, speed, 0.0), out=max_speed)
+            np.maximum(max_tilt, np.where(active, tilt, 0.0), out=max_tilt)
+            altitude_error_sq += np.where(active, (targets[:, 2] - self.positions[:, 2]) ** 2, 0.0)
+            control_effort += np.where(active, np.sqrt(np.einsum('ij,ij->i', effort, effort)) * dt, 0.0)
+            crashed |= active & (self.positions[:, 2] < crash_altitude)
+            active_steps += active
+
+            # Avanço de waypoint
+            distance = np.linalg.norm(self.positions - targets, axis=1)
+            reached = active & (distance < tolerance)
+            index += reached
+            finished = reached & (index >= num_waypoints)
+            completion_time[finished] = (step + 1) * dt
+
+        final_error = np.linalg.norm(self.positions - waypoints[:, -1], axis=1)
+        return {
+            'completed': ~np.isnan(completion_time),
+            'completion_time': completion_time,
+            'waypoints_reached': np.minimum(index, num_waypoints),
+            'path_length': path_length,
+            'final_error': final_error,
+            'max_speed': max_speed,
+            'max_tilt': max_tilt,
+            'rms_altitude_error': np.sqrt(altitude_error_sq / np.maximum(active_steps, 1)),
+            'control_effort': control_effort,
+            'crashed': crashed
+        }
+
+    def step_response(
+        self,
+        target: np.ndarray,
+        duration: float = 10.0,
+        settle_band: float = 0.2
+    ) -> Dict[str, np.ndarray]:
+        """
+        Resposta ao degrau: todos os rollouts voam da base até `target`.
+
+        Args:
+            target: Posição alvo [x, y, z]
+            duration: Tempo simulado (s)
+            settle_band: Raio da faixa de acomodação (m)
+
+        Returns:
+            Métricas por rollout (arrays (N,)):
+            settle_time (último instante fora da faixa; nan se não acomodou),
+            overshoot (quanto passou do alvo na direção do degrau, m),
+            final_error
+        """
+        self.reset()
+        n = self.num_rollouts
+        dt = self.timestep
+        target = np.asarray(target, dtype=float)
+        targets = np.tile(target, (n, 1))
+        direction = target - self.base_position
+        direction /= max(np.linalg.norm(direction), 1e-9)
+
+        last_outside = np.zeros(n)
+        overshoot = np.zeros(n)
+        for step in range(int(np.ceil(duration / dt))):
+            eulers = quaternion_to_euler(self.orientations)
+            forces, torques = self.controller.compute_control(
+                self.positions, targets, self.velocities, eulers, dt
+            )
+            forces, torques = stabilize_control(forces, torques, eulers,
+                                                self.angular_velocities, self.min_thrust)
+            self.integrator.step(self.positions, self.velocities, self.orientations,
+                                 self.angular_velocities, forces, torques)
+
+            error = self.positions - target
+            np.maximum(overshoot, error @ direction, out=overshoot)
+            outside = np.einsum('ij,ij->i', error, error) > settle_band * settle_band
+            last_outside[outside] = (step + 1) * dt
+
+        final_error = np.linalg.norm(self.positions - target, axis=1)
+        settle_time = np.where(final_error <= settle_band, last_outside, np.nan)
+        return {
+            'settle_time': settle_time,
+            'overshoot': overshoot,
+            'final_error': final_error
+        }
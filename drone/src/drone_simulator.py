@@ -4,15 +4,20 @@ Simulador PyBullet para o drone de entregas.
 import pybullet as p
 import pybullet_data
 import numpy as np
+from contextlib import contextmanager
 from typing import List, Optional, Tuple
 import os
 
-from src.sensor import DeliveryPoint
+from src.sensor import DeliveryPoint, DeliveryPointStore
+from src.point_generator import generate_delivery_points
 
 
 class DroneSimulator:
     """Simulador PyBullet do drone e ambiente."""
     
+    MARKER_PENDING_COLOR = [1.0, 0.0, 0.0, 0.8]    # Vermelho: não entregue
+    MARKER_DELIVERED_COLOR = [0.0, 1.0, 0.0, 0.8]  # Verde: entregue
+    
     def __init__(self, config: dict):
         """
         Inicializa o simulador.
@@ -31,13 +36,15 @@ class DroneSimulator:
                 self.timestep = float(timestep_value)
         else:
             self.timestep = float(timestep_value)
+        self.sim_time = 0.0  # Tempo simulado acumulado (s)
         self.base_position = np.array(config['simulation']['base_position'])
         # Garantir que o drone comece em uma altitude segura
         if self.base_position[2] < 1.0:
             self.base_position[2] = 1.0
         
-        # Inicializar PyBullet
-        self.client_id = p.connect(p.GUI)  # ou p.DIRECT para headless
+        # Inicializar PyBullet (sem janela e sem desenhos no modo headless)
+        self.headless = config['simulation'].get('headless', False)
+        self.client_id = p.connect(p.DIRECT if self.headless else p.GUI)
         p.setAdditionalSearchPath(pybullet_data.getDataPath())
         p.setGravity(0, 0, config['simulation']['gravity'])
         p.setTimeStep(self.timestep)
@@ -45,43 +52,59 @@ class DroneSimulator:
         # Carregar plano
         _ = p.loadURDF("plane.urdf")
         
+        # Frota: drones lado a lado ao redor da base (1 drone por padrão)
+        fleet_config = config.get('fleet', {})
+        self.num_drones = max(1, int(fleet_config.get('num_drones', 1)))
+        spacing = fleet_config.get('spacing', 2.0)
+        offsets = (np.arange(self.num_drones) - (self.num_drones - 1) / 2.0) * spacing
+        self.start_positions = np.tile(self.base_position, (self.num_drones, 1))
+        self.start_positions[:, 0] += offsets
+        
         # Criar drone (usando modelo simplificado ou racecar/husky)
         self.drone_model = config['drone'].get('model', 'quadrotor')
-        self.drone_id = self._create_drone()
+        self.drone_ids = [self._create_drone(pos) for pos in self.start_positions]
+        self.drone_id = self.drone_ids[0]
+        
+        # Estado de todos os drones (linha i = drone i)
+        self.positions = self.start_positions.copy()
+        self.velocities = np.zeros((self.num_drones, 3))
+        self.orientations = np.tile([0.0, 0.0, 0.0, 1.0], (self.num_drones, 1))  # quaternions
+        self.angular_velocities = np.zeros((self.num_drones, 3))
         
-        # Estado do drone
-        self.position = self.base_position.copy()
+        # Estado do drone principal (drone 0)
+        self.position = self.positions[0].copy()
         self.velocity = np.zeros(3)
         self.orientation = np.array([0, 0, 0, 1])  # quaternion
         self.angular_velocity = np.zeros(3)
         
-        # Pontos de entrega
+        # Pontos de entrega (arrays no store + visões compatíveis com DeliveryPoint)
+        self.point_store = DeliveryPointStore()
         self.delivery_points: List[DeliveryPoint] = []
         self._create_delivery_points()
         
-        # Visualização
-        self.target_marker = None
-        self.route_lines = []
+        # Visualização (por drone)
+        self.target_markers = {}
+        self.route_lines = {}
         
-    def _create_drone(self):
+    def _create_drone(self, position: np.ndarray):
         """Cria o modelo do drone no PyBullet."""
         if self.drone_model == "racecar":
             # Usar racecar como substituto terrestre
             drone_id = p.loadURDF("racecar/racecar.urdf", 
-                                 basePosition=self.base_position.tolist(),
+                                 basePosition=position.tolist(),
                                  baseOrientation=[0, 0, 0, 1])
         elif self.drone_model == "husky":
             # Usar husky como substituto terrestre
             drone_id = p.loadURDF("husky/husky.urdf",
-                                 basePosition=self.base_position.tolist(),
+                                 basePosition=position.tolist(),
                                  baseOrientation=[0, 0, 0, 1])
         else:
             # Criar drone quadrotor simplificado (caixa com propulsores)
-            drone_id = self._create_simple_quadrotor()
+            drone_id = self._create_simple_quadrotor(position)
         
         return drone_id
     
-    def _create_simple_quadrotor(self):
+    def _create_simple_quadrotor(self, position: np.ndarray):
         """Cria um quadrotor simplificado usando caixas."""
         # Corpo principal
         base_visual = p.createVisualShape(
@@ -98,7 +121,7 @@ class DroneSimulator:
             baseMass=self.config['drone'].get('mass', 1.0),
             baseCollisionShapeIndex=base_collision,
             baseVisualShapeIndex=base_visual,
-            basePosition=self.base_position.tolist(),
+            basePosition=position.tolist(),
             baseOrientation=[0, 0, 0, 1]
         )
         
@@ -124,78 +147,60 @@ class DroneSimulator:
     
     def _create_delivery_points(self):
         """Cria pontos de entrega no ambiente."""
-        area_size = self.config['environment']['area_size']
-        num_points = self.config['environment']['num_delivery_points']
-        spacing = self.config['environment'].get('point_spacing', 5.0)
-        
-        # Gerar pontos distribuídos na área
-        points = []
-        np.random.seed(42)  # Para reprodutibilidade
-        
-        for i in range(num_points):
-            # Distribuir pontos de forma que não fiquem muito próximos
-            attempts = 0
-            while attempts < 100:
-                x = np.random.uniform(-area_size[0]/2, area_size[0]/2)
-                y = np.random.uniform(-area_size[1]/2, area_size[1]/2)
-                z = 0.1  # Altura do ponto no chão
-                
-                pos = np.array([x, y, z])
-                
-                # Verificar distância mínima dos outros pontos
-                too_close = False
-                for existing_point in points:
-                    if np.linalg.norm(pos - existing_point.position) < spacing:
-                        too_close = True
-                        break
-                
-                if not too_close:
-                    point = DeliveryPoint(pos, i)
-                    points.append(point)
-                    
-                    # Criar marcador visual no PyBullet
-                    marker = p.createVisualShape(
-                        shapeType=p.GEOM_CYLINDER,
-                        radius=0.3,
-                        length=0.1,
-                        rgbaColor=[1.0, 0.0, 0.0, 0.8]
-                    )
-                    marker_id = p.createMultiBody(
-                        baseMass=0,
-                        baseVisualShapeIndex=marker,
-                        basePosition=pos.tolist()
-                    )
-                    point.marker_id = marker_id
-                    break
-                
-                attempts += 1
-        
-        self.delivery_points = points
+        store = generate_delivery_points(self.config['environment'])
+        
+        # Marcadores visuais: uma forma compartilhada e todos os corpos em uma chamada
+        if not self.headless and len(store) > 0:
+            marker = p.createVisualShape(
+                shapeType=p.GEOM_CYLINDER,
+                radius=0.3,
+                length=0.1,
+                rgbaColor=self.MARKER_PENDING_COLOR
+            )
+            with self._rendering_paused():
+                marker_ids = p.createMultiBody(
+                    baseMass=0,
+                    baseVisualShapeIndex=marker,
+                    batchPositions=store.positions[:len(store)].tolist()
+                )
+            # Com um único ponto o PyBullet retorna um inteiro
+            store.marker_ids[:len(store)] = np.atleast_1d(marker_ids)
+        
+        self.point_store = store
+        self.delivery_points = store.views()
     
     def update_drone_state(self):
-        """Atualiza estado do drone a partir da simulação."""
-        pos, orn = p.getBasePositionAndOrientation(self.drone_id)
-        vel, ang_vel = p.getBaseVelocity(self.drone_id)
-        
-        self.position = np.array(pos)
-        self.velocity = np.array(vel)
-        self.orientation = np.array(orn)
-        self.angular_velocity = np.array(ang_vel)
+        """Atualiza estado dos drones a partir da simulação."""
+        for i, drone_id in enumerate(self.drone_ids):
+            pos, orn = p.getBasePositionAndOrientation(drone_id)
+            vel, ang_vel = p.getBaseVelocity(drone_id)
+            
+            self.positions[i] = pos
+            self.velocities[i] = vel
+            self.orientations[i] = orn
+            self.angular_velocities[i] = ang_vel
+        
+        self.position = self.positions[0].copy()
+        self.velocity = self.velocities[0].copy()
+        self.orientation = self.orientations[0].copy()
+        self.angular_velocity = self.angular_velocities[0].copy()
     
-    def get_euler_angles(self) -> np.ndarray:
+    def get_euler_angles(self, drone_index: int = 0) -> np.ndarray:
         """Retorna ângulos de Euler (roll, pitch, yaw) do drone."""
-        euler = p.getEulerFromQuaternion(self.orientation)
+        euler = p.getEulerFromQuaternion(self.orientations[drone_index])
         return np.array(euler)
     
-    def apply_control(self, force: np.ndarray, torque: np.ndarray):
+    def apply_control(self, force: np.ndarray, torque: np.ndarray, drone_index: int = 0):
         """
         Aplica força e torque ao drone.
         
         Args:
             force: Força linear [fx, fy, fz] ou velocidade desejada se use_velocity_control=True
             torque: Torque angular [tx, ty, tz]
-            use_velocity_control: Se True, usa controle direto de velocidade (não recomendado)
+            drone_index: Índice do drone na frota (0 = drone principal)
         """
+        drone_id = self.drone_ids[drone_index]
+        
         # Garantir que force e torque sejam arrays numpy
         if not isinstance(force, np.ndarray):
             force = np.array(force)
@@ -207,7 +212,7 @@ class DroneSimulator:
         
         # CORREÇÃO: Adicionar correção de orientação para manter drone plano
         # Obtém orientação atual
-        _, quat = p.getBasePositionAndOrientation(self.drone_id)
+        _, quat = p.getBasePositionAndOrientation(drone_id)
         euler = p.getEulerFromQuaternion(quat)
         roll, pitch, _ = euler
         
@@ -222,7 +227,7 @@ class DroneSimulator:
         kd_yaw = 50.0    # Amortecimento MUITO alto para parar rotação imediatamente
         
         # Obtém velocidade angular atual
-        _, ang_vel = p.getBaseVelocity(self.drone_id)
+        _, ang_vel = p.getBaseVelocity(drone_id)
         ang_vel_x, ang_vel_y, ang_vel_z = ang_vel
         
         # Correção de roll (força para zero)
@@ -260,7 +265,7 @@ class DroneSimulator:
         
         # Aplicar força no centro de massa
         p.applyExternalForce(
-            self.drone_id,
+            drone_id,
             -1,  # linkIndex: -1 para base
             force_list,
             [0, 0, 0],  # posição relativa (centro de massa)
@@ -269,25 +274,27 @@ class DroneSimulator:
         
         # Aplicar torque
         p.applyExternalTorque(
-            self.drone_id,
+            drone_id,
             -1,  # linkIndex: -1 para base/root link
             torque_list,
             p.WORLD_FRAME
         )
     
-    def set_drone_position(self, position: np.ndarray, orientation: Optional[np.ndarray] = None):
+    def set_drone_position(self, position: np.ndarray, orientation: Optional[np.ndarray] = None,
+                           drone_index: int = 0):
         """
         Define posição do drone (útil para reset).
         
         Args:
             position: Nova posição [x, y, z]
             orientation: Nova orientação (quaternion) ou None
+            drone_index: Índice do drone na frota
         """
         if orientation is None:
             orientation = [0, 0, 0, 1]
         
         p.resetBasePositionAndOrientation(
-            self.drone_id,
+            self.drone_ids[drone_index],
             position.tolist(),
             orientation
         )
@@ -296,6 +303,7 @@ class DroneSimulator:
     def step_simulation(self):
         """Executa um passo da simulação."""
         p.stepSimulation()
+        self.sim_time += self.timestep
         self.update_drone_state()
     
     def update_point_visualization(self, point: DeliveryPoint, delivered: bool = False):
@@ -306,51 +314,82 @@ class DroneSimulator:
             point: Ponto de entrega
             delivered: Se foi entregue
         """
-        if hasattr(point, 'marker_id'):
-            if delivered:
-                # Mudar cor para verde quando entregue
-                p.changeVisualShape(
-                    point.marker_id,
-                    -1,
-                    rgbaColor=[0.0, 1.0, 0.0, 0.8]
-                )
+        self.update_points_visualization([point], delivered)
+    
+    def update_points_visualization(self, points: List[DeliveryPoint], delivered: bool = False):
+        """
+        Atualiza a cor de vários marcadores de uma vez.
+        
+        Com mais de um ponto a renderização fica pausada durante a troca de
+        cores, então a GUI redesenha uma vez só.
+        
+        Args:
+            points: Pontos de entrega
+            delivered: Se foram entregues (verde) ou não (vermelho)
+        """
+        if self.headless:
+            return
+        marker_ids = [point.marker_id for point in points if hasattr(point, 'marker_id')]
+        if not marker_ids:
+            return
+        color = self.MARKER_DELIVERED_COLOR if delivered else self.MARKER_PENDING_COLOR
+        with self._rendering_paused(len(marker_ids) > 1):
+            for marker_id in marker_ids:
+                p.changeVisualShape(marker_id, -1, rgbaColor=color)
+    
+    @contextmanager
+    def _rendering_paused(self, pause: bool = True):
+        """Suspende a renderização da GUI durante alterações em massa."""
+        if not pause:
+            yield
+            return
+        p.configureDebugVisualizer(p.COV_ENABLE_RENDERING, 0)
+        try:
+            yield
+        finally:
+            p.configureDebugVisualizer(p.COV_ENABLE_RENDERING, 1)
     
-    def draw_target_marker(self, target_pos: Optional[np.ndarray]):
+    def draw_target_marker(self, target_pos: Optional[np.ndarray], drone_index: int = 0):
         """
         Desenha marcador no alvo atual.
         
         Args:
             target_pos: Posição do alvo ou None
+            drone_index: Índice do drone na frota
         """
+        if self.headless:
+            return
         # Remover marcador anterior
-        if self.target_marker is not None:
-            p.removeUserDebugItem(self.target_marker)
-            self.target_marker = None
+        if self.target_markers.get(drone_index) is not None:
+            p.removeUserDebugItem(self.target_markers.pop(drone_index))
         
         if target_pos is not None:
             # Desenhar linha do drone ao alvo
             # Garantir que as posições sejam listas
-            pos_from = self.position.tolist() if hasattr(self.position, 'tolist') else list(self.position)
+            pos_from = self.positions[drone_index].tolist()
             pos_to = target_pos.tolist() if hasattr(target_pos, 'tolist') else list(target_pos)
-            self.target_marker = p.addUserDebugLine(
+            self.target_markers[drone_index] = p.addUserDebugLine(
                 pos_from,
                 pos_to,
                 lineColorRGB=[1.0, 1.0, 0.0],
                 lineWidth=3
             )
     
-    def draw_route(self, route: List[DeliveryPoint], current_pos: np.ndarray):
+    def draw_route(self, route: List[DeliveryPoint], current_pos: np.ndarray, drone_index: int = 0):
         """
         Desenha rota planejada.
         
         Args:
             route: Rota planejada
             current_pos: Posição atual do drone
+            drone_index: Índice do drone na frota
         """
+        if self.headless:
+            return
         # Remover linhas anteriores
-        for line_id in self.route_lines:
+        for line_id in self.route_lines.get(drone_index, []):
             p.removeUserDebugItem(line_id)
-        self.route_lines = []
+        route_lines = self.route_lines[drone_index] = []
         
         if not route:
             return
@@ -365,7 +404,7 @@ class DroneSimulator:
                 lineColorRGB=[0.0, 1.0, 1.0],
                 lineWidth=2
             )
-            self.route_lines.append(line_id)
+            route_lines.append(line_id)
         
         # Desenhar linhas entre pontos da rota
         for i in range(len(route) - 1):
@@ -377,7 +416,7 @@ class DroneSimulator:
                 lineColorRGB=[0.0, 1.0, 1.0],
                 lineWidth=2
             )
-            self.route_lines.append(line_id)
+            route_lines.append(line_id)
     
     def get_all_delivery_points(self) -> List[DeliveryPoint]:
         """Retorna todos os pontos de entrega."""
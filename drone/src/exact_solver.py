@@ -0,0 +1,86 @@
+"""
+Solução exata (Held-Karp) para conjuntos pequenos de pontos de entrega.
+"""
+import numpy as np
+from typing import List
+
+
+class HeldKarpSolver:
+    """
+    Programação dinâmica de Held-Karp sobre subconjuntos (bitmask).
+
+    Usa a mesma matriz de caminho do RoutePlanner: nó 0 é a posição inicial,
+    nós 1..n são os pontos e o último nó é o destino final (base ou nó
+    fictício de custo zero). Os subconjuntos de mesmo tamanho são
+    processados de uma vez com NumPy, então o custo em Python é O(n²)
+    operações vetorizadas; tempo e memória crescem com 2^n · n.
+    """
+
+    # Acima disso a tabela 2^n · n deixa de caber confortavelmente em memória
+    HARD_LIMIT = 16
+
+    def __init__(self, max_points: int = 12):
+        """
+        Inicializa o solver.
+
+        Args:
+            max_points: Maior número de pontos resolvido de forma exata
+        """
+        self.max_points = min(max_points, self.HARD_LIMIT)
+
+    def can_solve(self, num_points: int) -> bool:
+        """Indica se o número de pontos está dentro do limite do solver."""
+        return 0 < num_points <= self.max_points
+
+    def solve(self, dist: np.ndarray) -> List[int]:
+        """
+        Encontra a ordem ótima de visita.
+
+        Args:
+            dist: Matriz de distâncias do caminho (n+2, n+2)
+
+        Returns:
+            Sequência de nós [0, ..., n+1] com custo mínimo
+        """
+        n = dist.shape[0] - 2
+        if n <= 1:
+            return list(range(n + 2))
+
+        between = dist[1:n + 1, 1:n + 1]
+        from_start = dist[0, 1:n + 1]
+        to_end = dist[1:n + 1, n + 1]
+
+        full = 1 << n
+        masks = np.arange(full)
+        popcount = np.zeros(full, dtype=int)
+        for bit in range(n):
+            popcount += (masks >> bit) & 1
+
+        # cost[mask, j]: menor custo saindo do início, visitando mask e terminando em j
+        cost = np.full((full, n), np.inf)
+        parent = np.full((full, n), -1, dtype=np.int8)
+        singletons = 1 << np.arange(n)
+        cost[singletons, np.arange(n)] = from_start
+
+        for size in range(2, n + 1):
+            size_masks = masks[popcount == size]
+            for j in range(n):
+                with_j = size_masks[(size_masks >> j) & 1 == 1]
+                candidates = cost[with_j ^ (1 << j)] + between[:, j]
+                best = np.argmin(candidates, axis=1)
+                cost[with_j, j] = candidates[np.arange(len(with_j)), best]
+                parent[with_j, j] = best
+
+        last = int(np.argmin(cost[full - 1] + to_end))
+
+        # Reconstruir a ordem a partir do último ponto
+        order = []
+        mask = full - 1
+        while last >= 0:
+            order.append(last)
+            previous = int(parent[mask, last])
+            mask ^= 1 << last
+            last = previous
+        order.reverse()
+
+        return [0] + [j + 1 for j in order] + [n + 1]
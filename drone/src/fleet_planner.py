@@ -0,0 +1,127 @@
+"""
+Planejamento de rotas para uma frota de drones (agrupar primeiro, rotear depois).
+"""
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from src.route_planner import RoutePlanner
+from src.sensor import DeliveryPoint
+
+
+class FleetPlanner:
+    """
+    Divide os pontos detectados entre os drones e planeja cada sub-rota.
+
+    Os pontos são agrupados por k-means no plano XY, com os centróides
+    iniciados nas posições dos drones (o grupo k fica com o drone k). Cada
+    drone tem seu próprio RoutePlanner e as sub-rotas são planejadas em
+    paralelo.
+
+    O paralelismo é por threads e portanto limitado pelo GIL: só as
+    operações NumPy grandes (matriz de distâncias) rodam de fato em
+    paralelo; as buscas locais em Python puro se revezam, e o ganho sobre
+    planejar em série é pequeno. Um pool de processos exigiria copiar os
+    pontos a cada chamada e perderia o estado persistente de cada
+    RoutePlanner (matriz de distâncias e cache de planos), que é o que
+    torna o replanejamento incremental barato.
+    """
+
+    def __init__(self, config: dict, num_drones: int):
+        """
+        Inicializa o planejador da frota.
+
+        Args:
+            config: Configurações do planejamento (route_planning)
+            num_drones: Número de drones da frota
+        """
+        self.num_drones = num_drones
+        self.planners = [RoutePlanner(config) for _ in range(num_drones)]
+        self.kmeans_iterations = config.get('fleet_kmeans_iterations', 10)
+        self.executor = ThreadPoolExecutor(max_workers=num_drones, thread_name_prefix='fleet-planner')
+        self.replan_count = 0
+
+    def partition(
+        self,
+        points: List[DeliveryPoint],
+        drone_positions: np.ndarray,
+        pinned: Optional[Dict[int, DeliveryPoint]] = None
+    ) -> List[List[DeliveryPoint]]:
+        """
+        Agrupa os pontos não entregues por drone.
+
+        Args:
+            points: Pontos a distribuir
+            drone_positions: Array (n_drones, 3) com as posições atuais
+            pinned: Alvo atual de cada drone (fica com o mesmo drone)
+
+        Returns:
+            Lista com os pontos atribuídos a cada drone
+        """
+        pinned = pinned or {}
+        groups: List[List[DeliveryPoint]] = [[] for _ in range(self.num_drones)]
+        for drone_index, point in pinned.items():
+            if not point.delivered:
+                groups[drone_index].append(point)
+
+        pinned_ids = {p.id for p in pinned.values()}
+        free = [p for p in points if not p.delivered and p.id not in pinned_ids]
+        if not free:
+            return groups
+
+        xy = np.array([p.position[:2] for p in free])
+        centroids = np.asarray(drone_positions, dtype=float)[:, :2].copy()
+        for _ in range(self.kmeans_iterations):
+            sq_dist = ((xy[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+            labels = np.argmin(sq_dist, axis=1)
+            updated = centroids.copy()
+            for k in range(self.num_drones):
+                members = labels == k
+                if members.any():
+                    updated[k] = xy[members].mean(axis=0)
+            if np.allclose(updated, centroids):
+                break
+            centroids = updated
+
+        sq_dist = ((xy[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+        for point, label in zip(free, np.argmin(sq_dist, axis=1)):
+            groups[int(label)].append(point)
+        return groups
+
+    def plan(
+        self,
+        drone_positions: np.ndarray,
+        points: List[DeliveryPoint],
+        base_positions: np.ndarray,
+        pinned: Optional[Dict[int, DeliveryPoint]] = None
+    ) -> List[List[DeliveryPoint]]:
+        """
+        Planeja uma rota por drone.
+
+        Args:
+            drone_positions: Array (n_drones, 3) com as posições atuais
+            points: Pontos detectados não entregues
+            base_positions: Posição de retorno de cada drone
+            pinned: Alvo atual de cada drone
+
+        Returns:
+            Lista com a rota de cada drone
+        """
+        groups = self.partition(points, drone_positions, pinned)
+        futures = [
+            self.executor.submit(
+                planner.plan_route, drone_positions[i], groups[i], base_positions[i], True
+            )
+            for i, planner in enumerate(self.planners)
+        ]
+        self.replan_count += 1
+        return [future.result() for future in futures]
+
+    def mark_delivered(self, point: DeliveryPoint):
+        """Informa a todos os planejadores que um ponto foi entregue."""
+        for planner in self.planners:
+            planner.mark_delivered(point)
+
+    def shutdown(self):
+        """Encerra as threads de planejamento."""
+        self.executor.shutdown(wait=False)
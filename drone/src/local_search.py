@@ -0,0 +1,360 @@
+"""
+Busca local (2-opt e Or-opt) para melhoria de rotas.
+"""
+import time
+import numpy as np
+from typing import Callable, Dict, List, Optional
+
+from src.spatial_index import GridIndex
+
+# A partir deste número de nós, as listas de vizinhos vêm de um índice em grade
+# (abaixo disso particionar a matriz inteira ainda é mais rápido)
+GRID_NEIGHBORS_MIN_NODES = 2000
+
+
+class LocalSearchOptimizer:
+    """
+    Melhora rotas construídas com movimentos 2-opt e Or-opt.
+
+    Opera sobre uma matriz de distâncias de caminho em que o nó 0 é a
+    posição inicial do drone e o último nó é o destino final (base ou um
+    nó fictício de custo zero quando não há retorno). Ambos os extremos
+    permanecem fixos. Cada movimento é avaliado pela fórmula de variação de
+    custo (delta) e apenas os vizinhos mais próximos de cada nó são
+    considerados, o que torna cada passada subquadrática na prática.
+    """
+
+    def __init__(
+        self,
+        neighbor_count: int = 8,
+        max_segment_length: int = 3,
+        max_passes: int = 50,
+        seed: Optional[int] = 42
+    ):
+        """
+        Inicializa o otimizador.
+
+        Args:
+            neighbor_count: Tamanho da lista de vizinhos de cada nó
+            max_segment_length: Maior segmento movido pelo Or-opt
+            max_passes: Limite de passadas completas (2-opt + Or-opt)
+            seed: Semente das perturbações da busca com prazo (anytime)
+        """
+        self.neighbor_count = neighbor_count
+        self.max_segment_length = max_segment_length
+        self.max_passes = max_passes
+        self.epsilon = 1e-10
+        self.rng = np.random.default_rng(seed)
+
+    def build_neighbors(
+        self,
+        dist: np.ndarray,
+        open_end: bool = False,
+        positions: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Calcula as listas de vizinhos mais próximos (ordenadas por distância).
+
+        Sem posições, cada linha da matriz é particionada: O(n²) em tempo,
+        mais uma cópia n×n da matriz. Com as posições (e a partir de
+        GRID_NEIGHBORS_MIN_NODES nós), os candidatos saem de um GridIndex
+        (ver _grid_neighbors) e o custo fica perto de O(n·k).
+
+        Args:
+            dist: Matriz de distâncias do caminho
+            open_end: Se o último nó é fictício (sem retorno à base)
+            positions: Posições (n_nós, 3) dos nós; as distâncias da matriz
+                não podem ser menores que a distância horizontal entre elas
+
+        Returns:
+            Array (n_nós, k) com os índices dos vizinhos de cada nó
+        """
+        n_nodes = dist.shape[0]
+        k = min(self.neighbor_count, n_nodes - 1)
+        if positions is not None and n_nodes >= GRID_NEIGHBORS_MIN_NODES:
+            return self._grid_neighbors(dist, open_end, np.asarray(positions, dtype=float), k)
+
+        masked = dist.copy()
+        np.fill_diagonal(masked, np.inf)
+        if open_end:
+            # O nó fictício está a distância zero de todos e não é vizinho útil
+            masked[:, n_nodes - 1] = np.inf
+
+        neighbors = np.argpartition(masked, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(masked, neighbors, axis=1), axis=1)
+        return np.take_along_axis(neighbors, order, axis=1)
+
+    def _grid_neighbors(self, dist: np.ndarray, open_end: bool, positions: np.ndarray, k: int) -> np.ndarray:
+        """
+        Listas de vizinhos com candidatos do bloco 3×3 de células de cada nó.
+
+        Os nós de uma célula são comparados só com os do bloco em volta. O
+        resultado de um nó é exato quando o k-ésimo vizinho está mais perto
+        que a borda do bloco (nenhum nó de fora pode estar mais próximo);
+        os demais (regiões esparsas) usam a linha inteira da matriz.
+
+        Args:
+            dist: Matriz de distâncias do caminho
+            open_end: Se o último nó é fictício (sem retorno à base)
+            positions: Posições (n_nós, 3) dos nós
+            k: Tamanho das listas
+
+        Returns:
+            Array (n_nós, k) com os índices dos vizinhos de cada nó
+        """
+        n_nodes = dist.shape[0]
+        # O nó fictício não tem posição e fica fora do índice
+        n_real = n_nodes - 1 if open_end else n_nodes
+        xy = positions[:n_real, :2]
+        extent = np.maximum(xy.max(axis=0) - xy.min(axis=0), 1e-9)
+        # Células com ~k+1 nós em média (também para nós quase colineares)
+        cell_size = max(np.sqrt(extent.prod() * (k + 1) / n_real), extent.max() * (k + 1) / n_real)
+        index = GridIndex(cell_size)
+        index.build(positions[:n_real])
+
+        neighbors = np.empty((n_nodes, k), dtype=int)
+        full_rows = [n_nodes - 1] if open_end else []
+        for cell, members in index.occupied_cells():
+            block = index.query_block(cell)
+            if len(block) <= k:
+                full_rows.extend(members.tolist())
+                continue
+            sub = dist[np.ix_(members, block)]
+            sub[members[:, None] == block[None, :]] = np.inf
+            nearest = np.argpartition(sub, k - 1, axis=1)[:, :k]
+            nearest_dist = np.take_along_axis(sub, nearest, axis=1)
+            order = np.argsort(nearest_dist, axis=1)
+            nearest = np.take_along_axis(nearest, order, axis=1)
+
+            # Distância horizontal de cada nó à borda do bloco
+            low = (np.asarray(cell) - 1) * cell_size
+            high = (np.asarray(cell) + 2) * cell_size
+            margin = np.minimum(xy[members] - low, high - xy[members]).min(axis=1)
+            exact = nearest_dist.max(axis=1) <= margin
+            neighbors[members[exact]] = block[nearest[exact]]
+            full_rows.extend(members[~exact].tolist())
+
+        for node in full_rows:
+            row = dist[node].copy()
+            row[node] = np.inf
+            if open_end:
+                row[n_nodes - 1] = np.inf
+            nearest = np.argpartition(row, k - 1)[:k]
+            neighbors[node] = nearest[np.argsort(row[nearest])]
+        return neighbors
+
+    def improve(
+        self,
+        dist: np.ndarray,
+        tour: List[int],
+        open_end: bool = False,
+        deadline: Optional[float] = None,
+        neighbors: Optional[np.ndarray] = None,
+        positions: Optional[np.ndarray] = None
+    ) -> List[int]:
+        """
+        Aplica 2-opt e Or-opt até não haver melhoria.
+
+        Args:
+            dist: Matriz de distâncias do caminho
+            tour: Sequência de nós (tour[0] e tour[-1] são fixos)
+            open_end: Se o último nó é fictício (sem retorno à base)
+            deadline: Instante (time.monotonic()) em que a busca é interrompida
+            neighbors: Listas de vizinhos já calculadas (build_neighbors)
+            positions: Posições dos nós, para build_neighbors
+
+        Returns:
+            Sequência de nós melhorada
+        """
+        tour = list(tour)
+        if len(tour) < 4:
+            return tour
+
+        if neighbors is None:
+            neighbors = self.build_neighbors(dist, open_end, positions)
+        pos = np.empty(len(tour), dtype=int)
+        pos[tour] = np.arange(len(tour))
+
+        for _ in range(self.max_passes):
+            improved = self._two_opt_pass(tour, pos, dist, neighbors, deadline)
+            improved = self._or_opt_pass(tour, pos, dist, neighbors, deadline) or improved
+            if not improved or self._expired(deadline):
+                break
+
+        return tour
+
+    def improve_until(
+        self,
+        dist: np.ndarray,
+        tour: List[int],
+        deadline: float,
+        open_end: bool = False,
+        callback: Optional[Callable[[List[int], float], None]] = None,
+        positions: Optional[np.ndarray] = None
+    ) -> Dict:
+        """
+        Busca local iterada até o prazo (algoritmo anytime).
+
+        Leva a rota inicial a um ótimo local e, enquanto houver tempo,
+        perturba a melhor rota com um movimento double-bridge e a reotimiza,
+        mantendo sempre a melhor encontrada. Pode ser interrompida a qualquer
+        instante sem perder a rota inicial.
+
+        Args:
+            dist: Matriz de distâncias do caminho
+            tour: Sequência inicial de nós (tour[0] e tour[-1] são fixos)
+            deadline: Instante (time.monotonic()) limite da busca
+            open_end: Se o último nó é fictício (sem retorno à base)
+            callback: Chamado como callback(tour, comprimento) a cada melhoria,
+                inclusive com a rota inicial
+            positions: Posições dos nós, para build_neighbors
+
+        Returns:
+            Dicionário com 'tour' (melhor sequência), 'iterations',
+            'initial_length', 'best_length', 'elapsed' (s) e 'curve'
+            (lista de (tempo decorrido, comprimento) a cada melhoria)
+        """
+        start = time.monotonic()
+        best = list(tour)
+        best_length = self.tour_length(dist, best)
+        curve = [(0.0, best_length)]
+        stats = {'tour': best, 'iterations': 0, 'initial_length': best_length,
+                 'best_length': best_length, 'elapsed': 0.0, 'curve': curve}
+        if callback is not None:
+            callback(list(best), best_length)
+
+        if len(best) >= 4 and not self._expired(deadline):
+            neighbors = self.build_neighbors(dist, open_end, positions)
+            candidate = self.improve(dist, best, open_end, deadline, neighbors)
+            while True:
+                length = self.tour_length(dist, candidate)
+                if length < best_length - self.epsilon:
+                    best, best_length = candidate, length
+                    curve.append((time.monotonic() - start, best_length))
+                    if callback is not None:
+                        callback(list(best), best_length)
+                # Double-bridge precisa de pelo menos 3 nós internos
+                if len(best) < 5 or self._expired(deadline):
+                    break
+                stats['iterations'] += 1
+                candidate = self.improve(
+                    dist, self._double_bridge(best), open_end, deadline, neighbors
+                )
+
+        stats.update({'tour': best, 'best_length': best_length,
+                      'elapsed': time.monotonic() - start})
+        return stats
+
+    @staticmethod
+    def tour_length(dist: np.ndarray, tour: List[int]) -> float:
+        """Comprimento de uma sequência de nós."""
+        nodes = np.asarray(tour, dtype=int)
+        return float(dist[nodes[:-1], nodes[1:]].sum())
+
+    @staticmethod
+    def _expired(deadline: Optional[float]) -> bool:
+        return deadline is not None and time.monotonic() >= deadline
+
+    def _double_bridge(self, tour: List[int]) -> List[int]:
+        """Perturbação A B C D -> A C B D com extremos fixos."""
+        cuts = np.sort(self.rng.choice(np.arange(1, len(tour) - 1), size=3, replace=False))
+        p1, p2, p3 = (int(c) for c in cuts)
+        return tour[:p1] + tour[p2:p3] + tour[p1:p2] + tour[p3:]
+
+    def _two_opt_pass(self, tour: List[int], pos: np.ndarray, dist: np.ndarray,
+                      neighbors: np.ndarray, deadline: Optional[float] = None) -> bool:
+        """Uma passada 2-opt com listas de vizinhos. Retorna se houve melhoria."""
+        improved = False
+        last = len(tour) - 1
+
+        for i in range(last):
+            if deadline is not None and i % 64 == 0 and self._expired(deadline):
+                break
+            a = tour[i]
+            b = tour[i + 1]
+            d_ab = dist[a, b]
+
+            for c in neighbors[a]:
+                d_ac = dist[a, c]
+                if d_ac >= d_ab:
+                    # Vizinhos ordenados: nenhum outro reduz a aresta (a, b)
+                    break
+
+                j = pos[c]
+                if i + 1 < j < last:
+                    # Arestas (a, b), (c, d) -> (a, c), (b, d)
+                    d = tour[j + 1]
+                    delta = d_ac + dist[b, d] - d_ab - dist[c, d]
+                    lo, hi = i + 1, j
+                elif j <= i - 2:
+                    # Arestas (c, e), (a, b) -> (c, a), (e, b)
+                    e = tour[j + 1]
+                    delta = d_ac + dist[e, b] - d_ab - dist[c, e]
+                    lo, hi = j + 1, i
+                else:
+                    continue
+
+                if delta < -self.epsilon:
+                    tour[lo:hi + 1] = tour[lo:hi + 1][::-1]
+                    pos[tour[lo:hi + 1]] = np.arange(lo, hi + 1)
+                    improved = True
+                    break
+
+        return improved
+
+    def _or_opt_pass(self, tour: List[int], pos: np.ndarray, dist: np.ndarray,
+                     neighbors: np.ndarray, deadline: Optional[float] = None) -> bool:
+        """Uma passada Or-opt (move segmentos de 1 a max_segment_length nós)."""
+        improved = False
+
+        for seg_len in range(1, self.max_segment_length + 1):
+            i = 1
+            while i + seg_len <= len(tour) - 1:
+                if deadline is not None and i % 64 == 0 and self._expired(deadline):
+                    return improved
+                s_first = tour[i]
+                s_last = tour[i + seg_len - 1]
+                prev_node = tour[i - 1]
+                next_node = tour[i + seg_len]
+                remove_gain = (dist[prev_node, s_first] + dist[s_last, next_node]
+                               - dist[prev_node, next_node])
+                if remove_gain <= self.epsilon:
+                    i += 1
+                    continue
+
+                best_delta = -self.epsilon
+                best_move = None
+                for x in (s_first, s_last):
+                    for c in neighbors[x]:
+                        if dist[x, c] >= remove_gain:
+                            break
+                        pc = pos[c]
+                        # Arestas (pred(c), c) e (c, succ(c)) candidatas à inserção
+                        for q in (pc - 1, pc):
+                            if q < 0 or q >= len(tour) - 1 or i - 1 <= q <= i + seg_len - 1:
+                                continue
+                            u = tour[q]
+                            w = tour[q + 1]
+                            forward = dist[u, s_first] + dist[s_last, w] - dist[u, w]
+                            backward = dist[u, s_last] + dist[s_first, w] - dist[u, w]
+                            delta = min(forward, backward) - remove_gain
+                            if delta < best_delta:
+                                best_delta = delta
+                                best_move = (q, backward < forward)
+
+                if best_move is None:
+                    i += 1
+                    continue
+
+                q, reverse = best_move
+                segment = tour[i:i + seg_len]
+                if reverse:
+                    segment = segment[::-1]
+                del tour[i:i + seg_len]
+                insert_at = q + 1 if q < i else q - seg_len + 1
+                tour[insert_at:insert_at] = segment
+                pos[tour] = np.arange(len(tour))
+                improved = True
+                i += 1
+
+        return improved
@@ -4,7 +4,7 @@ Sistema de logging e integração com Node-RED.
 import json
 import time
 import logging
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from datetime import datetime
 import numpy as np
 import requests
@@ -108,13 +108,16 @@ class NodeRedLogger:
 class SimulationLogger:
     """Logger principal da simulação."""
     
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, clock: Optional[Callable[[], float]] = None):
         """
         Inicializa o logger da simulação.
         
         Args:
             config: Configurações de logging
+            clock: Relógio das métricas de tempo (padrão: time.time); use o
+                tempo simulado quando a física não roda em tempo real
         """
+        self.clock = clock or time.time
         # Configurar logging Python
         log_level = getattr(logging, config.get('level', 'INFO'))
         logging.basicConfig(
@@ -139,7 +142,7 @@ class SimulationLogger:
         
         # Métricas
         self.metrics = {
-            'start_time': time.time(),
+            'start_time': self.clock(),
             'total_distance': 0.0,
             'replan_count': 0,
             'points_detected': 0,
@@ -147,11 +150,27 @@ class SimulationLogger:
             'delivery_times': [],
             'replan_events': [],
             'detection_events': [],
-            'route_history': []
+            'route_history': [],
+            'plan_cache_hits': 0,
+            'plan_cache_misses': 0
         }
         
         self.last_position = None
         
+        # Métricas por drone (modo frota); as métricas acima são o agregado
+        self.drone_metrics: Dict[int, dict] = {}
+        
+    def _drone_metrics(self, drone_index: int) -> dict:
+        """Retorna (criando se necessário) as métricas de um drone da frota."""
+        if drone_index not in self.drone_metrics:
+            self.drone_metrics[drone_index] = {
+                'total_distance': 0.0,
+                'replan_count': 0,
+                'points_delivered': 0,
+                'last_position': None
+            }
+        return self.drone_metrics[drone_index]
+        
     def log_detection(self, point: DeliveryPoint, drone_pos: np.ndarray):
         """
         Registra detecção de um ponto.
@@ -160,7 +179,7 @@ class SimulationLogger:
             point: Ponto detectado
             drone_pos: Posição do drone no momento da detecção
         """
-        point.detection_time = time.time()
+        point.detection_time = self.clock()
         self.metrics['points_detected'] += 1
         
         event = {
@@ -180,18 +199,22 @@ class SimulationLogger:
                 'data': event
             })
     
-    def log_delivery(self, point: DeliveryPoint, drone_pos: np.ndarray):
+    def log_delivery(self, point: DeliveryPoint, drone_pos: np.ndarray,
+                     drone_index: Optional[int] = None):
         """
         Registra entrega em um ponto.
         
         Args:
             point: Ponto entregue
             drone_pos: Posição do drone
+            drone_index: Drone que fez a entrega (modo frota)
         """
-        point.delivery_time = time.time()
+        point.delivery_time = self.clock()
         self.metrics['points_delivered'] += 1
+        if drone_index is not None:
+            self._drone_metrics(drone_index)['points_delivered'] += 1
         
-        if point.detection_time:
+        if point.detection_time is not None:
             delivery_time = point.delivery_time - point.detection_time
             self.metrics['delivery_times'].append(delivery_time)
         
@@ -202,6 +225,8 @@ class SimulationLogger:
             'point_position': point.position.tolist(),
             'drone_position': drone_pos.tolist()
         }
+        if drone_index is not None:
+            event['drone_index'] = drone_index
         
         self.logger.info(f"Entrega concluída no ponto {point.id}")
         
@@ -211,15 +236,24 @@ class SimulationLogger:
                 'data': event
             })
     
-    def log_replan(self, route: List[DeliveryPoint], reason: str = "route_completion"):
+    def log_replan(self, route: List[DeliveryPoint], reason: str = "route_completion",
+                   drone_index: Optional[int] = None):
         """
         Registra replanejamento de rota.
         
+        No modo frota cada replanejamento gera uma rota por drone: aqui só
+        conta o replanejamento do drone, e o total vem do FleetPlanner
+        (update_fleet_replan_count), que conta cada replanejamento uma vez.
+        
         Args:
             route: Nova rota planejada
             reason: Razão do replanejamento
+            drone_index: Drone dono da rota (modo frota)
         """
-        self.metrics['replan_count'] += 1
+        if drone_index is not None:
+            self._drone_metrics(drone_index)['replan_count'] += 1
+        else:
+            self.metrics['replan_count'] += 1
         
         event = {
             'type': 'replan',
@@ -228,9 +262,14 @@ class SimulationLogger:
             'route_length': len(route),
             'route_points': [p.id for p in route]
         }
+        if drone_index is not None:
+            event['drone_index'] = drone_index
         
         self.metrics['replan_events'].append(event)
-        self.logger.info(f"Replanejamento #{self.metrics['replan_count']}: {len(route)} pontos")
+        if drone_index is not None:
+            self.logger.info(f"Replanejamento (drone {drone_index}): {len(route)} pontos")
+        else:
+            self.logger.info(f"Replanejamento #{self.metrics['replan_count']}: {len(route)} pontos")
         
         if self.node_red:
             self.node_red.send_data({
@@ -238,13 +277,64 @@ class SimulationLogger:
                 'data': event
             })
     
-    def update_distance(self, current_pos: np.ndarray):
+    def update_fleet_replan_count(self, count: int):
+        """
+        Atualiza o total de replanejamentos da frota.
+        
+        Args:
+            count: Replanejamentos feitos pelo FleetPlanner (um por chamada de plan)
+        """
+        self.metrics['replan_count'] = count
+    
+    def update_plan_cache_stats(self, hits: int, misses: int):
+        """
+        Atualiza contadores do cache de rotas do planejador.
+        
+        Args:
+            hits: Replanejamentos atendidos pelo cache
+            misses: Replanejamentos que precisaram planejar
+        """
+        self.metrics['plan_cache_hits'] = hits
+        self.metrics['plan_cache_misses'] = misses
+
+    def log_phase_timings(self, timings: Dict[str, dict], report: str, final: bool = False):
+        """
+        Registra a latência por fase do loop (PhaseTimer).
+
+        Args:
+            timings: Estatísticas por fase (PhaseTimer.summary)
+            report: Mesma informação formatada como tabela
+            final: Relatório de encerramento (acumulado) em vez de periódico
+        """
+        self.logger.info(("Latência por fase (total):\n" if final else "Latência por fase:\n") + report)
+
+        if self.node_red:
+            self.node_red.send_data({
+                'event': 'timing',
+                'data': {
+                    'timestamp': time.time(),
+                    'final': final,
+                    'phases': timings
+                }
+            })
+
+    def update_distance(self, current_pos: np.ndarray, drone_index: Optional[int] = None):
         """
         Atualiza distância total percorrida.
         
         Args:
             current_pos: Posição atual do drone
+            drone_index: Drone da frota (None = drone único)
         """
+        if drone_index is not None:
+            drone = self._drone_metrics(drone_index)
+            if drone['last_position'] is not None:
+                distance = np.linalg.norm(current_pos - drone['last_position'])
+                drone['total_distance'] += distance
+                self.metrics['total_distance'] += distance
+            drone['last_position'] = np.array(current_pos, dtype=float)
+            return
+        
         if self.last_position is not None:
             distance = np.linalg.norm(current_pos - self.last_position)
             self.metrics['total_distance'] += distance
@@ -257,7 +347,10 @@ class SimulationLogger:
         drone_vel: np.ndarray,
         target_pos: Optional[np.ndarray],
         route: List[DeliveryPoint],
-        detected_points: List[DeliveryPoint]
+        detected_points: Optional[List[DeliveryPoint]],
+        drone_index: Optional[int] = None,
+        detected_count: Optional[int] = None,
+        delivered_count: Optional[int] = None
     ):
         """
         Registra estado atual da simulação.
@@ -267,9 +360,16 @@ class SimulationLogger:
             drone_vel: Velocidade do drone
             target_pos: Posição alvo atual
             route: Rota planejada
-            detected_points: Pontos detectados
+            detected_points: Pontos detectados (ignorado se os contadores forem dados)
+            drone_index: Drone da frota (None = drone único)
+            detected_count: Total de pontos detectados (ex.: MissionState)
+            delivered_count: Total de pontos entregues (ex.: MissionState)
         """
-        self.update_distance(drone_pos)
+        self.update_distance(drone_pos, drone_index)
+        if detected_count is None:
+            detected_count = len(detected_points)
+        if delivered_count is None:
+            delivered_count = sum(1 for p in detected_points if p.delivered)
         
         state = {
             'timestamp': time.time(),
@@ -277,9 +377,11 @@ class SimulationLogger:
             'drone_velocity': drone_vel.tolist() if hasattr(drone_vel, 'tolist') else list(drone_vel),
             'target_position': target_pos.tolist() if target_pos is not None else None,
             'route_length': len(route),
-            'detected_points_count': len(detected_points),
-            'delivered_points_count': sum(1 for p in detected_points if p.delivered)
+            'detected_points_count': detected_count,
+            'delivered_points_count': delivered_count
         }
+        if drone_index is not None:
+            state['drone_index'] = drone_index
         
         if self.node_red:
             metrics = self.get_metrics_summary()
@@ -295,7 +397,7 @@ class SimulationLogger:
     
     def get_metrics_summary(self) -> dict:
         """Retorna resumo das métricas."""
-        elapsed_time = time.time() - self.metrics['start_time']
+        elapsed_time = self.clock() - self.metrics['start_time']
         avg_delivery_time = (
             np.mean(self.metrics['delivery_times'])
             if self.metrics['delivery_times'] else 0.0
@@ -308,7 +410,17 @@ class SimulationLogger:
             'points_detected': self.metrics['points_detected'],
             'points_delivered': self.metrics['points_delivered'],
             'avg_delivery_time': avg_delivery_time,
-            'efficiency': self._calculate_efficiency()
+            'efficiency': self._calculate_efficiency(),
+            'plan_cache_hits': self.metrics['plan_cache_hits'],
+            'plan_cache_misses': self.metrics['plan_cache_misses'],
+            'drones': {
+                index: {
+                    'total_distance': drone['total_distance'],
+                    'replan_count': drone['replan_count'],
+                    'points_delivered': drone['points_delivered']
+                }
+                for index, drone in sorted(self.drone_metrics.items())
+            }
         }
     
     def _calculate_efficiency(self) -> float:
@@ -341,7 +453,7 @@ class SimulationLogger:
         
         # 3. Eficiência de tempo (10% do peso)
         # Tempo ideal estimado: 2s por ponto (configuração padrão)
-        elapsed_time = time.time() - self.metrics['start_time']
+        elapsed_time = self.clock() - self.metrics['start_time']
         estimated_ideal_time = num_points * 2.0
         if elapsed_time == 0:
             time_efficiency = 0.0
@@ -374,5 +486,11 @@ class SimulationLogger:
         self.logger.info(f"Pontos entregues: {summary['points_delivered']}")
         self.logger.info(f"Tempo médio por entrega: {summary['avg_delivery_time']:.2f}s")
         self.logger.info(f"Eficiência: {summary['efficiency']:.2%}")
+        self.logger.info(f"Cache de rotas: {summary['plan_cache_hits']} acertos / {summary['plan_cache_misses']} falhas")
+        for index, drone in summary['drones'].items():
+            self.logger.info(
+                f"Drone {index}: {drone['points_delivered']} entregas, "
+                f"{drone['total_distance']:.2f}m, {drone['replan_count']} replanejamentos"
+            )
         self.logger.info("=" * 50)
 
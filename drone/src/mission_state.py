@@ -0,0 +1,100 @@
+"""
+Estado da missão mantido por eventos de detecção e entrega.
+"""
+from typing import Callable, Dict, List
+
+from src.sensor import DeliveryPoint
+
+
+class MissionState:
+    """
+    Contadores e conjuntos da missão atualizados incrementalmente.
+
+    Em vez de varrer pontos e rotas a cada passo, o loop principal informa
+    detecções (on_detected) e entregas (on_delivered); as consultas de
+    término e de replanejamento passam a ser O(1). Interessados podem se
+    inscrever (subscribe) para receber cada mudança como
+    callback(evento, ponto), com evento 'detected' ou 'delivered'.
+    """
+
+    def __init__(self, total_points: int):
+        """
+        Inicializa o estado.
+
+        Args:
+            total_points: Número total de pontos de entrega da missão
+        """
+        self.total_points = total_points
+        self.detected_count = 0
+        self.delivered_count = 0
+        self.undelivered: Dict[int, DeliveryPoint] = {}
+        self._detected_ids = set()
+        self._delivered_ids = set()
+        self._route_ids = set()
+        self._route_pending = 0
+        self._listeners: List[Callable[[str, DeliveryPoint], None]] = []
+
+    def subscribe(self, callback: Callable[[str, DeliveryPoint], None]):
+        """Registra um callback chamado a cada detecção/entrega."""
+        self._listeners.append(callback)
+
+    def _publish(self, event: str, point: DeliveryPoint):
+        for callback in self._listeners:
+            callback(event, point)
+
+    def on_detected(self, point: DeliveryPoint) -> bool:
+        """
+        Registra a detecção de um ponto.
+
+        Returns:
+            True se o ponto não havia sido detectado antes
+        """
+        if point.id in self._detected_ids:
+            return False
+        self._detected_ids.add(point.id)
+        self.detected_count += 1
+        if point.id not in self._delivered_ids:
+            self.undelivered[point.id] = point
+        self._publish('detected', point)
+        return True
+
+    def on_delivered(self, point: DeliveryPoint) -> bool:
+        """
+        Registra a entrega de um ponto.
+
+        Returns:
+            True se o ponto ainda não havia sido entregue
+        """
+        if point.id in self._delivered_ids:
+            return False
+        self._delivered_ids.add(point.id)
+        self.delivered_count += 1
+        self.undelivered.pop(point.id, None)
+        if point.id in self._route_ids:
+            self._route_pending -= 1
+        self._publish('delivered', point)
+        return True
+
+    def set_route(self, route: List[DeliveryPoint]):
+        """Define a rota atual (para saber em O(1) se ela foi concluída)."""
+        self._route_ids = {p.id for p in route}
+        self._route_pending = len(self._route_ids - self._delivered_ids)
+
+    @property
+    def route_complete(self) -> bool:
+        """Indica se todos os pontos da rota atual foram entregues."""
+        return self._route_pending <= 0
+
+    @property
+    def has_undelivered(self) -> bool:
+        """Indica se há pontos detectados ainda não entregues."""
+        return bool(self.undelivered)
+
+    @property
+    def all_delivered(self) -> bool:
+        """Indica se todos os pontos da missão foram entregues."""
+        return self.delivered_count >= self.total_points
+
+    def undelivered_points(self) -> List[DeliveryPoint]:
+        """Retorna os pontos detectados não entregues (ordem de detecção)."""
+        return list(self.undelivered.values())
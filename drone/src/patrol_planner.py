@@ -0,0 +1,199 @@
+"""
+Padrões de patrulha de cobertura (zigue-zague / espiral) para descobrir pontos.
+"""
+import numpy as np
+from typing import Optional, Sequence
+
+
+class PatrolPlanner:
+    """
+    Varredura pré-calculada de uma área retangular.
+
+    O espaçamento entre faixas vem do raio de detecção: a pegada do sensor
+    no chão tem raio sqrt(r² - h²) para o drone a uma altura h acima dos
+    pontos, e faixas vizinhas se sobrepõem em `overlap`. Uma grade de
+    cobertura registra o que o sensor já viu; a patrulha retoma do ponto
+    em que parou (após entregas) e pula trechos já varridos.
+    """
+
+    PATTERNS = ('lawnmower', 'spiral')
+
+    def __init__(
+        self,
+        bounds: Sequence[float],
+        detection_radius: float,
+        altitude: float,
+        ground_z: float = 0.1,
+        pattern: str = 'lawnmower',
+        overlap: float = 0.1,
+        start_pos: Optional[np.ndarray] = None,
+        waypoint_tolerance: float = 2.0
+    ):
+        """
+        Inicializa a patrulha.
+
+        Args:
+            bounds: Área a cobrir [x_min, x_max, y_min, y_max]
+            detection_radius: Raio de detecção do sensor (3D)
+            altitude: Altura de voo da patrulha
+            ground_z: Altura dos pontos de entrega
+            pattern: 'lawnmower' (zigue-zague) ou 'spiral' (espiral retangular)
+            overlap: Fração de sobreposição entre faixas vizinhas
+            start_pos: Posição inicial do drone (escolhe o canto de partida)
+            waypoint_tolerance: Distância horizontal para considerar um waypoint atingido
+        """
+        if pattern not in self.PATTERNS:
+            raise ValueError(f"Padrão de patrulha desconhecido: {pattern}")
+
+        self.bounds = np.asarray(bounds, dtype=float)
+        self.altitude = altitude
+        self.pattern = pattern
+        self.waypoint_tolerance = waypoint_tolerance
+
+        height = abs(altitude - ground_z)
+        if height >= detection_radius:
+            raise ValueError("Altura de patrulha fora do alcance do sensor")
+        self.footprint = float(np.sqrt(detection_radius ** 2 - height ** 2))
+        self.lane_spacing = 2.0 * self.footprint * (1.0 - overlap)
+
+        # Grade de cobertura (células de um quarto de faixa)
+        self.cell_size = self.lane_spacing / 4.0
+        x_min, x_max, y_min, y_max = self.bounds
+        shape = (
+            max(1, int(np.ceil((x_max - x_min) / self.cell_size))),
+            max(1, int(np.ceil((y_max - y_min) / self.cell_size)))
+        )
+        self.swept = np.zeros(shape, dtype=bool)
+        cx = x_min + (np.arange(shape[0]) + 0.5) * self.cell_size
+        cy = y_min + (np.arange(shape[1]) + 0.5) * self.cell_size
+        self._cell_centers = (cx, cy)
+
+        self.waypoints = self._build_waypoints(start_pos)
+        self.current = 0
+        self.completed_sweeps = 0
+
+    def _build_waypoints(self, start_pos: Optional[np.ndarray]) -> np.ndarray:
+        """Gera os waypoints (n, 3), começando pelo canto mais próximo do drone."""
+        x_min, x_max, y_min, y_max = self.bounds
+        center = np.array([(x_min + x_max) / 2.0, (y_min + y_max) / 2.0])
+        width, height = x_max - x_min, y_max - y_min
+        # Nas curvas o drone pode passar a até waypoint_tolerance do waypoint
+        corner_reach = max(self.footprint - self.waypoint_tolerance, 0.0)
+
+        if self.pattern == 'lawnmower':
+            # Faixas de largura igual (<= lane_spacing), cada uma varrida pelo seu centro
+            num_lanes = max(1, int(np.ceil(height / self.lane_spacing)))
+            band = height / num_lanes
+            ys = -height / 2.0 + (np.arange(num_lanes) + 0.5) * band
+            # Recuo nas pontas tal que a pegada ainda alcance os cantos de cada faixa
+            half_w = max(0.0, width / 2.0 - np.sqrt(max(corner_reach ** 2 - (band / 2.0) ** 2, 0.0)))
+            xy = []
+            for lane, y in enumerate(ys):
+                xs = (-half_w, half_w) if lane % 2 == 0 else (half_w, -half_w)
+                xy.extend([(xs[0], y), (xs[1], y)])
+            xy = np.array(xy)
+        else:
+            # Retângulos concêntricos de fora para dentro; o recuo do primeiro
+            # permite que a pegada alcance os cantos da área
+            s = self.lane_spacing
+            inset = corner_reach * np.sqrt(0.5)
+            w = max(0.0, width / 2.0 - inset)
+            h = max(0.0, height / 2.0 - inset)
+            xy = []
+            while True:
+                xy.extend([(-w, -h), (w, -h), (w, h), (-w, h)])
+                if w - s < 0 or h - s < 0:
+                    break
+                xy.append((-w, -h + s))
+                w -= s
+                h -= s
+            # Faixa central que sobra dentro do último retângulo
+            if w >= h:
+                xy.extend([(-w, 0.0), (w, 0.0)])
+            else:
+                xy.extend([(0.0, -h), (0.0, h)])
+            xy = np.array(xy)
+
+        # Espelhar o padrão para partir do canto mais próximo
+        if start_pos is not None:
+            start = np.asarray(start_pos, dtype=float)[:2] - center
+            flips = [np.array([sx, sy]) for sx in (1, -1) for sy in (1, -1)]
+            best = min(flips, key=lambda f: np.linalg.norm(xy[0] * f - start))
+            xy = xy * best
+
+        xy = xy + center
+        return np.column_stack((xy, np.full(len(xy), self.altitude)))
+
+    def mark_swept(self, drone_pos: np.ndarray):
+        """
+        Marca como vistas as células sob a pegada do sensor.
+
+        Args:
+            drone_pos: Posição atual do drone
+        """
+        x_min, _, y_min, _ = self.bounds
+        cx, cy = self._cell_centers
+        x, y = float(drone_pos[0]), float(drone_pos[1])
+        reach = self.footprint - self.cell_size * np.sqrt(0.5)
+        if reach <= 0:
+            return
+
+        i0 = max(0, int((x - reach - x_min) / self.cell_size))
+        i1 = min(len(cx), int((x + reach - x_min) / self.cell_size) + 1)
+        j0 = max(0, int((y - reach - y_min) / self.cell_size))
+        j1 = min(len(cy), int((y + reach - y_min) / self.cell_size) + 1)
+        if i0 >= i1 or j0 >= j1:
+            return
+
+        # Célula vista por inteiro: o centro está a até (pegada - meia diagonal)
+        dx = cx[i0:i1, None] - x
+        dy = cy[None, j0:j1] - y
+        self.swept[i0:i1, j0:j1] |= dx * dx + dy * dy <= reach * reach
+
+    def _segment_swept(self, index: int) -> bool:
+        """Indica se a faixa que termina no waypoint `index` já foi toda vista."""
+        if index == 0:
+            return False
+        if index >= len(self.waypoints):
+            return True
+        x_min, _, y_min, _ = self.bounds
+        a = self.waypoints[index - 1, :2]
+        b = self.waypoints[index, :2]
+        samples = max(2, int(np.ceil(np.linalg.norm(b - a) / self.cell_size)) + 1)
+        pts = a + np.linspace(0.0, 1.0, samples)[:, None] * (b - a)
+        i = np.clip(((pts[:, 0] - x_min) / self.cell_size).astype(int), 0, self.swept.shape[0] - 1)
+        j = np.clip(((pts[:, 1] - y_min) / self.cell_size).astype(int), 0, self.swept.shape[1] - 1)
+        return bool(self.swept[i, j].all())
+
+    @property
+    def coverage(self) -> float:
+        """Fração da área já vista pelo sensor (aproximada pela grade)."""
+        return float(self.swept.mean())
+
+    def next_waypoint(self, drone_pos: np.ndarray) -> np.ndarray:
+        """
+        Retorna o waypoint de patrulha a seguir.
+
+        Avança ao atingir o waypoint atual e pula faixas já varridas. Ao fim
+        da varredura, recomeça com a cobertura zerada.
+
+        Args:
+            drone_pos: Posição atual do drone
+
+        Returns:
+            Posição alvo [x, y, z]
+        """
+        if np.linalg.norm(drone_pos[:2] - self.waypoints[self.current, :2]) < self.waypoint_tolerance:
+            self.current += 1
+
+        # Waypoint dispensável: as faixas que chegam e saem dele já foram vistas
+        while (self.current < len(self.waypoints) and
+               self._segment_swept(self.current) and self._segment_swept(self.current + 1)):
+            self.current += 1
+
+        if self.current >= len(self.waypoints):
+            self.completed_sweeps += 1
+            self.swept[:] = False
+            self.current = 0
+
+        return self.waypoints[self.current].copy()
@@ -0,0 +1,164 @@
+"""
+Medição da latência de cada fase do loop principal da simulação.
+"""
+import time
+import numpy as np
+from typing import Dict, Optional
+
+# Limites dos baldes do histograma (ns): 100 ns a 100 s, 24 por década (~10% de resolução)
+BUCKET_EDGES_NS = np.unique(np.round(np.logspace(2, 11, 9 * 24 + 1)).astype(np.int64))
+
+# Nome da "fase" com a duração do passo inteiro
+STEP_PHASE = 'step'
+
+
+class PhaseTimer:
+    """
+    Cronômetro por fase do loop (física, sensor, planejamento, controle, ...).
+
+    Cada passo do loop é delimitado por start()/stop(); lap(fase) atribui à
+    fase o tempo desde a marca anterior (relógio monotônico
+    time.perf_counter_ns). Uma fase marcada várias vezes no mesmo passo
+    (ex.: uma vez por drone da frota) soma os trechos. A cada passo o tempo
+    de cada fase vira uma amostra; as amostras ficam em listas e são
+    despejadas em lote (NumPy) em histogramas de baldes logarítmicos, então
+    a memória não cresce com a duração da simulação.
+
+    Desabilitado, start/lap/stop são funções vazias: o custo no loop é o de
+    uma chamada sem efeito.
+    """
+
+    def __init__(self, enabled: bool = True, budget: Optional[float] = None, buffer_size: int = 4096):
+        """
+        Inicializa o cronômetro.
+
+        Args:
+            enabled: Se falso, nenhuma medição é feita
+            budget: Orçamento de tempo por passo (s), ex.: o timestep de 1/240 s
+            buffer_size: Amostras acumuladas por fase antes de ir ao histograma
+        """
+        self.enabled = enabled
+        self.budget_ns = int(budget * 1e9) if budget else None
+        self.buffer_size = buffer_size
+        self._clock = time.perf_counter_ns
+        self._mark = 0
+        self._step_start = 0
+        self._current: Dict[str, int] = {}
+        self._samples: Dict[str, list] = {}
+        # Por fase: histogramas acumulado e da janela atual, contagem, soma, máximo e estouros
+        self._total: Dict[str, dict] = {}
+        self._window: Dict[str, dict] = {}
+
+        if not enabled:
+            self.start = self.lap = self.stop = _noop
+
+    def start(self):
+        """Marca o início de um passo do loop."""
+        self._step_start = self._mark = self._clock()
+
+    def lap(self, phase: str):
+        """Atribui a `phase` o tempo decorrido desde a última marca."""
+        now = self._clock()
+        current = self._current
+        current[phase] = current.get(phase, 0) + now - self._mark
+        self._mark = now
+
+    def stop(self):
+        """Fecha o passo: registra uma amostra por fase e a duração do passo."""
+        now = self._clock()
+        current = self._current
+        current[STEP_PHASE] = now - self._step_start
+        for phase, elapsed in current.items():
+            samples = self._samples.get(phase)
+            if samples is None:
+                samples = self._samples[phase] = []
+            samples.append(elapsed)
+            if len(samples) >= self.buffer_size:
+                self._flush(phase)
+        current.clear()
+        self._mark = now
+
+    def _flush(self, phase: str):
+        """Despeja as amostras pendentes de uma fase nos histogramas."""
+        samples = np.array(self._samples[phase], dtype=np.int64)
+        self._samples[phase].clear()
+        if not len(samples):
+            return
+        counts = np.bincount(np.searchsorted(BUCKET_EDGES_NS, samples, side='right'),
+                             minlength=len(BUCKET_EDGES_NS) + 1)
+        over = int(np.count_nonzero(samples > self.budget_ns)) if self.budget_ns else 0
+        for stats in (self._total, self._window):
+            entry = stats.get(phase)
+            if entry is None:
+                entry = stats[phase] = {
+                    'histogram': np.zeros(len(BUCKET_EDGES_NS) + 1, dtype=np.int64),
+                    'count': 0, 'sum': 0, 'max': 0, 'over_budget': 0
+                }
+            entry['histogram'] += counts
+            entry['count'] += len(samples)
+            entry['sum'] += int(samples.sum())
+            entry['max'] = max(entry['max'], int(samples.max()))
+            entry['over_budget'] += over
+
+    def summary(self, window: bool = False) -> Dict[str, dict]:
+        """
+        Estatísticas de latência por fase (em milissegundos).
+
+        Args:
+            window: Se verdadeiro, só as amostras desde o último summary(window=True)
+                (e a janela é reiniciada); senão, desde o início
+
+        Returns:
+            {fase: {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms, share,
+            over_budget}}, com a fase 'step' (passo inteiro) por último; share
+            é a fração do tempo dos passos gasta na fase e over_budget a fração
+            de passos em que a fase sozinha passou do orçamento
+        """
+        for phase in list(self._samples):
+            self._flush(phase)
+        stats = self._window if window else self._total
+        step_total = stats[STEP_PHASE]['sum'] if STEP_PHASE in stats else 0
+
+        result = {}
+        phases = [p for p in stats if p != STEP_PHASE] + ([STEP_PHASE] if STEP_PHASE in stats else [])
+        for phase in phases:
+            entry = stats[phase]
+            count = entry['count']
+            result[phase] = {
+                'count': count,
+                'mean_ms': entry['sum'] / count / 1e6,
+                'p50_ms': self._percentile(entry, 0.50) / 1e6,
+                'p95_ms': self._percentile(entry, 0.95) / 1e6,
+                'p99_ms': self._percentile(entry, 0.99) / 1e6,
+                'max_ms': entry['max'] / 1e6,
+                'share': entry['sum'] / step_total if step_total else 0.0,
+                'over_budget': entry['over_budget'] / count if self.budget_ns else None
+            }
+        if window:
+            self._window = {}
+        return result
+
+    @staticmethod
+    def _percentile(entry: dict, q: float) -> float:
+        """Percentil pelo histograma: limite superior do balde (no máximo o máximo observado)."""
+        cumulative = np.cumsum(entry['histogram'])
+        bucket = int(np.searchsorted(cumulative, q * entry['count']))
+        if bucket >= len(BUCKET_EDGES_NS):
+            return float(entry['max'])
+        return float(min(BUCKET_EDGES_NS[bucket], entry['max']))
+
+    def format_report(self, summary: Dict[str, dict]) -> str:
+        """Tabela de texto com as estatísticas de summary()."""
+        lines = [f"{'Fase':<10} {'passos':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'máx':>8} "
+                 f"{'% tempo':>8} {'> orçam.':>8}  (ms)"]
+        for phase, s in summary.items():
+            over = f"{s['over_budget']:.2%}" if s['over_budget'] is not None else '-'
+            lines.append(f"{phase:<10} {s['count']:>8} {s['p50_ms']:>8.3f} {s['p95_ms']:>8.3f} "
+                         f"{s['p99_ms']:>8.3f} {s['max_ms']:>8.3f} {s['share']:>8.1%} {over:>8}")
+        if self.budget_ns:
+            lines.append(f"Orçamento por passo: {self.budget_ns / 1e6:.3f} ms")
+        return "\n".join(lines)
+
+
+def _noop(*args):
+    """Substitui start/lap/stop quando o cronômetro está desabilitado."""
@@ -1,12 +1,24 @@
 """
 Controlador PID para estabilização do drone.
 """
+import math
 import numpy as np
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+
+def _clip_inplace(values: np.ndarray, low, high) -> np.ndarray:
+    """np.clip(values, low, high, out=values) sem o custo do wrapper de np.clip."""
+    np.maximum(values, low, out=values)
+    return np.minimum(values, high, out=values)
 
 
 class PIDController:
-    """Controlador PID para controle de posição e atitude."""
+    """
+    Controlador PID para controle de posição e atitude.
+    
+    O estado e os termos intermediários ficam em buffers pré-alocados: uma
+    atualização não cria arrays (além da saída, se `out` não for passado).
+    """
     
     def __init__(self, kp: List[float], ki: List[float], kd: List[float]):
         """
@@ -17,55 +29,58 @@ class PIDController:
             ki: Ganhos integrais
             kd: Ganhos derivativos
         """
-        self.kp = np.array(kp)
-        self.ki = np.array(ki)
-        self.kd = np.array(kd)
+        self.kp = np.array(kp, dtype=float)
+        self.ki = np.array(ki, dtype=float)
+        self.kd = np.array(kd, dtype=float)
         
         self.integral = np.zeros(3)
         self.last_error = np.zeros(3)
         self.last_time = None
+        self._term = np.zeros(3)
         
-    def update(self, error: np.ndarray, dt: float) -> np.ndarray:
+    def update(self, error: np.ndarray, dt: float, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Atualiza o controlador e retorna o sinal de controle.
         
         Args:
             error: Erro atual [x, y, z] ou [roll, pitch, yaw]
             dt: Intervalo de tempo desde a última atualização
+            out: Array (3,) onde gravar o sinal (evita alocar a saída)
             
         Returns:
-            Sinal de controle calculado
+            Sinal de controle calculado (o próprio `out`, se passado)
         """
-        error = np.array(error)
+        if out is None:
+            out = np.empty(3)
+        term = self._term
         
         # Termo proporcional
-        p_term = self.kp * error
+        np.multiply(self.kp, error, out=out)
         
         # Termo integral (com anti-windup)
-        self.integral += error * dt
+        np.multiply(error, dt, out=term)
+        self.integral += term
         # Limitação do integral para evitar windup
-        self.integral = np.clip(self.integral, -10.0, 10.0)
-        i_term = self.ki * self.integral
+        _clip_inplace(self.integral, -10.0, 10.0)
+        np.multiply(self.ki, self.integral, out=term)
+        out += term
         
         # Termo derivativo
         if self.last_time is not None and dt > 0:
-            derivative = (error - self.last_error) / dt
-        else:
-            derivative = np.zeros(3)
-        d_term = self.kd * derivative
-        
-        # Sinal de controle total
-        control = p_term + i_term + d_term
+            np.subtract(error, self.last_error, out=term)
+            term *= self.kd
+            term /= dt
+            out += term
         
-        self.last_error = error
+        self.last_error[:] = error
         self.last_time = (self.last_time or 0) + dt
         
-        return control
+        return out
     
     def reset(self):
         """Reseta o estado do controlador."""
-        self.integral = np.zeros(3)
-        self.last_error = np.zeros(3)
+        self.integral[:] = 0.0
+        self.last_error[:] = 0.0
         self.last_time = None
 
 
@@ -95,13 +110,21 @@ class DroneController:
         # Multiplicador de velocidade (para reduzir velocidade durante patrulha)
         self.speed_multiplier = 1.0
         
+        # Buffers reutilizados a cada chamada de compute_control
+        self._pos_error = np.zeros(3)
+        self._vel_error = np.zeros(3)
+        self._desired_velocity = np.zeros(3)
+        self._att_error = np.zeros(3)
+        
     def compute_control(
         self,
         current_pos: np.ndarray,
         target_pos: np.ndarray,
         current_vel: np.ndarray,
         current_attitude: np.ndarray,
-        dt: float
+        dt: float,
+        target_vel: Optional[np.ndarray] = None,
+        target_acc: Optional[np.ndarray] = None
     ) -> Tuple[np.ndarray, np.ndarray]:
         """
         Calcula os comandos de controle do drone.
@@ -112,53 +135,63 @@ class DroneController:
             current_vel: Velocidade atual [vx, vy, vz]
             current_attitude: Atitude atual [roll, pitch, yaw]
             dt: Intervalo de tempo
+            target_vel: Velocidade de referência da trajetória (feed-forward)
+            target_acc: Aceleração de referência da trajetória (feed-forward)
             
         Returns:
             Tupla (força_thrust, torque) para aplicar ao drone
         """
         # Erro de posição
-        pos_error = target_pos - current_pos
+        pos_error = np.subtract(target_pos, current_pos, out=self._pos_error)
         
         # Controle de posição (gera velocidade desejada)
-        desired_velocity = self.position_pid.update(pos_error, dt)
+        desired_velocity = self.position_pid.update(pos_error, dt, out=self._desired_velocity)
         
         # Aplicar multiplicador de velocidade (para reduzir durante patrulha)
-        desired_velocity = desired_velocity * self.speed_multiplier
+        # e reduzir 50% para suavizar o movimento
+        desired_velocity *= self.speed_multiplier * 0.5
         
-        # Limitação de velocidade (com suavização)
-        # Reduzir velocidade desejada para movimento mais suave
-        desired_velocity = desired_velocity * 0.5  # Reduzir 50% para suavizar mais
+        # Trajetória: o PID apenas corrige em torno da velocidade de referência
+        if target_vel is not None:
+            desired_velocity += target_vel
         
         # Limitação de velocidade
-        desired_velocity = np.clip(
-            desired_velocity,
-            -self.max_velocity,
-            self.max_velocity
-        )
+        _clip_inplace(desired_velocity, -self.max_velocity, self.max_velocity)
         
         # Erro de velocidade
-        vel_error = desired_velocity - current_vel
+        vel_error = np.subtract(desired_velocity, current_vel, out=self._vel_error)
+        
+        # Daqui em diante os cálculos são escalares (floats, sem arrays temporários)
+        error_x, error_y, altitude_error = pos_error.tolist()
+        vel_error_x, vel_error_y, vel_z_error = vel_error.tolist()
+        desired_vx, desired_vy, _ = desired_velocity.tolist()
         
         # Calcular forças horizontais diretamente baseadas no erro de posição e velocidade
         # Usar controle proporcional-derivativo para movimento suave
         kp_pos = 2.0  # Ganho proporcional de posição (reduzido ainda mais)
         kd_vel = 1.5  # Ganho derivativo de velocidade (reduzido)
         
-        force_x = pos_error[0] * kp_pos + vel_error[0] * kd_vel
-        force_y = pos_error[1] * kp_pos + vel_error[1] * kd_vel
+        force_x = error_x * kp_pos + vel_error_x * kd_vel
+        force_y = error_y * kp_pos + vel_error_y * kd_vel
+        
+        # Massa do drone (usada no feed-forward e no thrust)
+        mass = 1.0
+        if target_acc is not None:
+            force_x += mass * target_acc[0]
+            force_y += mass * target_acc[1]
         
         # Limitar forças horizontais (reduzido significativamente)
         max_horizontal_force = 4.0  # Reduzido para movimento muito mais controlado
-        force_x = np.clip(force_x, -max_horizontal_force, max_horizontal_force)
-        force_y = np.clip(force_y, -max_horizontal_force, max_horizontal_force)
+        force_x = min(max(force_x, -max_horizontal_force), max_horizontal_force)
+        force_y = min(max(force_y, -max_horizontal_force), max_horizontal_force)
         
         # CORREÇÃO: Controle de atitude melhorado - sempre tenta manter drone plano
         # Quando não há movimento significativo, força roll e pitch a zero
-        if np.linalg.norm(desired_velocity[:2]) > 0.2:
+        speed_xy = math.sqrt(desired_vx * desired_vx + desired_vy * desired_vy)
+        if speed_xy > 0.2:
             # Há movimento: permite inclinação leve para direção do movimento
-            direction = desired_velocity[:2] / np.linalg.norm(desired_velocity[:2])
-            desired_roll = -direction[1] * 0.15  # CORREÇÃO: Inclinação reduzida (0.15 ao invés de 0.3)
-            desired_pitch = direction[0] * 0.15   # CORREÇÃO: Inclinação reduzida
+            desired_roll = -desired_vy / speed_xy * 0.15  # CORREÇÃO: Inclinação reduzida (0.15 ao invés de 0.3)
+            desired_pitch = desired_vx / speed_xy * 0.15   # CORREÇÃO: Inclinação reduzida
         else:
             # Sem movimento: força roll e pitch a zero para manter plano
             desired_roll = 0.0
@@ -166,17 +199,22 @@ class DroneController:
         
         # CORREÇÃO: Yaw FIXO - não rotaciona, mantém orientação inicial
         # O drone não precisa rotacionar para se mover, pode usar forças horizontais
-        desired_yaw = current_attitude[2]  # SEMPRE mantém yaw atual (não muda)
+        roll, pitch, yaw = current_attitude[0], current_attitude[1], current_attitude[2]
+        desired_yaw = yaw  # SEMPRE mantém yaw atual (não muda)
         
-        # Atitude desejada
-        desired_attitude = np.array([desired_roll, desired_pitch, desired_yaw])
-        att_error = desired_attitude - current_attitude
+        # Erro de atitude
+        yaw_error = desired_yaw - yaw
         
         # CORREÇÃO: Normaliza erro de yaw
-        while att_error[2] > np.pi:
-            att_error[2] -= 2 * np.pi
-        while att_error[2] < -np.pi:
-            att_error[2] += 2 * np.pi
+        while yaw_error > math.pi:
+            yaw_error -= 2 * math.pi
+        while yaw_error < -math.pi:
+            yaw_error += 2 * math.pi
+        
+        att_error = self._att_error
+        att_error[0] = desired_roll - roll
+        att_error[1] = desired_pitch - pitch
+        att_error[2] = yaw_error
         
         # Controle de atitude
         torque = self.attitude_pid.update(att_error, dt)
@@ -187,11 +225,10 @@ class DroneController:
         
         # CORREÇÃO: Limita torque para evitar rotações descontroladas
         max_torque = 15.0  # Limite de torque
-        torque = np.clip(torque, -max_torque, max_torque)
+        _clip_inplace(torque, -max_torque, max_torque)
         
         # Força vertical (thrust) baseado na altitude desejada
         # Controle simples e direto
-        mass = 1.0  # Massa do drone
         gravity = 9.81  # Gravidade (m/s²)
         
         # Força base para compensar gravidade (sempre aplicar)
@@ -201,18 +238,17 @@ class DroneController:
         kp_alt = 12.0  # Ganho proporcional de altitude (reduzido)
         kd_vel_z = 8.0  # Ganho derivativo de velocidade vertical (reduzido)
         
-        altitude_error = pos_error[2]
-        vel_z_error = vel_error[2]
-        
         # Thrust: base (hover) + correção proporcional + amortecimento
         # A base já compensa a gravidade, então adicionamos correções
         thrust_correction = altitude_error * kp_alt + vel_z_error * kd_vel_z
         thrust = base_thrust + thrust_correction
+        if target_acc is not None:
+            thrust += mass * target_acc[2]
         
         # Limitar thrust (garantir mínimo para não cair)
         min_thrust = mass * gravity * 0.8  # Mínimo: 80% da gravidade (não pode cair)
         max_thrust = mass * gravity * 4.0   # Máximo: 4x a gravidade
-        thrust = np.clip(thrust, min_thrust, max_thrust)
+        thrust = min(max(thrust, min_thrust), max_thrust)
         
         # Força total: horizontal (X, Y) + vertical (Z)
         force = np.array([force_x, force_y, thrust])
@@ -234,3 +270,193 @@ class DroneController:
         self.attitude_pid.reset()
         self.speed_multiplier = 1.0
 
+
+
+class PIDBank:
+    """
+    K controladores PID independentes atualizados em uma única chamada.
+    
+    Mesmas regras de PIDController.update, com ganhos e estado em arrays
+    (K, 3) e todos os termos calculados em buffers pré-alocados.
+    """
+    
+    def __init__(self, kp, ki, kd, num_controllers: int):
+        """
+        Inicializa o banco.
+        
+        Args:
+            kp: Ganhos proporcionais, (3,) comuns a todos ou (K, 3) por controlador
+            ki: Ganhos integrais, (3,) ou (K, 3)
+            kd: Ganhos derivativos, (3,) ou (K, 3)
+            num_controllers: Número K de controladores
+        """
+        shape = (num_controllers, 3)
+        self.kp = np.broadcast_to(np.asarray(kp, dtype=float), shape).copy()
+        self.ki = np.broadcast_to(np.asarray(ki, dtype=float), shape).copy()
+        self.kd = np.broadcast_to(np.asarray(kd, dtype=float), shape).copy()
+        
+        self.integral = np.zeros(shape)
+        self.last_error = np.zeros(shape)
+        self.started = np.zeros(num_controllers, dtype=bool)
+        self._term = np.zeros(shape)
+    
+    def update(self, error: np.ndarray, dt: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Atualiza os K controladores.
+        
+        Args:
+            error: Erros atuais (K, 3)
+            dt: Intervalo de tempo desde a última atualização
+            out: Array (K, 3) onde gravar os sinais (evita alocar a saída)
+            
+        Returns:
+            Sinais de controle (K, 3) (o próprio `out`, se passado)
+        """
+        if out is None:
+            out = np.empty_like(self.integral)
+        term = self._term
+        
+        np.multiply(self.kp, error, out=out)
+        
+        np.multiply(error, dt, out=term)
+        self.integral += term
+        _clip_inplace(self.integral, -10.0, 10.0)
+        np.multiply(self.ki, self.integral, out=term)
+        out += term
+        
+        # Derivativo só para quem já tem erro anterior
+        if dt > 0:
+            np.subtract(error, self.last_error, out=term)
+            term *= self.kd
+            term /= dt
+            if not self.started.all():
+                term[~self.started] = 0.0
+            out += term
+        
+        self.last_error[:] = error
+        self.started[:] = True
+        return out
+    
+    def reset(self, mask: Optional[np.ndarray] = None):
+        """
+        Reseta o estado dos controladores.
+        
+        Args:
+            mask: Controladores a resetar (índices ou máscara booleana); None = todos
+        """
+        index = slice(None) if mask is None else mask
+        self.integral[index] = 0.0
+        self.last_error[index] = 0.0
+        self.started[index] = False
+
+
+class BatchDroneController:
+    """
+    DroneController vetorizado: calcula força e torque de N drones por chamada.
+    
+    Segue passo a passo DroneController.compute_control; os ganhos PID
+    podem ser diferentes para cada drone (varredura de parâmetros).
+    """
+    
+    def __init__(self, config: dict, num_drones: int):
+        """
+        Inicializa o controlador.
+        
+        Args:
+            config: Configurações do controle, como em DroneController; cada
+                ganho em config['pid'] pode ser (3,) ou (N, 3)
+            num_drones: Número N de drones
+        """
+        pid_pos = config['pid']['position']
+        pid_att = config['pid']['attitude']
+        
+        self.position_pid = PIDBank(
+            pid_pos['kp'], pid_pos['ki'], pid_pos['kd'], num_drones
+        )
+        self.attitude_pid = PIDBank(
+            pid_att['kp'], pid_att['ki'], pid_att['kd'], num_drones
+        )
+        
+        self.max_velocity = config.get('max_velocity', 5.0)
+        self.max_acceleration = config.get('max_acceleration', 2.0)
+        self.speed_multiplier = 1.0
+        
+        # Buffers (N, 3) reutilizados a cada chamada de compute_control
+        self._pos_error = np.zeros((num_drones, 3))
+        self._vel_error = np.zeros((num_drones, 3))
+        self._desired_velocity = np.zeros((num_drones, 3))
+        self._att_error = np.zeros((num_drones, 3))
+    
+    def compute_control(
+        self,
+        current_pos: np.ndarray,
+        target_pos: np.ndarray,
+        current_vel: np.ndarray,
+        current_attitude: np.ndarray,
+        dt: float,
+        target_vel: Optional[np.ndarray] = None,
+        target_acc: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calcula os comandos de controle dos N drones.
+        
+        Args:
+            current_pos: Posições atuais (N, 3)
+            target_pos: Posições alvo (N, 3)
+            current_vel: Velocidades atuais (N, 3)
+            current_attitude: Atitudes atuais (N, 3) [roll, pitch, yaw]
+            dt: Intervalo de tempo
+            target_vel: Velocidades de referência (N, 3) ou None
+            target_acc: Acelerações de referência (N, 3) ou None
+            
+        Returns:
+            Tupla (forças, torques), cada uma (N, 3)
+        """
+        mass = 1.0
+        gravity = 9.81
+        pos_error = np.subtract(target_pos, current_pos, out=self._pos_error)
+        
+        desired_velocity = self.position_pid.update(pos_error, dt, out=self._desired_velocity)
+        desired_velocity *= self.speed_multiplier * 0.5
+        if target_vel is not None:
+            desired_velocity += target_vel
+        _clip_inplace(desired_velocity, -self.max_velocity, self.max_velocity)
+        
+        vel_error = np.subtract(desired_velocity, current_vel, out=self._vel_error)
+        
+        # Forças horizontais (PD em posição e velocidade) + feed-forward
+        force = np.multiply(pos_error, 2.0)
+        force[:, :2] += vel_error[:, :2] * 1.5
+        if target_acc is not None:
+            force[:, :2] += mass * target_acc[:, :2]
+        _clip_inplace(force[:, :2], -4.0, 4.0)
+        
+        # Inclinação leve na direção do movimento; plano quando parado
+        speed_xy = np.sqrt(np.einsum('ij,ij->i', desired_velocity[:, :2], desired_velocity[:, :2]))
+        scale = np.divide(0.15, speed_xy, out=np.zeros_like(speed_xy), where=speed_xy > 0.2)
+        att_error = self._att_error
+        np.multiply(desired_velocity[:, 1], -scale, out=att_error[:, 0])
+        np.multiply(desired_velocity[:, 0], scale, out=att_error[:, 1])
+        att_error[:, :2] -= current_attitude[:, :2]
+        att_error[:, 2] = 0.0  # Yaw desejado = yaw atual
+        
+        torque = self.attitude_pid.update(att_error, dt)
+        torque[:, 2] = 0.0
+        _clip_inplace(torque, -15.0, 15.0)
+        
+        # Thrust: hover + correção de altitude + amortecimento vertical
+        thrust = force[:, 2]
+        np.multiply(pos_error[:, 2], 12.0, out=thrust)
+        thrust += vel_error[:, 2] * 8.0
+        thrust += mass * gravity
+        if target_acc is not None:
+            thrust += mass * target_acc[:, 2]
+        _clip_inplace(thrust, mass * gravity * 0.8, mass * gravity * 4.0)
+        
+        return force, torque
+    
+    def reset(self):
+        """Reseta os controladores."""
+        self.position_pid.reset()
+        self.attitude_pid.reset()
+        self.speed_multiplier = 1.0
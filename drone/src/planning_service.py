@@ -0,0 +1,167 @@
+"""
+Serviço de planejamento de rotas assíncrono.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+import numpy as np
+
+from src.route_planner import RoutePlanner
+from src.sensor import DeliveryPoint
+
+
+class PlanningService:
+    """
+    Executa o planejamento de rotas em uma thread de fundo.
+
+    O loop principal envia pedidos com submit() e continua voando a rota
+    atual; poll() devolve, sem bloquear, a rota do pedido mais recente
+    assim que ela fica pronta. Cada pedido recebe um número de geração e
+    resultados de pedidos superados por um mais novo são descartados.
+    """
+
+    def __init__(self, planner: RoutePlanner):
+        """
+        Inicializa o serviço.
+
+        Args:
+            planner: Planejador usado exclusivamente pela thread de fundo
+        """
+        self.planner = planner
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='route-planner')
+        self.generation = 0
+        self.applied_generation = 0
+        self.discarded_count = 0
+        # Se a última rota entregue por poll() veio do cache do planejador
+        self.last_result_cached = False
+        self._in_flight: List[Future] = []
+        # Alterações do planejador vindas do loop principal, aplicadas pela
+        # thread de fundo antes de cada planejamento (por id: sem duplicatas)
+        self._new_points: Dict[int, DeliveryPoint] = {}
+        self._delivered: Dict[int, DeliveryPoint] = {}
+        self._pending_lock = threading.Lock()
+        # Ids já enviados a register_points (lido e escrito só pelo loop principal)
+        self._registered_ids = set()
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        """Indica se há pedido ainda não concluído ou com resultado não lido por poll()."""
+        return bool(self._in_flight)
+
+    def register_points(self, points: List[DeliveryPoint]):
+        """
+        Agenda o registro de pontos recém-detectados no planejador.
+
+        O registro é feito pela thread de fundo antes do próximo
+        planejamento, para que apenas ela altere a matriz de distâncias.
+        Pontos já registrados são ignorados.
+        """
+        new_points = [p for p in points if p.id not in self._registered_ids]
+        if not new_points:
+            return
+        with self._pending_lock:
+            for point in new_points:
+                self._new_points[point.id] = point
+        self._registered_ids.update(p.id for p in new_points)
+
+    def mark_delivered(self, point: DeliveryPoint):
+        """
+        Agenda a baixa de um ponto entregue no planejador.
+
+        Como o registro, é aplicada pela thread de fundo antes do próximo
+        planejamento (a baixa pode compactar a matriz de distâncias).
+        """
+        with self._pending_lock:
+            self._delivered[point.id] = point
+
+    def _apply_pending(self):
+        """Aplica ao planejador os registros e entregas pendentes (thread de fundo)."""
+        with self._pending_lock:
+            points, self._new_points = list(self._new_points.values()), {}
+            delivered, self._delivered = list(self._delivered.values()), {}
+        self.planner.register_points(points)
+        for point in delivered:
+            self.planner.mark_delivered(point)
+
+    def submit(
+        self,
+        current_pos: np.ndarray,
+        current_route: List[DeliveryPoint],
+        new_points: List[DeliveryPoint],
+        base_pos: Optional[np.ndarray] = None
+    ) -> Future:
+        """
+        Envia um pedido de replanejamento.
+
+        Args:
+            current_pos: Posição atual do drone
+            current_route: Rota sendo executada
+            new_points: Pontos a incorporar (ver RoutePlanner.replan_route)
+            base_pos: Posição da base
+
+        Returns:
+            Future com a tupla (geração, rota, veio_do_cache)
+        """
+        self.generation += 1
+
+        # Pedidos ainda na fila já estão obsoletos
+        for future in self._in_flight:
+            future.cancel()
+
+        future = self.executor.submit(
+            self._plan,
+            self.generation,
+            np.array(current_pos, dtype=float),
+            list(current_route),
+            list(new_points),
+            None if base_pos is None else np.array(base_pos, dtype=float)
+        )
+        self._in_flight.append(future)
+        return future
+
+    def _plan(self, generation, current_pos, current_route, new_points, base_pos):
+        """Executa um pedido na thread de fundo."""
+        with self._lock:
+            self._apply_pending()
+            route = self.planner.replan_route(current_pos, current_route, new_points, base_pos)
+            cached = self.planner.last_plan_cached
+        return generation, route, cached
+
+    def poll(self) -> Optional[List[DeliveryPoint]]:
+        """
+        Retorna a rota mais recente concluída, se houver (não bloqueia).
+
+        Returns:
+            Nova rota ou None se nenhum resultado novo estiver pronto
+        """
+        done = [future for future in self._in_flight if future.done()]
+        if not done:
+            return None
+        self._in_flight = [future for future in self._in_flight if future not in done]
+
+        latest = None
+        cached = False
+        for future in done:
+            if future.cancelled():
+                self.discarded_count += 1
+                continue
+            generation, route, cached = future.result()
+            if generation != self.generation:
+                # Existe pedido mais novo: este resultado está obsoleto
+                self.discarded_count += 1
+                continue
+            latest = route
+
+        if latest is None:
+            return None
+
+        self.applied_generation = self.generation
+        self.last_result_cached = cached
+        return [p for p in latest if not p.delivered]
+
+    def shutdown(self):
+        """Encerra a thread de planejamento sem esperar pedidos pendentes."""
+        for future in self._in_flight:
+            future.cancel()
+        self.executor.shutdown(wait=False)
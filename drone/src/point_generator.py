@@ -0,0 +1,199 @@
+"""
+Geração dos pontos de entrega (independente do backend de simulação).
+"""
+import logging
+import numpy as np
+from typing import Optional
+
+from src.sensor import DeliveryPointStore
+
+SAMPLING_METHODS = ('poisson', 'rejection')
+
+# Até SPARSE_DENSITY · área / spacing² pontos a amostragem de Poisson sorteia
+# pontos avulsos (custo proporcional aos pontos); acima, preenche a área em
+# grade (custo proporcional à área, que então tem < 4x num_points células).
+# Um preenchimento maximal tem ~0.68 pontos por spacing²
+SPARSE_DENSITY = 0.5
+
+
+def generate_delivery_points(config: dict, seed: Optional[int] = None) -> DeliveryPointStore:
+    """
+    Sorteia os pontos de entrega da área com espaçamento mínimo.
+
+    Args:
+        config: Configurações do ambiente (seção environment)
+        seed: Semente do gerador (padrão: environment.point_seed, ou 42)
+
+    Returns:
+        Store com as posições dos pontos (z = 0.1, no chão)
+    """
+    area_size = config['area_size']
+    num_points = config['num_delivery_points']
+    spacing = config.get('point_spacing', 5.0)
+    method = config.get('point_sampling', 'poisson')
+    if seed is None:
+        seed = config.get('point_seed', 42)
+
+    if method == 'poisson':
+        xy = poisson_disk_sample(area_size, spacing, num_points, seed)
+    elif method == 'rejection':
+        xy = rejection_sample(area_size, spacing, num_points, seed)
+    else:
+        raise ValueError(f"Método de amostragem desconhecido: {method}")
+
+    if len(xy) < num_points:
+        logging.warning(
+            f"Só {len(xy)} de {num_points} pontos cabem na área com espaçamento {spacing}m"
+        )
+    return DeliveryPointStore.from_positions(np.column_stack((xy, np.full(len(xy), 0.1))))
+
+
+def rejection_sample(area_size, spacing: float, num_points: int, seed: int = 42) -> np.ndarray:
+    """
+    Sorteio com rejeição (até 100 tentativas por ponto, O(n²)).
+
+    Mantido para reproduzir os cenários gerados antes da amostragem de Poisson.
+
+    Returns:
+        Array (m, 2) com m <= num_points posições
+    """
+    rng = np.random.RandomState(seed)
+    points = np.empty((num_points, 2))
+    count = 0
+
+    for _ in range(num_points):
+        # Distribuir pontos de forma que não fiquem muito próximos
+        for _ in range(100):
+            x = rng.uniform(-area_size[0] / 2, area_size[0] / 2)
+            y = rng.uniform(-area_size[1] / 2, area_size[1] / 2)
+            pos = np.array([x, y])
+
+            # Verificar distância mínima dos outros pontos
+            if not np.any(np.linalg.norm(points[:count] - pos, axis=1) < spacing):
+                points[count] = pos
+                count += 1
+                break
+
+    return points[:count]
+
+
+def poisson_disk_sample(area_size, spacing: float, num_points: int, seed: int = 42,
+                        attempts: int = 30) -> np.ndarray:
+    """
+    Amostragem de disco de Poisson acelerada por grade.
+
+    Poucos pontos para a área (até SPARSE_DENSITY · área / spacing²) são
+    sorteados um a um contra uma grade esparsa (dicionário de células), com
+    custo proporcional a num_points e independente do tamanho da área.
+
+    Caso contrário, preenche a área com um conjunto (quase) maximal de
+    pontos a pelo menos `spacing` uns dos outros, em tempo linear na área
+    (que nesse caso é no máximo proporcional a num_points): a grade de Bridson
+    tem células de spacing/√2 (no máximo um ponto por célula) e cada
+    candidato é comparado só com a vizinhança 5x5 da sua célula. Em vez de
+    crescer a partir de uma lista ativa, ponto a ponto, as células são
+    divididas em 25 fases (i mod 5, j mod 5): células da mesma fase estão
+    a mais de 2·spacing umas das outras, então todas as células vazias de
+    uma fase recebem e testam um candidato de uma vez, em NumPy.
+
+    Do conjunto gerado são sorteados num_points pontos, o que preserva o
+    espaçamento e espalha os pontos pela área toda.
+
+    Args:
+        area_size: Tamanho da área [largura, altura], centrada na origem
+        spacing: Distância mínima entre pontos (m)
+        num_points: Número de pontos desejado
+        seed: Semente do gerador
+        attempts: Candidatos sorteados por célula vazia
+
+    Returns:
+        Array (m, 2) com m = min(num_points, pontos que couberam)
+    """
+    rng = np.random.default_rng(seed)
+    width, height = float(area_size[0]), float(area_size[1])
+    if num_points <= 0:
+        return np.empty((0, 2))
+    if spacing <= 0:
+        return rng.uniform((-width / 2, -height / 2), (width / 2, height / 2), (num_points, 2))
+
+    cell = spacing / np.sqrt(2.0)
+    if num_points <= SPARSE_DENSITY * width * height / (spacing * spacing):
+        return _dart_throw_sample(width, height, spacing, num_points, rng, attempts)
+
+    nx, ny = int(np.ceil(width / cell)), int(np.ceil(height / cell))
+    # Grade com borda de 2 células: a vizinhança 5x5 nunca sai do array
+    grid = np.full((nx + 4, ny + 4), -1, dtype=np.int64)
+    offsets = np.array([(i, j) for i in range(-2, 3) for j in range(-2, 3)])
+    points = np.zeros((nx * ny, 2))
+    spacing_sq = spacing * spacing
+
+    ix, iy = np.meshgrid(np.arange(nx), np.arange(ny), indexing='ij')
+    ix, iy = ix.ravel(), iy.ravel()
+    phase = (ix % 5) * 5 + iy % 5
+    phases = [(ix[phase == k], iy[phase == k]) for k in range(25)]
+    count = 0
+
+    for _ in range(attempts):
+        for k in rng.permutation(25):
+            cx, cy = phases[k]
+            empty = grid[cx + 2, cy + 2] < 0
+            cx, cy = cx[empty], cy[empty]
+            if not len(cx):
+                continue
+
+            # Um candidato uniforme dentro de cada célula vazia (coordenadas em [0, largura))
+            cand = (np.column_stack((cx, cy)) + rng.random((len(cx), 2))) * cell
+            neighbors = grid[cx[:, None] + 2 + offsets[:, 0], cy[:, None] + 2 + offsets[:, 1]]
+            delta = points[neighbors] - cand[:, None, :]
+            close = (neighbors >= 0) & (np.einsum('ijk,ijk->ij', delta, delta) < spacing_sq)
+            ok = (cand[:, 0] < width) & (cand[:, 1] < height) & ~close.any(axis=1)
+
+            ids = np.arange(count, count + np.count_nonzero(ok))
+            points[ids] = cand[ok]
+            grid[cx[ok] + 2, cy[ok] + 2] = ids
+            count += len(ids)
+
+    chosen = rng.permutation(count)[:num_points]
+    return points[chosen] - (width / 2.0, height / 2.0)
+
+
+def _dart_throw_sample(width: float, height: float, spacing: float, num_points: int,
+                       rng: np.random.Generator, attempts: int) -> np.ndarray:
+    """
+    Sorteio de pontos avulsos contra uma grade esparsa (área pouco ocupada).
+
+    Cada candidato uniforme é comparado só com os pontos da vizinhança 5x5
+    da sua célula (spacing/√2); as células ocupadas ficam em um dicionário,
+    então a memória é O(num_points). Desiste após attempts × num_points
+    candidatos.
+
+    Returns:
+        Array (m, 2) com m <= num_points posições, centradas na origem
+    """
+    cell = spacing / np.sqrt(2.0)
+    spacing_sq = spacing * spacing
+    grid = {}
+    points = []
+    remaining = attempts * num_points
+
+    while len(points) < num_points and remaining > 0:
+        batch = min(remaining, 2 * (num_points - len(points)) + 16)
+        remaining -= batch
+        for x, y in rng.random((batch, 2)) * (width, height):
+            i, j = int(x / cell), int(y / cell)
+            ok = True
+            for di in range(-2, 3):
+                for dj in range(-2, 3):
+                    other = grid.get((i + di, j + dj))
+                    if other is not None and (other[0] - x) ** 2 + (other[1] - y) ** 2 < spacing_sq:
+                        ok = False
+                        break
+                if not ok:
+                    break
+            if ok:
+                grid[(i, j)] = (x, y)
+                points.append((x, y))
+                if len(points) == num_points:
+                    break
+
+    return np.array(points, dtype=float).reshape(-1, 2) - (width / 2.0, height / 2.0)
@@ -0,0 +1,291 @@
+"""
+Backend de dinâmica em NumPy puro (sem PyBullet) para o drone de entregas.
+"""
+import numpy as np
+from typing import List, Optional
+
+from src.sensor import DeliveryPoint, DeliveryPointStore
+from src.point_generator import generate_delivery_points
+
+# Estabilização de atitude aplicada pelo simulador (mesmos ganhos do DroneSimulator)
+KP_TILT = 50.0            # Correção de roll/pitch
+KD_TILT = 15.0            # Amortecimento de roll/pitch
+KD_YAW = 50.0             # Amortecimento de yaw (substitui o torque de yaw)
+MAX_TILT_TORQUE = 20.0
+MAX_YAW_TORQUE = 50.0
+MIN_THRUST_RATIO = 0.9    # Empuxo mínimo como fração do peso
+
+INERTIA = 0.1             # Inércia (diagonal) do quadrotor simplificado
+LINEAR_DAMPING = 0.1      # Mesmo amortecimento do corpo no PyBullet
+ANGULAR_DAMPING = 1.5
+GROUND_CLEARANCE = 0.05   # Meia altura do corpo (não atravessa o chão)
+
+# Ω(ω) tal que dq/dt = ½ Ω(ω) q para ω no referencial do mundo e q = [x, y, z, w];
+# Ω é linear em ω, então Ω = ω @ _OMEGA_BASIS (reformatado para 4x4)
+_OMEGA_BASIS = np.array([
+    [[0, 0, 0, 1], [0, 0, -1, 0], [0, 1, 0, 0], [-1, 0, 0, 0]],
+    [[0, 0, 1, 0], [0, 0, 0, 1], [-1, 0, 0, 0], [0, -1, 0, 0]],
+    [[0, -1, 0, 0], [1, 0, 0, 0], [0, 0, 0, 1], [0, 0, -1, 0]],
+], dtype=float).reshape(3, 16)
+
+
+# Conversão quaternion -> Euler como combinação linear dos produtos q_a·q_b:
+# colunas = [sen roll, cos roll, sen pitch, sen yaw, cos yaw] (não normalizados)
+_EULER_A = np.array([3, 1, 3, 0, 0, 1, 2, 3, 2])  # w y w x x y z w z
+_EULER_B = np.array([0, 2, 2, 1, 0, 1, 2, 1, 0])  # x z z y x y z y x
+_EULER_MIX = np.zeros((9, 5))
+_EULER_MIX[[0, 1], 0] = 2.0     # 2(wx + yz)
+_EULER_MIX[[4, 5], 1] = -2.0    # 1 - 2(xx + yy)
+_EULER_MIX[7, 2] = 2.0          # 2(wy - zx)
+_EULER_MIX[8, 2] = -2.0
+_EULER_MIX[[2, 3], 3] = 2.0     # 2(wz + xy)
+_EULER_MIX[[5, 6], 4] = -2.0    # 1 - 2(yy + zz)
+_EULER_OFFSET = np.array([0.0, 1.0, 0.0, 0.0, 1.0])
+
+
+def parse_timestep(value) -> float:
+    """Converte simulation.timestep (número ou expressão como "1/240") em segundos."""
+    if isinstance(value, str):
+        numerator, _, denominator = value.partition('/')
+        return float(numerator) / float(denominator or 1.0)
+    return float(value)
+
+
+def quaternion_to_euler(quaternions: np.ndarray) -> np.ndarray:
+    """
+    Converte quaternions [x, y, z, w] em ângulos (roll, pitch, yaw).
+
+    Args:
+        quaternions: Array (N, 4)
+
+    Returns:
+        Array (N, 3), na mesma convenção de p.getEulerFromQuaternion
+    """
+    q = np.asarray(quaternions, dtype=float)
+    terms = (q[:, _EULER_A] * q[:, _EULER_B]) @ _EULER_MIX + _EULER_OFFSET
+    eulers = np.arctan2(terms[:, [0, 2, 3]], terms[:, [1, 1, 4]])
+    eulers[:, 1] = np.arcsin(np.clip(terms[:, 2], -1.0, 1.0))
+    return eulers
+
+
+def stabilize_control(forces: np.ndarray, torques: np.ndarray, eulers: np.ndarray,
+                      angular_velocities: np.ndarray, min_thrust: float):
+    """
+    Correção de atitude e empuxo mínimo do simulador, para N drones.
+
+    Mantém roll/pitch em zero, amortece o yaw e impede que a força vertical
+    fique abaixo de min_thrust (as entradas não são modificadas).
+
+    Args:
+        forces: Forças (N, 3) pedidas pelo controlador
+        torques: Torques (N, 3) pedidos pelo controlador
+        eulers: Ângulos (N, 3) atuais
+        angular_velocities: Velocidades angulares (N, 3) atuais
+        min_thrust: Força vertical mínima (N)
+
+    Returns:
+        Tupla (forças, torques) efetivamente aplicados
+    """
+    forces = np.array(forces, dtype=float)
+    torques = np.array(torques, dtype=float)
+    torques[:, :2] += -eulers[:, :2] * KP_TILT - angular_velocities[:, :2] * KD_TILT
+    torques[:, :2] = np.clip(torques[:, :2], -MAX_TILT_TORQUE, MAX_TILT_TORQUE)
+    torques[:, 2] = np.clip(-angular_velocities[:, 2] * KD_YAW, -MAX_YAW_TORQUE, MAX_YAW_TORQUE)
+    np.maximum(forces[:, 2], min_thrust, out=forces[:, 2])
+    return forces, torques
+
+
+class RigidBodyIntegrator:
+    """
+    Integrador semi-implícito de N corpos rígidos com inércia isotrópica.
+
+    O amortecimento segue o do PyBullet para corpos multibody: força
+    -m·v·d·(1 + |v|) e torque -I·ω·d·(1 + |ω|). O chão é um plano em z = 0.
+    """
+
+    def __init__(self, mass: float, gravity: float, timestep: float):
+        """
+        Inicializa o integrador.
+
+        Args:
+            mass: Massa de cada drone (kg)
+            gravity: Gravidade em z (m/s², negativa)
+            timestep: Passo de integração (s)
+        """
+        self.mass = mass
+        self.gravity = np.array([0.0, 0.0, gravity])
+        self.timestep = timestep
+
+    def step(self, positions: np.ndarray, velocities: np.ndarray, orientations: np.ndarray,
+             angular_velocities: np.ndarray, forces: np.ndarray, torques: np.ndarray):
+        """
+        Avança um passo (os arrays de estado são atualizados no lugar).
+
+        Args:
+            positions: Posições (N, 3)
+            velocities: Velocidades lineares (N, 3)
+            orientations: Quaternions (N, 4) [x, y, z, w]
+            angular_velocities: Velocidades angulares (N, 3), referencial do mundo
+            forces: Forças externas (N, 3), referencial do mundo
+            torques: Torques externos (N, 3), referencial do mundo
+        """
+        dt = self.timestep
+        speed = np.sqrt(np.einsum('ij,ij->i', velocities, velocities))[:, None]
+        velocities += (forces * (1.0 / self.mass) + self.gravity
+                       - velocities * (LINEAR_DAMPING * (1.0 + speed))) * dt
+        positions += velocities * dt
+
+        # Contato com o chão: sem penetração e sem velocidade para baixo
+        grounded = positions[:, 2] < GROUND_CLEARANCE
+        if grounded.any():
+            positions[grounded, 2] = GROUND_CLEARANCE
+            velocities[grounded, 2] = np.maximum(velocities[grounded, 2], 0.0)
+
+        spin = np.sqrt(np.einsum('ij,ij->i', angular_velocities, angular_velocities))[:, None]
+        angular_velocities += (torques * (1.0 / INERTIA)
+                               - angular_velocities * (ANGULAR_DAMPING * (1.0 + spin))) * dt
+
+        omega = (angular_velocities @ _OMEGA_BASIS).reshape(-1, 4, 4)
+        orientations += np.einsum('nij,nj->ni', omega, orientations) * (0.5 * dt)
+        orientations /= np.sqrt(np.einsum('ij,ij->i', orientations, orientations))[:, None]
+
+
+class PointMassSimulator:
+    """
+    Simulador do drone e ambiente sem PyBullet.
+
+    Mesma interface do DroneSimulator (step_simulation, apply_control,
+    position, velocity, get_euler_angles, ...), com a dinâmica integrada
+    em NumPy. Não há janela: os métodos de desenho não fazem nada.
+    """
+
+    def __init__(self, config: dict):
+        """
+        Inicializa o simulador.
+
+        Args:
+            config: Configurações da simulação
+        """
+        self.config = config
+        self.timestep = parse_timestep(config['simulation']['timestep'])
+        self.sim_time = 0.0  # Tempo simulado acumulado (s)
+        self.base_position = np.array(config['simulation']['base_position'], dtype=float)
+        # Garantir que o drone comece em uma altitude segura
+        if self.base_position[2] < 1.0:
+            self.base_position[2] = 1.0
+        self.headless = True
+
+        mass = config['drone'].get('mass', 1.0)
+        gravity = config['simulation']['gravity']
+        self.min_thrust = mass * abs(gravity) * MIN_THRUST_RATIO
+        self.integrator = RigidBodyIntegrator(mass, gravity, self.timestep)
+
+        # Frota: drones lado a lado ao redor da base (1 drone por padrão)
+        fleet_config = config.get('fleet', {})
+        self.num_drones = max(1, int(fleet_config.get('num_drones', 1)))
+        spacing = fleet_config.get('spacing', 2.0)
+        offsets = (np.arange(self.num_drones) - (self.num_drones - 1) / 2.0) * spacing
+        self.start_positions = np.tile(self.base_position, (self.num_drones, 1))
+        self.start_positions[:, 0] += offsets
+
+        # Estado de todos os drones (linha i = drone i)
+        self.positions = self.start_positions.copy()
+        self.velocities = np.zeros((self.num_drones, 3))
+        self.orientations = np.tile([0.0, 0.0, 0.0, 1.0], (self.num_drones, 1))
+        self.angular_velocities = np.zeros((self.num_drones, 3))
+        self._eulers = np.zeros((self.num_drones, 3))
+        self._eulers_stale = False  # Recalculados sob demanda após cada passo
+
+        # Força/torque aplicados no próximo passo (zerados depois, como no PyBullet)
+        self._forces = np.zeros((self.num_drones, 3))
+        self._torques = np.zeros((self.num_drones, 3))
+
+        self.update_drone_state()
+
+        # Pontos de entrega
+        self.point_store: DeliveryPointStore = generate_delivery_points(config['environment'])
+        self.delivery_points: List[DeliveryPoint] = self.point_store.views()
+
+    @property
+    def eulers(self) -> np.ndarray:
+        """Ângulos de Euler (N, 3) de todos os drones."""
+        if self._eulers_stale:
+            self._eulers = quaternion_to_euler(self.orientations)
+            self._eulers_stale = False
+        return self._eulers
+
+    def update_drone_state(self):
+        """Atualiza o estado do drone principal (drone 0)."""
+        self._eulers_stale = True
+        self.position = self.positions[0].copy()
+        self.velocity = self.velocities[0].copy()
+        self.orientation = self.orientations[0].copy()
+        self.angular_velocity = self.angular_velocities[0].copy()
+
+    def get_euler_angles(self, drone_index: int = 0) -> np.ndarray:
+        """Retorna ângulos de Euler (roll, pitch, yaw) do drone."""
+        return self.eulers[drone_index].copy()
+
+    def apply_control(self, force: np.ndarray, torque: np.ndarray, drone_index: int = 0):
+        """
+        Aplica força e torque ao drone (válidos para o próximo passo).
+
+        Args:
+            force: Força linear [fx, fy, fz]
+            torque: Torque angular [tx, ty, tz]
+            drone_index: Índice do drone na frota (0 = drone principal)
+        """
+        i = slice(drone_index, drone_index + 1)
+        forces, torques = stabilize_control(
+            np.asarray(force, dtype=float)[None],
+            np.asarray(torque, dtype=float)[None],
+            self.eulers[i],
+            self.angular_velocities[i],
+            self.min_thrust
+        )
+        self._forces[i] += forces
+        self._torques[i] += torques
+
+    def set_drone_position(self, position: np.ndarray, orientation: Optional[np.ndarray] = None,
+                           drone_index: int = 0):
+        """
+        Define posição do drone (útil para reset).
+
+        Args:
+            position: Nova posição [x, y, z]
+            orientation: Nova orientação (quaternion) ou None
+            drone_index: Índice do drone na frota
+        """
+        self.positions[drone_index] = position
+        self.orientations[drone_index] = [0, 0, 0, 1] if orientation is None else orientation
+        self.velocities[drone_index] = 0.0
+        self.angular_velocities[drone_index] = 0.0
+        self.update_drone_state()
+
+    def step_simulation(self):
+        """Executa um passo da simulação."""
+        self.integrator.step(self.positions, self.velocities, self.orientations,
+                             self.angular_velocities, self._forces, self._torques)
+        self._forces[:] = 0.0
+        self._torques[:] = 0.0
+        self.sim_time += self.timestep
+        self.update_drone_state()
+
+    def update_point_visualization(self, point: DeliveryPoint, delivered: bool = False):
+        """Sem visualização neste backend."""
+
+    def update_points_visualization(self, points: List[DeliveryPoint], delivered: bool = False):
+        """Sem visualização neste backend."""
+
+    def draw_target_marker(self, target_pos: Optional[np.ndarray], drone_index: int = 0):
+        """Sem visualização neste backend."""
+
+    def draw_route(self, route: List[DeliveryPoint], current_pos: np.ndarray, drone_index: int = 0):
+        """Sem visualização neste backend."""
+
+    def get_all_delivery_points(self) -> List[DeliveryPoint]:
+        """Retorna todos os pontos de entrega."""
+        return self.delivery_points
+
+    def close(self):
+        """Fecha a simulação."""
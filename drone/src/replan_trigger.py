@@ -0,0 +1,119 @@
+"""
+Gatilhos de replanejamento orientados a eventos.
+"""
+import numpy as np
+from typing import Optional
+
+from src.sensor import DeliveryPoint
+
+
+class ReplanTrigger:
+    """
+    Decide quando replanejar a partir de eventos, e não de um relógio fixo.
+
+    Eventos (nova detecção, entrega, desvio grande do trecho planejado)
+    marcam um replanejamento pendente, que dispara após replan_debounce
+    segundos para agrupar rajadas de detecções em um único planejamento.
+    Sem eventos, um replanejamento é forçado a cada replan_max_staleness
+    segundos enquanto houver pontos pendentes.
+    """
+
+    def __init__(self, config: dict):
+        """
+        Inicializa o gatilho.
+
+        Args:
+            config: Configurações do planejamento (route_planning)
+        """
+        self.debounce = config.get('replan_debounce', 0.2)
+        self.max_staleness = config.get('replan_max_staleness', 5.0)
+        self.deviation_threshold = config.get('replan_deviation', 3.0)
+        self.last_replan_time: Optional[float] = None
+        self.pending_reason: Optional[str] = None
+        self._pending_since: Optional[float] = None
+        self._deviated = False
+        self.event_count = 0
+
+    def notify(self, reason: str, now: Optional[float] = None):
+        """
+        Registra um evento que pede replanejamento.
+
+        Args:
+            reason: Motivo (ex.: 'new_detection', 'delivery', 'deviation')
+            now: Instante do evento (None = primeiro poll() seguinte)
+        """
+        self.event_count += 1
+        if self.pending_reason is None:
+            self.pending_reason = reason
+            self._pending_since = now
+
+    def on_mission_event(self, event: str, point: DeliveryPoint):
+        """Callback para MissionState.subscribe."""
+        self.notify('new_detection' if event == 'detected' else 'delivery')
+
+    def check_deviation(
+        self,
+        drone_pos: np.ndarray,
+        leg_start: np.ndarray,
+        leg_end: np.ndarray,
+        now: Optional[float] = None
+    ) -> bool:
+        """
+        Verifica se o drone se afastou do trecho planejado (plano XY).
+        
+        Só a passagem do limiar registra um evento: enquanto o drone
+        continua desviado, nenhum evento novo é gerado.
+
+        Args:
+            drone_pos: Posição atual do drone
+            leg_start: Início do trecho (posição quando o alvo foi escolhido)
+            leg_end: Fim do trecho (alvo atual)
+            now: Instante atual
+
+        Returns:
+            True se o desvio está acima de replan_deviation
+        """
+        a = np.asarray(leg_start, dtype=float)[:2]
+        b = np.asarray(leg_end, dtype=float)[:2]
+        p = np.asarray(drone_pos, dtype=float)[:2]
+        ab = b - a
+        length_sq = float(ab @ ab)
+        t = 0.0 if length_sq == 0.0 else min(1.0, max(0.0, float((p - a) @ ab) / length_sq))
+        deviation = float(np.linalg.norm(p - (a + t * ab)))
+        deviated = deviation > self.deviation_threshold
+        if deviated and not self._deviated:
+            self.notify('deviation', now)
+        self._deviated = deviated
+        return deviated
+
+    def poll(self, now: float, has_work: bool) -> Optional[str]:
+        """
+        Indica se é hora de replanejar.
+
+        Args:
+            now: Instante atual
+            has_work: Se há pontos detectados não entregues
+
+        Returns:
+            Motivo do replanejamento ou None
+        """
+        if not has_work:
+            # Nada a replanejar: eventos pendentes não devem pular o debounce
+            # quando o próximo ponto for detectado
+            self.pending_reason = None
+            self._pending_since = None
+            return None
+        if self.pending_reason is not None and self._pending_since is None:
+            self._pending_since = now
+
+        if self.pending_reason is not None and now - self._pending_since >= self.debounce:
+            return self.pending_reason
+        if self.last_replan_time is None or now - self.last_replan_time >= self.max_staleness:
+            return 'staleness'
+        return None
+
+    def mark_replanned(self, now: float):
+        """Registra que um replanejamento foi feito (limpa eventos pendentes)."""
+        self.last_replan_time = now
+        self.pending_reason = None
+        self._pending_since = None
@@ -2,9 +2,148 @@
 Sistema de planejamento dinâmico de rotas (TSP dinâmico).
 """
 import numpy as np
-from typing import List, Tuple, Optional
-from src.sensor import DeliveryPoint
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Tuple, Optional
+from src.sensor import DeliveryPoint, stack_positions
+from src.local_search import LocalSearchOptimizer
+from src.exact_solver import HeldKarpSolver
 import math
+import time
+
+
+class DistanceMatrix:
+    """
+    Matriz de distâncias persistente entre pontos de entrega conhecidos.
+    
+    Cada ponto recebe um índice na primeira vez que é registrado; a matriz
+    cresce uma linha/coluna por ponto novo (capacidade dobrada de forma
+    amortizada) e nenhuma distância já conhecida é recalculada. Pontos
+    entregues são marcados como inativos (alive) e, quando passam de
+    compact_fraction das linhas, a matriz é compactada: as linhas inativas
+    saem e os pontos restantes são renumerados. Índices só valem até a
+    próxima chamada de mark_delivered.
+    """
+    
+    def __init__(self, initial_capacity: int = 16, compact_fraction: float = 0.5):
+        """
+        Inicializa a matriz vazia.
+        
+        Args:
+            initial_capacity: Capacidade inicial (número de pontos)
+            compact_fraction: Fração de linhas inativas que dispara a compactação
+        """
+        self.initial_capacity = max(1, initial_capacity)
+        self.compact_fraction = compact_fraction
+        self.positions = np.zeros((self.initial_capacity, 3))
+        self.matrix = np.zeros((self.initial_capacity, self.initial_capacity))
+        self.alive = np.zeros(self.initial_capacity, dtype=bool)
+        self.points: List[DeliveryPoint] = []
+        self.index: Dict[int, int] = {}
+        self.size = 0
+        self.dead_count = 0
+        self.compact_count = 0
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __contains__(self, point: DeliveryPoint) -> bool:
+        return point.id in self.index
+    
+    def _grow(self):
+        """Dobra a capacidade dos arrays internos."""
+        capacity = self.positions.shape[0] * 2
+        positions = np.zeros((capacity, 3))
+        positions[:self.size] = self.positions[:self.size]
+        matrix = np.zeros((capacity, capacity))
+        matrix[:self.size, :self.size] = self.matrix[:self.size, :self.size]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self.size] = self.alive[:self.size]
+        self.positions, self.matrix, self.alive = positions, matrix, alive
+    
+    def add_point(self, point: DeliveryPoint) -> int:
+        """
+        Registra um ponto (se ainda não conhecido) e retorna seu índice.
+        
+        Apenas a nova linha/coluna é calculada: O(n) por ponto novo.
+        """
+        idx = self.index.get(point.id)
+        if idx is not None:
+            return idx
+        
+        if self.size == self.positions.shape[0]:
+            self._grow()
+        
+        idx = self.size
+        position = np.asarray(point.position, dtype=float)
+        self.positions[idx] = position
+        if idx > 0:
+            row = np.linalg.norm(self.positions[:idx] - position, axis=1)
+            self.matrix[idx, :idx] = row
+            self.matrix[:idx, idx] = row
+        self.matrix[idx, idx] = 0.0
+        self.alive[idx] = not point.delivered
+        self.dead_count += int(point.delivered)
+        self.points.append(point)
+        self.index[point.id] = idx
+        self.size += 1
+        return idx
+    
+    def add_points(self, points: Iterable[DeliveryPoint]):
+        """Registra vários pontos."""
+        for point in points:
+            self.add_point(point)
+    
+    def mark_delivered(self, point: DeliveryPoint):
+        """Marca a linha/coluna de um ponto entregue como inativa (e compacta se preciso)."""
+        idx = self.index.get(point.id)
+        if idx is None or not self.alive[idx]:
+            return
+        self.alive[idx] = False
+        self.dead_count += 1
+        if self.dead_count > self.compact_fraction * self.size:
+            self.compact()
+    
+    def compact(self):
+        """
+        Remove as linhas/colunas inativas, mantendo as distâncias dos pontos ativos.
+        
+        Custa O(k²) para k pontos ativos; como só ocorre depois que uma
+        fração fixa das linhas ficou inativa, o custo é amortizado pelas
+        entregas. A capacidade volta a ~2k, então a matriz não cresce com o
+        número total de pontos já entregues.
+        """
+        keep = np.flatnonzero(self.alive[:self.size])
+        k = len(keep)
+        capacity = max(self.initial_capacity, 2 * k)
+        positions = np.zeros((capacity, 3))
+        positions[:k] = self.positions[keep]
+        matrix = np.zeros((capacity, capacity))
+        matrix[:k, :k] = self.matrix[np.ix_(keep, keep)]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:k] = True
+        
+        self.positions, self.matrix, self.alive = positions, matrix, alive
+        self.points = [self.points[i] for i in keep]
+        self.index = {point.id: i for i, point in enumerate(self.points)}
+        self.size = k
+        self.dead_count = 0
+        self.compact_count += 1
+    
+    def indices(self, points: Iterable[DeliveryPoint]) -> np.ndarray:
+        """Retorna os índices dos pontos (registrando os desconhecidos)."""
+        return np.array([self.add_point(point) for point in points], dtype=int)
+    
+    def submatrix(self, idx: np.ndarray) -> np.ndarray:
+        """Retorna a submatriz de distâncias entre os índices dados."""
+        return self.matrix[np.ix_(idx, idx)]
+    
+    def distances_from(self, position: np.ndarray, idx: np.ndarray) -> np.ndarray:
+        """Distâncias de uma posição arbitrária até os pontos indicados."""
+        return np.linalg.norm(self.positions[idx] - np.asarray(position, dtype=float), axis=1)
+    
+    def reset(self):
+        """Descarta todos os pontos registrados."""
+        self.__init__(self.initial_capacity, self.compact_fraction)
 
 
 class RoutePlanner:
@@ -20,6 +159,51 @@ class RoutePlanner:
         self.algorithm = config.get('algorithm', 'nearest_neighbor')
         self.min_distance_threshold = config.get('min_distance_threshold', 0.5)
         self.replan_count = 0
+        # Distâncias entre pontos conhecidos (persistem entre replanejamentos)
+        self.distances = DistanceMatrix(
+            compact_fraction=config.get('matrix_compact_fraction', 0.5)
+        )
+        
+        # Busca local (2-opt + Or-opt) aplicada após a construção da rota;
+        # sempre ativa para algorithm="2opt" e opcional para os demais
+        self.local_search = config.get('local_search', False)
+        self.optimizer = LocalSearchOptimizer(
+            neighbor_count=config.get('neighbor_count', 8),
+            max_segment_length=config.get('or_opt_segment_length', 3)
+        )
+        
+        # Planejamento anytime: com orçamento > 0, plan_route melhora a rota
+        # por busca local iterada até esgotar anytime_budget segundos
+        self.anytime_budget = config.get('anytime_budget', 0.0)
+        self.last_anytime_stats: Optional[Dict] = None
+        
+        # Solução exata (Held-Karp) usada automaticamente para poucos pontos
+        self.exact_solver = HeldKarpSolver(config.get('exact_max_points', 12))
+        
+        # Replanejamento incremental: novos pontos entram por inserção mais
+        # barata e a rota só é reotimizada quando o custo acumulado das
+        # inserções passa de reoptimize_threshold × comprimento de referência
+        self.replan_mode = config.get('replan_mode', 'full')
+        self.reoptimize_threshold = config.get('reoptimize_threshold', 0.25)
+        self.reference_length = 0.0
+        self.insertion_cost = 0.0
+        
+        # Cache de rotas para replan_route: evita replanejar quando o conjunto
+        # de pontos não entregues não mudou (plan_cache_size: 0 desativa)
+        self.plan_cache_size = config.get('plan_cache_size', 8)
+        self.cache_resolution = config.get('plan_cache_resolution', 1.0)
+        self.plan_cache: OrderedDict = OrderedDict()
+        self._last_plan: Optional[List[DeliveryPoint]] = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.last_plan_cached = False
+        
+        # Algoritmos construtivos disponíveis (route_planning.algorithm)
+        self.algorithms = {
+            'nearest_neighbor': self.nearest_neighbor_route,
+            'nearest_neighbor_vectorized': self.vectorized_nearest_neighbor_route,
+            'greedy': self.greedy_route,
+        }
         
     def calculate_distance(self, pos1: np.ndarray, pos2: np.ndarray) -> float:
         """Calcula distância euclidiana entre duas posições."""
@@ -54,26 +238,74 @@ class RoutePlanner:
         if not unvisited:
             return []
         
-        route = []
-        current_pos = start_pos.copy()
-        remaining = unvisited.copy()
+        # Distâncias vêm da matriz persistente; apenas as distâncias a partir
+        # da posição inicial (arbitrária) são calculadas aqui
+        idx = self.distances.indices(unvisited)
+        sub = self.distances.submatrix(idx)
+        remaining = np.ones(len(unvisited), dtype=bool)
+        current_row = self.distances.distances_from(start_pos, idx)
         
         # Construir rota usando nearest neighbor
-        while remaining:
-            # Encontrar ponto mais próximo
-            min_dist = float('inf')
-            nearest_idx = 0
-            
-            for i, point in enumerate(remaining):
-                dist = self.calculate_distance(current_pos, point.position)
-                if dist < min_dist:
-                    min_dist = dist
-                    nearest_idx = i
+        route = []
+        for _ in range(len(unvisited)):
+            # Encontrar ponto mais próximo entre os restantes
+            nearest_idx = int(np.argmin(np.where(remaining, current_row, np.inf)))
             
             # Adicionar à rota
-            next_point = remaining.pop(nearest_idx)
-            route.append(next_point)
-            current_pos = next_point.position.copy()
+            remaining[nearest_idx] = False
+            route.append(unvisited[nearest_idx])
+            current_row = sub[nearest_idx]
+        
+        return route
+    
+    def vectorized_nearest_neighbor_route(
+        self,
+        start_pos: np.ndarray,
+        points: List[DeliveryPoint],
+        return_to_base: bool = True,
+        base_pos: Optional[np.ndarray] = None
+    ) -> List[DeliveryPoint]:
+        """
+        Nearest Neighbor vetorizado com NumPy.
+        
+        Mantém as posições em um único array (n, 3) e escolhe o próximo ponto
+        com argmin mascarado sobre distâncias ao quadrado. Produz a mesma
+        ordem que nearest_neighbor_route sem usar a matriz de distâncias
+        (memória O(n)), o que o torna adequado para milhares de pontos.
+        
+        Args:
+            start_pos: Posição inicial
+            points: Lista de pontos a visitar
+            return_to_base: Se deve retornar à base ao final
+            base_pos: Posição da base (se return_to_base=True)
+            
+        Returns:
+            Lista ordenada de pontos para visita
+        """
+        # return_to_base e base_pos não alteram a construção gulosa
+        _ = return_to_base, base_pos
+        
+        unvisited = [p for p in points if not p.delivered]
+        if not unvisited:
+            return []
+        
+        n = len(unvisited)
+        positions = stack_positions(unvisited)
+        visited = np.zeros(n, dtype=bool)
+        diff = np.empty_like(positions)
+        sq_dist = np.empty(n)
+        current_pos = np.asarray(start_pos, dtype=float)
+        
+        route = []
+        for _ in range(n):
+            np.subtract(positions, current_pos, out=diff)
+            np.einsum('ij,ij->i', diff, diff, out=sq_dist)
+            sq_dist[visited] = np.inf
+            nearest_idx = int(np.argmin(sq_dist))
+            
+            visited[nearest_idx] = True
+            route.append(unvisited[nearest_idx])
+            current_pos = positions[nearest_idx]
         
         return route
     
@@ -106,60 +338,190 @@ class RoutePlanner:
         
         # Algoritmo greedy: escolher próximo ponto que minimiza
         # a razão distância_atual / distância_média_restante
+        idx = self.distances.indices(unvisited)
+        sub = self.distances.submatrix(idx)
+        n = len(unvisited)
+        remaining = np.ones(n, dtype=bool)
+        current_row = self.distances.distances_from(start_pos, idx)
+        
+        # Soma das distâncias de cada ponto aos demais restantes; mantida
+        # incrementalmente (subtraindo a coluna do ponto escolhido) para que
+        # cada iteração custe O(n) e o algoritmo todo O(n²)
+        row_sums = sub.sum(axis=1)
         route = []
-        current_pos = start_pos.copy()
-        remaining = unvisited.copy()
         
-        while remaining:
-            if len(remaining) == 1:
-                route.append(remaining[0])
+        for remaining_count in range(n, 0, -1):
+            if remaining_count == 1:
+                route.append(unvisited[int(np.flatnonzero(remaining)[0])])
                 break
             
-            # Calcular distâncias médias entre pontos restantes
-            avg_distances = {}
-            for point in remaining:
-                distances = [
-                    self.calculate_distance(point.position, p.position)
-                    for p in remaining if p != point
-                ]
-                avg_distances[point] = np.mean(distances) if distances else 1.0
+            # Distância média de cada ponto aos outros pontos restantes
+            avg_distances = row_sums / (remaining_count - 1)
             
             # Escolher ponto que minimiza distância_atual / distância_média
-            best_score = float('inf')
-            best_idx = 0
-            
-            for i, point in enumerate(remaining):
-                dist_to_point = self.calculate_distance(current_pos, point.position)
-                avg_dist = avg_distances[point]
-                score = dist_to_point / (avg_dist + 0.1)  # Evitar divisão por zero
-                
-                if score < best_score:
-                    best_score = score
-                    best_idx = i
+            scores = current_row / (avg_distances + 0.1)  # Evitar divisão por zero
+            scores[~remaining] = np.inf
+            best_idx = int(np.argmin(scores))
             
-            next_point = remaining.pop(best_idx)
-            route.append(next_point)
-            current_pos = next_point.position.copy()
+            remaining[best_idx] = False
+            row_sums -= sub[:, best_idx]
+            route.append(unvisited[best_idx])
+            current_row = sub[best_idx]
         
         return route
     
     def calculate_total_distance(self, route: List[DeliveryPoint], start_pos: np.ndarray, 
                                  base_pos: Optional[np.ndarray] = None) -> float:
-        """Calcula distância total de uma rota."""
+        """
+        Calcula distância total de uma rota.
+        
+        Usa as posições empilhadas da rota (O(n) em tempo e memória), sem
+        registrar os pontos na matriz de distâncias.
+        """
         if not route:
             return 0.0
         
-        total = 0.0
-        current_pos = start_pos.copy()
+        path = [np.asarray(start_pos, dtype=float)[None], stack_positions(route)]
+        if base_pos is not None:
+            path.append(np.asarray(base_pos, dtype=float)[None])
+        return float(np.linalg.norm(np.diff(np.vstack(path), axis=0), axis=1).sum())
+    
+    def path_matrix(
+        self,
+        start_pos: np.ndarray,
+        points: List[DeliveryPoint],
+        base_pos: Optional[np.ndarray] = None,
+        return_to_base: bool = True
+    ) -> Tuple[np.ndarray, bool]:
+        """
+        Monta a matriz de distâncias de um caminho com extremos fixos.
         
-        for point in route:
-            total += self.calculate_distance(current_pos, point.position)
-            current_pos = point.position.copy()
+        O nó 0 é a posição inicial, os nós 1..n são os pontos (na ordem dada)
+        e o nó n+1 é a base. Sem retorno à base, o último nó é fictício e
+        está a distância zero de todos (caminho aberto).
         
-        if base_pos is not None:
-            total += self.calculate_distance(current_pos, base_pos)
+        Args:
+            start_pos: Posição inicial
+            points: Pontos a visitar
+            base_pos: Posição da base
+            return_to_base: Se deve retornar à base ao final
+            
+        Returns:
+            Tupla (matriz (n+2, n+2), open_end)
+        """
+        idx = self.distances.indices(points)
+        n = len(idx)
+        dist = np.zeros((n + 2, n + 2))
+        dist[1:n + 1, 1:n + 1] = self.distances.submatrix(idx)
+        start_row = self.distances.distances_from(start_pos, idx)
+        dist[0, 1:n + 1] = start_row
+        dist[1:n + 1, 0] = start_row
+        
+        open_end = not return_to_base or base_pos is None
+        if not open_end:
+            base_row = self.distances.distances_from(base_pos, idx)
+            dist[n + 1, 1:n + 1] = base_row
+            dist[1:n + 1, n + 1] = base_row
+            dist[0, n + 1] = dist[n + 1, 0] = self.calculate_distance(
+                np.asarray(start_pos, dtype=float), np.asarray(base_pos, dtype=float)
+            )
+        
+        return dist, open_end
+    
+    def path_positions(
+        self,
+        start_pos: np.ndarray,
+        points: List[DeliveryPoint],
+        base_pos: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Posições dos nós da matriz de path_matrix (listas de vizinhos em grade).
+        
+        Args:
+            start_pos: Posição inicial
+            points: Pontos a visitar (na ordem de path_matrix)
+            base_pos: Posição da base (sem base, o último nó repete o início)
+            
+        Returns:
+            Array (n+2, 3)
+        """
+        start = np.asarray(start_pos, dtype=float)[None]
+        end = start if base_pos is None else np.asarray(base_pos, dtype=float)[None]
+        return np.vstack((start, stack_positions(points), end))
+    
+    def improve_route(
+        self,
+        start_pos: np.ndarray,
+        route: List[DeliveryPoint],
+        base_pos: Optional[np.ndarray] = None,
+        return_to_base: bool = True
+    ) -> List[DeliveryPoint]:
+        """
+        Melhora uma rota construída com busca local 2-opt + Or-opt.
+        
+        Args:
+            start_pos: Posição inicial
+            route: Rota a melhorar
+            base_pos: Posição da base
+            return_to_base: Se a rota termina na base
+            
+        Returns:
+            Rota melhorada (mesmos pontos)
+        """
+        if len(route) < 2:
+            return list(route)
+        
+        dist, open_end = self.path_matrix(start_pos, route, base_pos, return_to_base)
+        positions = self.path_positions(start_pos, route, base_pos)
+        tour = self.optimizer.improve(
+            dist, list(range(len(route) + 2)), open_end, positions=positions
+        )
+        return [route[node - 1] for node in tour[1:-1]]
+    
+    def exact_route(
+        self,
+        start_pos: np.ndarray,
+        points: List[DeliveryPoint],
+        return_to_base: bool = True,
+        base_pos: Optional[np.ndarray] = None
+    ) -> List[DeliveryPoint]:
+        """
+        Rota ótima por Held-Karp (apenas para poucos pontos).
+        
+        Args:
+            start_pos: Posição inicial
+            points: Lista de pontos a visitar
+            return_to_base: Se deve retornar à base ao final
+            base_pos: Posição da base (se return_to_base=True)
+            
+        Returns:
+            Lista ordenada de pontos para visita
+        """
+        unvisited = [p for p in points if not p.delivered]
+        if not unvisited:
+            return []
+        
+        dist, _ = self.path_matrix(start_pos, unvisited, base_pos, return_to_base)
+        tour = self.exact_solver.solve(dist)
+        return [unvisited[node - 1] for node in tour[1:-1]]
+    
+    def register_points(self, points: Iterable[DeliveryPoint]):
+        """
+        Registra pontos recém-detectados na matriz de distâncias.
+        
+        Args:
+            points: Pontos detectados pelo sensor
+        """
+        self.distances.add_points(points)
+    
+    def mark_delivered(self, point: DeliveryPoint):
+        """
+        Informa ao planejador que um ponto foi entregue.
         
-        return total
+        Args:
+            point: Ponto entregue
+        """
+        self.distances.mark_delivered(point)
     
     def plan_route(
         self,
@@ -180,24 +542,154 @@ class RoutePlanner:
         Returns:
             Lista ordenada de pontos para visita
         """
+        if self.anytime_budget > 0:
+            route, _ = self.plan_route_anytime(current_pos, detected_points, base_pos, return_to_base)
+            return route
+        
         # Filtrar pontos não entregues
         unvisited = [p for p in detected_points if not p.delivered]
         
         if not unvisited:
             return []
         
-        # Escolher algoritmo baseado na configuração
-        if self.algorithm == 'nearest_neighbor':
-            route = self.nearest_neighbor_route(current_pos, unvisited, return_to_base, base_pos)
-        elif self.algorithm == 'greedy':
-            route = self.greedy_route(current_pos, unvisited, return_to_base, base_pos)
+        if self.exact_solver.can_solve(len(unvisited)):
+            # Poucos pontos: rota ótima é barata de calcular
+            route = self.exact_route(current_pos, unvisited, return_to_base, base_pos)
         else:
-            # Default: nearest neighbor
-            route = self.nearest_neighbor_route(current_pos, unvisited, return_to_base, base_pos)
+            # Escolher algoritmo baseado na configuração (default: nearest neighbor)
+            route_fn = self.algorithms.get(self.algorithm, self.nearest_neighbor_route)
+            route = route_fn(current_pos, unvisited, return_to_base, base_pos)
+            
+            # "2opt" usa nearest neighbor como construção inicial
+            if self.algorithm == '2opt' or self.local_search:
+                route = self.improve_route(current_pos, route, base_pos, return_to_base)
+        
+        # Comprimento de referência (só o replanejamento incremental o usa)
+        if self.replan_mode == 'incremental':
+            self.reference_length = self.calculate_total_distance(
+                route, current_pos, base_pos if return_to_base else None
+            )
+        self.insertion_cost = 0.0
         
         self.replan_count += 1
         return route
     
+    def plan_route_anytime(
+        self,
+        current_pos: np.ndarray,
+        detected_points: List[DeliveryPoint],
+        base_pos: Optional[np.ndarray] = None,
+        return_to_base: bool = True,
+        deadline: Optional[float] = None,
+        callback: Optional[Callable[[List[DeliveryPoint], float], None]] = None
+    ) -> Tuple[List[DeliveryPoint], Dict]:
+        """
+        Planeja com prazo: rota construtiva imediata, melhorada até o prazo.
+        
+        A rota do algoritmo configurado é entregue logo de início (via
+        callback) e depois melhorada por busca local iterada; o retorno é a
+        melhor rota encontrada até o prazo.
+        
+        Args:
+            current_pos: Posição atual do drone
+            detected_points: Lista de pontos detectados
+            base_pos: Posição da base
+            return_to_base: Se deve retornar à base
+            deadline: Instante limite em time.monotonic() (padrão: agora + anytime_budget)
+            callback: Chamado como callback(rota, comprimento) a cada melhoria
+            
+        Returns:
+            Tupla (rota, estatísticas) com 'iterations', 'initial_length',
+            'best_length', 'elapsed' (s), 'curve' (tempo, comprimento) e 'exact'
+        """
+        if deadline is None:
+            deadline = time.monotonic() + self.anytime_budget
+        
+        unvisited = [p for p in detected_points if not p.delivered]
+        stats = {'iterations': 0, 'initial_length': 0.0, 'best_length': 0.0,
+                 'elapsed': 0.0, 'curve': [], 'exact': False}
+        
+        if not unvisited:
+            route = []
+        elif self.exact_solver.can_solve(len(unvisited)):
+            # Ótimo direto: não há o que melhorar até o prazo
+            route = self.exact_route(current_pos, unvisited, return_to_base, base_pos)
+            length = self.calculate_total_distance(
+                route, current_pos, base_pos if return_to_base else None
+            )
+            stats.update({'initial_length': length, 'best_length': length,
+                          'curve': [(0.0, length)], 'exact': True})
+            if callback is not None:
+                callback(list(route), length)
+        else:
+            route_fn = self.algorithms.get(self.algorithm, self.nearest_neighbor_route)
+            initial = route_fn(current_pos, unvisited, return_to_base, base_pos)
+            
+            dist, open_end = self.path_matrix(current_pos, initial, base_pos, return_to_base)
+            node_callback = None
+            if callback is not None:
+                node_callback = lambda tour, length: callback(
+                    [initial[node - 1] for node in tour[1:-1]], length
+                )
+            result = self.optimizer.improve_until(
+                dist, list(range(len(initial) + 2)), deadline, open_end, node_callback,
+                self.path_positions(current_pos, initial, base_pos)
+            )
+            route = [initial[node - 1] for node in result.pop('tour')[1:-1]]
+            stats.update(result)
+        
+        self.reference_length = stats['best_length']
+        self.insertion_cost = 0.0
+        self.last_anytime_stats = stats
+        
+        self.replan_count += 1
+        return route, stats
+    
+    def cheapest_insertion(
+        self,
+        current_pos: np.ndarray,
+        route: List[DeliveryPoint],
+        point: DeliveryPoint,
+        base_pos: Optional[np.ndarray] = None
+    ) -> Tuple[int, float]:
+        """
+        Encontra a posição de inserção mais barata de um ponto na rota (O(n)).
+        
+        Args:
+            current_pos: Posição atual do drone (início da rota)
+            route: Rota atual (apenas pontos não entregues)
+            point: Ponto a inserir
+            base_pos: Posição da base (fim da rota) ou None para rota aberta
+            
+        Returns:
+            Tupla (índice de inserção, custo adicional)
+        """
+        new_idx = self.distances.add_point(point)
+        from_start = float(self.distances.distances_from(current_pos, [new_idx])[0])
+        to_base = (
+            float(self.distances.distances_from(base_pos, [new_idx])[0])
+            if base_pos is not None else 0.0
+        )
+        if not route:
+            return 0, from_start + to_base
+        
+        idx = self.distances.indices(route)
+        to_route = self.distances.matrix[new_idx, idx]
+        start_edge = self.distances.distances_from(current_pos, idx[:1])
+        end_edge = (
+            self.distances.distances_from(base_pos, idx[-1:])
+            if base_pos is not None else np.zeros(1)
+        )
+        
+        # Inserir na posição k substitui a aresta (anterior_k, route[k])
+        entering = np.concatenate(([from_start], to_route))
+        leaving = np.concatenate((to_route, [to_base]))
+        replaced = np.concatenate((start_edge, self.distances.matrix[idx[:-1], idx[1:]], end_edge))
+        costs = entering + leaving - replaced
+        
+        best = int(np.argmin(costs))
+        return best, float(costs[best])
+    
     def replan_route(
         self,
         current_pos: np.ndarray,
@@ -217,6 +709,35 @@ class RoutePlanner:
         Returns:
             Nova rota replanejada
         """
+        key = None
+        if self.plan_cache_size > 0:
+            key = self._cache_key(current_pos, list(current_route) + list(new_points))
+            cached = self._lookup_plan(key)
+            if cached is not None:
+                self.cache_hits += 1
+                self.last_plan_cached = True
+                return cached
+            self.cache_misses += 1
+        
+        self.last_plan_cached = False
+        route = self._replan(current_pos, current_route, new_points, base_pos)
+        if key is not None:
+            self._store_plan(key, route)
+        return route
+    
+    def _replan(
+        self,
+        current_pos: np.ndarray,
+        current_route: List[DeliveryPoint],
+        new_points: List[DeliveryPoint],
+        base_pos: Optional[np.ndarray] = None
+    ) -> List[DeliveryPoint]:
+        """Replanejamento propriamente dito (sem consultar o cache)."""
+        if self.replan_mode == 'incremental':
+            remaining = [p for p in current_route if not p.delivered]
+            if remaining:
+                return self._incremental_replan(current_pos, remaining, new_points, base_pos)
+        
         # Combinar pontos da rota atual (não entregues) com novos pontos
         all_points = list(current_route) + new_points
         
@@ -231,6 +752,69 @@ class RoutePlanner:
         # Replanejar com todos os pontos
         return self.plan_route(current_pos, unique_points, base_pos)
     
+    def _cache_key(self, current_pos: np.ndarray, points: List[DeliveryPoint]) -> Tuple[frozenset, tuple]:
+        """Chave do cache: ids não entregues + posição do drone quantizada."""
+        ids = frozenset(p.id for p in points if not p.delivered)
+        cell = np.floor(np.asarray(current_pos, dtype=float) / self.cache_resolution)
+        return ids, tuple(cell.astype(int).tolist())
+    
+    def _lookup_plan(self, key: Tuple[frozenset, tuple]) -> Optional[List[DeliveryPoint]]:
+        """
+        Procura uma rota reutilizável para a chave.
+        
+        Além das entradas com a chave exata, reaproveita o restante (sufixo)
+        da última rota planejada quando o conjunto de pontos não entregues
+        não mudou, independentemente da posição do drone.
+        """
+        route = self.plan_cache.get(key)
+        if route is not None:
+            self.plan_cache.move_to_end(key)
+            return [p for p in route if not p.delivered]
+        
+        if self._last_plan is not None:
+            ids, _ = key
+            suffix = [p for p in self._last_plan if not p.delivered]
+            if ids == frozenset(p.id for p in suffix):
+                return suffix
+        
+        return None
+    
+    def _store_plan(self, key: Tuple[frozenset, tuple], route: List[DeliveryPoint]):
+        """Guarda a rota no cache (LRU de tamanho plan_cache_size)."""
+        self.plan_cache[key] = list(route)
+        self.plan_cache.move_to_end(key)
+        while len(self.plan_cache) > self.plan_cache_size:
+            self.plan_cache.popitem(last=False)
+        self._last_plan = list(route)
+    
+    def _incremental_replan(
+        self,
+        current_pos: np.ndarray,
+        route: List[DeliveryPoint],
+        new_points: List[DeliveryPoint],
+        base_pos: Optional[np.ndarray] = None
+    ) -> List[DeliveryPoint]:
+        """
+        Insere novos pontos na rota existente pela inserção mais barata.
+        
+        Faz uma reotimização completa (plan_route) quando o custo acumulado
+        das inserções ultrapassa o limiar configurado.
+        """
+        known = {p.id for p in route}
+        for point in new_points:
+            if point.delivered or point.id in known:
+                continue
+            position, cost = self.cheapest_insertion(current_pos, route, point, base_pos)
+            route.insert(position, point)
+            known.add(point.id)
+            self.insertion_cost += cost
+        
+        if self.insertion_cost > self.reoptimize_threshold * max(self.reference_length, 1e-9):
+            return self.plan_route(current_pos, route, base_pos)
+        
+        self.replan_count += 1
+        return route
+    
     def get_next_target(
         self,
         current_pos: np.ndarray,
@@ -2,9 +2,11 @@
 Sistema de detecção de pontos de entrega.
 """
 import numpy as np
-from typing import List, Tuple, Set
+from typing import List, Optional, Tuple, Set
 import math
 
+from src.spatial_index import GridIndex
+
 
 class DeliveryPoint:
     """Representa um ponto de entrega."""
@@ -35,6 +37,205 @@ class DeliveryPoint:
         return np.linalg.norm(self.position - position)
 
 
+class DeliveryPointView:
+    """
+    Visão leve de um ponto guardado em um DeliveryPointStore.
+    
+    Tem a mesma interface de DeliveryPoint, mas todos os atributos são
+    lidos/escritos diretamente nos arrays do store. O id (imutável) é
+    copiado na criação: igualdade e hash, usados o tempo todo por
+    planejador, cache e conjuntos, não tocam nos arrays.
+    """
+    
+    __slots__ = ('_store', 'index', '_id')
+    
+    def __init__(self, store: 'DeliveryPointStore', index: int):
+        self._store = store
+        self.index = index
+        self._id = int(store.ids[index])
+    
+    @property
+    def position(self) -> np.ndarray:
+        return self._store.positions[self.index]
+    
+    @property
+    def id(self) -> int:
+        return self._id
+    
+    @property
+    def detected(self) -> bool:
+        return bool(self._store.detected[self.index])
+    
+    @detected.setter
+    def detected(self, value: bool):
+        self._store.detected[self.index] = value
+    
+    @property
+    def delivered(self) -> bool:
+        return bool(self._store.delivered[self.index])
+    
+    @delivered.setter
+    def delivered(self, value: bool):
+        self._store.delivered[self.index] = value
+    
+    @property
+    def detection_time(self) -> Optional[float]:
+        value = self._store.detection_times[self.index]
+        return None if np.isnan(value) else float(value)
+    
+    @detection_time.setter
+    def detection_time(self, value: Optional[float]):
+        self._store.detection_times[self.index] = np.nan if value is None else value
+    
+    @property
+    def delivery_time(self) -> Optional[float]:
+        value = self._store.delivery_times[self.index]
+        return None if np.isnan(value) else float(value)
+    
+    @delivery_time.setter
+    def delivery_time(self, value: Optional[float]):
+        self._store.delivery_times[self.index] = np.nan if value is None else value
+    
+    @property
+    def marker_id(self) -> int:
+        marker_id = self._store.marker_ids[self.index]
+        if marker_id < 0:
+            # Mantém hasattr(point, 'marker_id') falso enquanto não há marcador
+            raise AttributeError('marker_id')
+        return int(marker_id)
+    
+    @marker_id.setter
+    def marker_id(self, value: int):
+        self._store.marker_ids[self.index] = value
+    
+    @property
+    def _logged(self) -> bool:
+        return bool(self._store.logged[self.index])
+    
+    @_logged.setter
+    def _logged(self, value: bool):
+        self._store.logged[self.index] = value
+    
+    def __eq__(self, other):
+        return self._id == other.id
+    
+    def __hash__(self):
+        return hash(self._id)
+    
+    def distance_to(self, position: np.ndarray) -> float:
+        """Calcula distância euclidiana até uma posição."""
+        return np.linalg.norm(self.position - position)
+
+
+class DeliveryPointStore:
+    """
+    Pontos de entrega em arrays NumPy contíguos (struct-of-arrays).
+    
+    Ids, posições, flags e tempos de todos os pontos ficam em arrays
+    paralelos, permitindo que sensor, planejador e logger operem sobre
+    todos os pontos de uma vez. Cada ponto também é acessível como um
+    DeliveryPointView, compatível com DeliveryPoint.
+    """
+    
+    def __init__(self, capacity: int = 16):
+        """
+        Inicializa o store vazio.
+        
+        Args:
+            capacity: Capacidade inicial (cresce automaticamente)
+        """
+        capacity = max(1, capacity)
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.positions = np.zeros((capacity, 3))
+        self.detected = np.zeros(capacity, dtype=bool)
+        self.delivered = np.zeros(capacity, dtype=bool)
+        self.detection_times = np.full(capacity, np.nan)
+        self.delivery_times = np.full(capacity, np.nan)
+        self.marker_ids = np.full(capacity, -1, dtype=np.int64)
+        self.logged = np.zeros(capacity, dtype=bool)
+        self.size = 0
+        self._views: List[DeliveryPointView] = []
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __getitem__(self, index: int) -> DeliveryPointView:
+        return self._views[index]
+    
+    def __iter__(self):
+        return iter(self._views)
+    
+    def _grow(self, capacity: int):
+        """Realoca todos os arrays com a nova capacidade."""
+        for name, fill in (('ids', 0), ('positions', 0.0), ('detected', False),
+                           ('delivered', False), ('detection_times', np.nan),
+                           ('delivery_times', np.nan), ('marker_ids', -1), ('logged', False)):
+            old = getattr(self, name)
+            new = np.full((capacity,) + old.shape[1:], fill, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+    
+    def add(self, position: np.ndarray, point_id: int) -> DeliveryPointView:
+        """
+        Adiciona um ponto e retorna sua visão.
+        
+        Args:
+            position: Posição 3D [x, y, z]
+            point_id: ID único do ponto
+        """
+        if self.size == len(self.ids):
+            self._grow(2 * len(self.ids))
+        
+        index = self.size
+        self.ids[index] = point_id
+        self.positions[index] = position
+        self.size += 1
+        view = DeliveryPointView(self, index)
+        self._views.append(view)
+        return view
+    
+    @classmethod
+    def from_positions(cls, positions: np.ndarray) -> 'DeliveryPointStore':
+        """Cria um store a partir de um array (n, 3), com ids 0..n-1."""
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        store = cls(len(positions))
+        n = len(positions)
+        store.ids[:n] = np.arange(n)
+        store.positions[:n] = positions
+        store.size = n
+        store._views = [DeliveryPointView(store, i) for i in range(n)]
+        return store
+    
+    def views(self) -> List[DeliveryPointView]:
+        """Retorna a lista de visões de todos os pontos."""
+        return self._views
+    
+    def all_delivered(self) -> bool:
+        """Indica se todos os pontos foram entregues."""
+        return bool(self.delivered[:self.size].all())
+    
+    def delivered_count(self) -> int:
+        """Número de pontos entregues."""
+        return int(np.count_nonzero(self.delivered[:self.size]))
+
+
+def stack_positions(points: List[DeliveryPoint]) -> np.ndarray:
+    """
+    Empilha as posições de uma lista de pontos em um array (n, 3).
+    
+    Quando todos os pontos são visões do mesmo store, as posições são
+    obtidas por indexação direta dos arrays, sem percorrer objetos.
+    """
+    if not points:
+        return np.zeros((0, 3))
+    first = points[0]
+    if isinstance(first, DeliveryPointView):
+        store = first._store
+        if all(isinstance(p, DeliveryPointView) and p._store is store for p in points):
+            return store.positions[[p.index for p in points]]
+    return np.array([p.position for p in points], dtype=float)
+
+
 class ProximitySensor:
     """Sensor de proximidade para detecção de pontos de entrega."""
     
@@ -48,6 +249,31 @@ class ProximitySensor:
         self.detection_radius = detection_radius
         self.detected_points: Set[DeliveryPoint] = set()
         
+        # Índice espacial sobre todos os pontos (para detecção) e sobre os
+        # detectados não entregues (para busca do mais próximo). Ambos são
+        # reconstruídos sob demanda: o primeiro quando a lista de pontos
+        # muda, o segundo a cada nova detecção ou entrega.
+        self._index = GridIndex(detection_radius)
+        self._indexed_points: List[DeliveryPoint] = []
+        self._index_source = None
+        self._index_source_size = 0
+        self._index_dirty = True
+        self._pending_index = GridIndex(detection_radius)
+        self._pending_points: List[DeliveryPoint] = []
+        self._pending_dirty = True
+        
+    def _refresh_index(self, all_points: List[DeliveryPoint]):
+        """Reconstrói o índice se a lista de pontos mudou."""
+        if (not self._index_dirty and all_points is self._index_source
+                and len(all_points) == self._index_source_size):
+            return
+        
+        self._indexed_points = [p for p in all_points if not p.delivered]
+        self._index.build(stack_positions(self._indexed_points))
+        self._index_source = all_points
+        self._index_source_size = len(all_points)
+        self._index_dirty = False
+    
     def detect_points(
         self,
         drone_position: np.ndarray,
@@ -58,27 +284,53 @@ class ProximitySensor:
         
         Args:
             drone_position: Posição atual do drone [x, y, z]
-            all_points: Lista de todos os pontos de entrega
+            all_points: Lista de todos os pontos de entrega (ou o
+                DeliveryPointStore que os contém, processado em lote)
             
         Returns:
             Lista de pontos detectados (novos e já conhecidos)
         """
-        detected = []
         drone_pos = np.array(drone_position)
+        if isinstance(all_points, DeliveryPointStore):
+            return self._detect_in_store(drone_pos, all_points)
+        
+        detected = []
         
-        for point in all_points:
+        # Apenas os pontos das células vizinhas são examinados
+        self._refresh_index(all_points)
+        for i in self._index.query_radius(drone_pos, self.detection_radius):
+            point = self._indexed_points[i]
             if point.delivered:
                 continue
-                
-            distance = point.distance_to(drone_pos)
             
-            if distance <= self.detection_radius:
-                if not point.detected:
-                    point.detected = True
-                    point.detection_time = None  # Será preenchido pelo logger
-                detected.append(point)
+            if not point.detected:
+                point.detected = True
+                point.detection_time = None  # Será preenchido pelo logger
+            if point not in self.detected_points:
                 self.detected_points.add(point)
+                self._pending_dirty = True
+            detected.append(point)
+        
+        return detected
+    
+    def _detect_in_store(self, drone_pos: np.ndarray, store: DeliveryPointStore) -> List[DeliveryPoint]:
+        """Detecção operando diretamente sobre os arrays do store."""
+        if self._index_source is not store or self._index_source_size != len(store):
+            self._index.build(store.positions[:len(store)])
+            self._index_source = store
+            self._index_source_size = len(store)
+        
+        idx = self._index.query_radius(drone_pos, self.detection_radius)
+        idx = idx[~store.delivered[idx]]
+        new = idx[~store.detected[idx]]
+        store.detected[new] = True
+        store.detection_times[new] = np.nan  # Será preenchido pelo logger
         
+        detected = [store[i] for i in idx]
+        known = len(self.detected_points)
+        self.detected_points.update(detected)
+        if len(self.detected_points) != known:
+            self._pending_dirty = True
         return detected
     
     def check_delivery(
@@ -105,9 +357,32 @@ class ProximitySensor:
         # (o drone pode estar voando acima do ponto)
         if horizontal_distance <= threshold and not point.delivered:
             point.delivered = True
+            # O índice geral apenas ignora pontos entregues; o de pendentes
+            # é pequeno e reconstruído na próxima consulta
+            self._pending_dirty = True
             return True
         return False
     
+    def nearest_undelivered(self, drone_position: np.ndarray) -> Optional[DeliveryPoint]:
+        """
+        Retorna o ponto detectado e não entregue mais próximo (distância horizontal).
+        
+        Args:
+            drone_position: Posição atual do drone
+            
+        Returns:
+            Ponto mais próximo ou None se não houver pontos pendentes
+        """
+        if self._pending_dirty:
+            self._pending_points = self.get_undelivered_points()
+            self._pending_index.build(stack_positions(self._pending_points))
+            self._pending_dirty = False
+        
+        idx = self._pending_index.nearest(drone_position, planar=True)
+        if idx < 0:
+            return None
+        return self._pending_points[idx]
+    
     def get_undelivered_points(self) -> List[DeliveryPoint]:
         """Retorna lista de pontos detectados mas não entregues."""
         return [p for p in self.detected_points if not p.delivered]
@@ -119,4 +394,6 @@ class ProximitySensor:
     def reset(self):
         """Reseta o estado do sensor."""
         self.detected_points.clear()
+        self._index_dirty = True
+        self._pending_dirty = True
 
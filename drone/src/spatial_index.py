@@ -0,0 +1,179 @@
+"""
+Índice espacial em grade uniforme para consultas de raio e vizinho mais próximo.
+"""
+import numpy as np
+from typing import Dict, List, Tuple
+
+
+class GridIndex:
+    """
+    Grade uniforme no plano XY sobre um conjunto fixo de posições.
+
+    As posições são ordenadas por célula na construção; cada célula guarda
+    apenas o intervalo correspondente no array ordenado. Consultas visitam
+    somente as células próximas, então o custo depende da densidade local
+    e não do total de pontos. Para refletir inserções/remoções o índice
+    deve ser reconstruído (build).
+    """
+
+    def __init__(self, cell_size: float):
+        """
+        Inicializa o índice vazio.
+
+        Args:
+            cell_size: Lado de cada célula da grade (metros)
+        """
+        self.cell_size = float(cell_size)
+        self.positions = np.zeros((0, 3))
+        self._order = np.zeros(0, dtype=int)
+        self._cells: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        self._min_cell = np.zeros(2, dtype=int)
+        self._max_cell = np.zeros(2, dtype=int)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def build(self, positions: np.ndarray):
+        """
+        (Re)constrói o índice.
+
+        Args:
+            positions: Array (n, 3) de posições; os índices retornados pelas
+                consultas referem-se às linhas deste array
+        """
+        self.positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        self._cells = {}
+        if len(self.positions) == 0:
+            self._order = np.zeros(0, dtype=int)
+            return
+
+        cells = np.floor(self.positions[:, :2] / self.cell_size).astype(np.int64)
+        self._order = np.lexsort((cells[:, 1], cells[:, 0]))
+        sorted_cells = cells[self._order]
+        unique, starts, counts = np.unique(
+            sorted_cells, axis=0, return_index=True, return_counts=True
+        )
+        for (cx, cy), start, count in zip(unique.tolist(), starts.tolist(), counts.tolist()):
+            self._cells[(cx, cy)] = (start, start + count)
+        self._min_cell = unique.min(axis=0)
+        self._max_cell = unique.max(axis=0)
+
+    def _cell_of(self, position: np.ndarray) -> np.ndarray:
+        return np.floor(np.asarray(position, dtype=float)[:2] / self.cell_size).astype(np.int64)
+
+    def _gather(self, x_range: range, y_range: range) -> np.ndarray:
+        """Índices de todas as posições nas células do retângulo dado."""
+        chunks = []
+        for cx in x_range:
+            for cy in y_range:
+                bounds = self._cells.get((cx, cy))
+                if bounds is not None:
+                    chunks.append(self._order[bounds[0]:bounds[1]])
+        if not chunks:
+            return np.zeros(0, dtype=int)
+        return np.concatenate(chunks)
+
+    def _distances(self, center: np.ndarray, idx: np.ndarray, planar: bool) -> np.ndarray:
+        dims = 2 if planar else 3
+        diff = self.positions[idx, :dims] - np.asarray(center, dtype=float)[:dims]
+        return np.sqrt(np.einsum('ij,ij->i', diff, diff))
+
+    def occupied_cells(self) -> List[Tuple[Tuple[int, int], np.ndarray]]:
+        """
+        Células ocupadas e os índices das posições em cada uma.
+
+        Returns:
+            Lista de ((cx, cy), índices)
+        """
+        return [(cell, self._order[start:end]) for cell, (start, end) in self._cells.items()]
+
+    def query_block(self, cell: Tuple[int, int], ring: int = 1) -> np.ndarray:
+        """
+        Índices das posições no bloco de (2 * ring + 1)² células em torno de `cell`.
+
+        Todas as posições a até (ring * cell_size) da célula central, em XY,
+        estão no bloco.
+
+        Args:
+            cell: Célula central (cx, cy)
+            ring: Número de anéis de células ao redor da central
+
+        Returns:
+            Índices das posições do bloco
+        """
+        cx, cy = cell
+        return self._gather(range(cx - ring, cx + ring + 1), range(cy - ring, cy + ring + 1))
+
+    def query_radius(self, center: np.ndarray, radius: float, planar: bool = False) -> np.ndarray:
+        """
+        Retorna os índices das posições a até `radius` do centro.
+
+        Args:
+            center: Posição de consulta [x, y, z]
+            radius: Raio da consulta
+            planar: Se True usa distância horizontal (XY), senão 3D
+
+        Returns:
+            Índices (ordenados) das posições dentro do raio
+        """
+        if not self._cells:
+            return np.zeros(0, dtype=int)
+
+        low = self._cell_of(np.asarray(center, dtype=float)[:2] - radius)
+        high = self._cell_of(np.asarray(center, dtype=float)[:2] + radius)
+        candidates = self._gather(range(low[0], high[0] + 1), range(low[1], high[1] + 1))
+        if len(candidates) == 0:
+            return candidates
+
+        inside = candidates[self._distances(center, candidates, planar) <= radius]
+        return np.sort(inside)
+
+    def nearest(self, center: np.ndarray, planar: bool = True) -> int:
+        """
+        Retorna o índice da posição mais próxima do centro.
+
+        Percorre anéis de células ao redor do centro até que nenhum anel
+        restante possa conter posição mais próxima que a melhor encontrada.
+
+        Args:
+            center: Posição de consulta [x, y, z]
+            planar: Se True usa distância horizontal (XY), senão 3D
+
+        Returns:
+            Índice da posição mais próxima ou -1 se o índice estiver vazio
+        """
+        if not self._cells:
+            return -1
+
+        cx, cy = self._cell_of(center)
+        max_ring = int(max(
+            abs(cx - self._min_cell[0]), abs(self._max_cell[0] - cx),
+            abs(cy - self._min_cell[1]), abs(self._max_cell[1] - cy)
+        ))
+
+        best_idx = -1
+        best_dist = np.inf
+        for ring in range(max_ring + 1):
+            if ring == 0:
+                candidates = self._gather(range(cx, cx + 1), range(cy, cy + 1))
+            else:
+                xs = range(cx - ring, cx + ring + 1)
+                candidates = np.concatenate((
+                    self._gather(xs, range(cy - ring, cy - ring + 1)),
+                    self._gather(xs, range(cy + ring, cy + ring + 1)),
+                    self._gather(range(cx - ring, cx - ring + 1), range(cy - ring + 1, cy + ring)),
+                    self._gather(range(cx + ring, cx + ring + 1), range(cy - ring + 1, cy + ring)),
+                ))
+
+            if len(candidates) > 0:
+                distances = self._distances(center, candidates, planar)
+                k = int(np.argmin(distances))
+                if distances[k] < best_dist:
+                    best_dist = distances[k]
+                    best_idx = int(candidates[k])
+
+            # Posições do próximo anel estão a pelo menos ring * cell_size
+            if best_dist <= ring * self.cell_size:
+                break
+
+        return best_idx
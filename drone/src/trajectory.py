@@ -0,0 +1,244 @@
+"""
+Trajetórias de jerk mínimo através dos waypoints da rota.
+"""
+import numpy as np
+from typing import Optional, Tuple
+
+
+class MinimumJerkTrajectory:
+    """
+    Trajetória parametrizada no tempo por polinômios de 5º grau (jerk mínimo).
+
+    Cada trecho entre waypoints é um quíntico com posição, velocidade e
+    aceleração (nula) prescritas nos extremos. Nos waypoints intermediários
+    a velocidade aponta para a bissetriz da curva e diminui com o ângulo da
+    curva, de modo que o drone passa pelos pontos sem parar. A duração de
+    cada trecho é aumentada até que velocidade e aceleração amostradas
+    respeitem max_velocity e max_acceleration; se nenhuma duração servir,
+    as velocidades de passagem do trecho são reduzidas à metade.
+    """
+
+    def __init__(
+        self,
+        waypoints: np.ndarray,
+        start_pos: np.ndarray,
+        start_vel: np.ndarray,
+        max_velocity: float,
+        max_acceleration: float,
+        end_vel: Optional[np.ndarray] = None
+    ):
+        """
+        Constrói a trajetória.
+
+        Args:
+            waypoints: Array (k, 3) de posições a atravessar, em ordem
+            start_pos: Posição inicial do drone
+            start_vel: Velocidade inicial do drone
+            max_velocity: Velocidade máxima (m/s)
+            max_acceleration: Aceleração máxima (m/s²)
+            end_vel: Velocidade no último waypoint (padrão: parado)
+        """
+        self.max_velocity = max_velocity
+        self.max_acceleration = max_acceleration
+
+        points = self._subdivide(
+            np.vstack((np.asarray(start_pos, dtype=float), np.asarray(waypoints, dtype=float)))
+        )
+        velocities = self._waypoint_velocities(points, np.asarray(start_vel, dtype=float), end_vel)
+
+        num_segments = len(points) - 1
+        self.coefficients = [None] * num_segments
+        durations = np.zeros(num_segments)
+        pending = list(range(num_segments))
+        for _ in range(8):
+            infeasible = []
+            for i in pending:
+                self.coefficients[i], durations[i], feasible = self._fit_segment(
+                    points[i], velocities[i], points[i + 1], velocities[i + 1]
+                )
+                if not feasible:
+                    infeasible.append(i)
+            if not infeasible:
+                break
+            # Reduzir as velocidades de passagem (a inicial é o estado real do drone)
+            pending = set()
+            for i in infeasible:
+                for k in (i, i + 1):
+                    if 0 < k < len(points) and np.any(velocities[k]):
+                        velocities[k] *= 0.5
+                        pending.update(j for j in (k - 1, k) if 0 <= j < num_segments)
+            pending = sorted(pending)
+            if not pending:
+                break
+        self.durations = durations
+        self.start_times = np.concatenate(([0.0], np.cumsum(self.durations)[:-1]))
+        self.duration = float(self.durations.sum())
+        self.waypoints = points[1:]
+
+    def _subdivide(self, points: np.ndarray) -> np.ndarray:
+        """
+        Divide trechos longos em pedaços de ~v²/a.
+
+        Um único quíntico entre pontos parados tem velocidade média de
+        pouco mais da metade da máxima; com pontos intermediários em linha
+        reta (velocidade máxima) o trecho vira aceleração, cruzeiro e frenagem.
+        """
+        piece = self.max_velocity ** 2 / self.max_acceleration
+        result = [points[0]]
+        for a, b in zip(points[:-1], points[1:]):
+            pieces = max(1, int(np.floor(np.linalg.norm(b - a) / piece)))
+            for k in range(1, pieces + 1):
+                result.append(a + (b - a) * k / pieces)
+        return np.array(result)
+
+    def _waypoint_velocities(self, points: np.ndarray, start_vel: np.ndarray,
+                             end_vel: Optional[np.ndarray]) -> np.ndarray:
+        """Velocidade de passagem em cada waypoint."""
+        velocities = np.zeros_like(points)
+        # Velocidade inicial limitada ao máximo permitido
+        speed = np.linalg.norm(start_vel)
+        velocities[0] = start_vel if speed <= self.max_velocity else start_vel * self.max_velocity / speed
+        if end_vel is not None:
+            velocities[-1] = end_vel
+
+        for i in range(1, len(points) - 1):
+            incoming = points[i] - points[i - 1]
+            outgoing = points[i + 1] - points[i]
+            len_in, len_out = np.linalg.norm(incoming), np.linalg.norm(outgoing)
+            if len_in < 1e-9 or len_out < 1e-9:
+                continue
+            u_in, u_out = incoming / len_in, outgoing / len_out
+            bisector = u_in + u_out
+            norm = np.linalg.norm(bisector)
+            if norm < 1e-9:
+                continue  # Meia-volta: parar no waypoint
+            # 1 em linha reta, 0 em meia-volta
+            straightness = (1.0 + float(u_in @ u_out)) / 2.0
+            # Trechos curtos não dão espaço para frear depois do waypoint
+            reachable = np.sqrt(self.max_acceleration * min(len_in, len_out))
+            velocities[i] = bisector / norm * min(self.max_velocity * straightness, reachable)
+        return velocities
+
+    @staticmethod
+    def _quintic(p0, v0, p1, v1, duration) -> np.ndarray:
+        """Coeficientes (6, 3) do quíntico com aceleração nula nos extremos."""
+        T = duration
+        h = p1 - p0
+        c3 = (20 * h - (8 * v1 + 12 * v0) * T) / (2 * T ** 3)
+        c4 = (-30 * h + (14 * v1 + 16 * v0) * T) / (2 * T ** 4)
+        c5 = (12 * h - 6 * (v1 + v0) * T) / (2 * T ** 5)
+        return np.array([p0, v0, np.zeros(3), c3, c4, c5])
+
+    def _fit_segment(self, p0, v0, p1, v1) -> Tuple[np.ndarray, float, bool]:
+        """
+        Menor duração (em passos de 10%) que respeita os limites.
+
+        Returns:
+            Tupla (coeficientes, duração, viável); se inviável, o candidato
+            com a menor violação relativa dos limites
+        """
+        distance = float(np.linalg.norm(p1 - p0))
+        duration = max(distance / self.max_velocity, 0.05)
+        samples = np.linspace(0.0, 1.0, 33)
+        best = None
+        for _ in range(40):
+            coeffs = self._quintic(p0, v0, p1, v1, duration)
+            _, vel, acc = self._evaluate(coeffs, samples * duration)
+            violation = max(np.linalg.norm(vel, axis=1).max() / self.max_velocity,
+                            np.linalg.norm(acc, axis=1).max() / self.max_acceleration)
+            if violation <= 1.01:
+                return coeffs, duration, True
+            if best is None or violation < best[0]:
+                best = (violation, coeffs, duration)
+            duration *= 1.1
+        return best[1], best[2], False
+
+    @staticmethod
+    def _evaluate(coeffs: np.ndarray, t) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Posição, velocidade e aceleração de um trecho nos instantes t."""
+        t = np.atleast_1d(np.asarray(t, dtype=float))[:, None]
+        c0, c1, c2, c3, c4, c5 = coeffs
+        pos = c0 + t * (c1 + t * (c2 + t * (c3 + t * (c4 + t * c5))))
+        vel = c1 + t * (2 * c2 + t * (3 * c3 + t * (4 * c4 + t * 5 * c5)))
+        acc = 2 * c2 + t * (6 * c3 + t * (12 * c4 + t * 20 * c5))
+        return pos, vel, acc
+
+    def sample(self, t: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Estado de referência no instante t (segundos desde o início).
+
+        Args:
+            t: Tempo desde a construção da trajetória
+
+        Returns:
+            Tupla (posição, velocidade, aceleração); após o fim, o último
+            waypoint com a velocidade final
+        """
+        if t >= self.duration:
+            pos, vel, acc = self._evaluate(self.coefficients[-1], self.durations[-1])
+            return pos[0], vel[0], np.zeros(3)
+        segment = int(np.searchsorted(self.start_times, max(t, 0.0), side='right') - 1)
+        pos, vel, acc = self._evaluate(self.coefficients[segment], max(t, 0.0) - self.start_times[segment])
+        return pos[0], vel[0], acc[0]
+
+
+class TrajectoryTracker:
+    """
+    Mantém a trajetória de referência através dos próximos pontos da rota.
+
+    A trajetória é reconstruída a partir do estado atual do drone quando o
+    alvo ou a rota mudam, então a velocidade é preservada entre entregas.
+    """
+
+    def __init__(self, config: dict, max_velocity: float, max_acceleration: float, altitude: float):
+        """
+        Inicializa o rastreador.
+
+        Args:
+            config: Configurações da trajetória (seção trajectory)
+            max_velocity: Velocidade máxima (m/s)
+            max_acceleration: Aceleração máxima (m/s²)
+            altitude: Altura de voo entre os pontos
+        """
+        self.lookahead = config.get('lookahead', 3)
+        self.max_velocity = max_velocity
+        self.max_acceleration = max_acceleration
+        self.altitude = altitude
+        self.trajectory: Optional[MinimumJerkTrajectory] = None
+        self.rebuild_count = 0
+        self._target = None
+        self._route = None
+        self._start_time = 0.0
+
+    def reference(self, now: float, drone_pos: np.ndarray, drone_vel: np.ndarray,
+                  target, route: list) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Estado de referência (posição, velocidade, aceleração) no instante now.
+
+        Args:
+            now: Tempo de simulação (segundos)
+            drone_pos: Posição atual do drone
+            drone_vel: Velocidade atual do drone
+            target: Alvo atual (DeliveryPoint)
+            route: Rota atual (os pontos após o alvo entram na trajetória)
+        """
+        if self.trajectory is None or target is not self._target or route is not self._route:
+            upcoming = [p for p in route if not p.delivered]
+            start = upcoming.index(target) if target in upcoming else len(upcoming)
+            points = [target] + upcoming[start + 1:start + self.lookahead]
+            waypoints = np.array([p.position for p in points], dtype=float)
+            waypoints[:, 2] = self.altitude
+            self.trajectory = MinimumJerkTrajectory(
+                waypoints, drone_pos, drone_vel, self.max_velocity, self.max_acceleration
+            )
+            self._target = target
+            self._route = route
+            self._start_time = now
+            self.rebuild_count += 1
+        return self.trajectory.sample(now - self._start_time)
+
+    def reset(self):
+        """Descarta a trajetória atual."""
+        self.trajectory = None
+        self._target = None
+        self._route = None
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Permite importar os módulos de src/ a partir de tests/
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
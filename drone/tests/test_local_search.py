@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from src.local_search import LocalSearchOptimizer
+
+
+def path_matrix(positions, open_end):
+    dist = np.linalg.norm(positions[:, None, :] - positions[None, :, :], axis=2)
+    if open_end:
+        dist[-1, :] = dist[:, -1] = 0.0
+    return dist
+
+
+@pytest.mark.parametrize('layout', ['uniform', 'clustered', 'line'])
+@pytest.mark.parametrize('open_end', [False, True])
+def test_grid_neighbors_match_full_matrix(layout, open_end):
+    rng = np.random.default_rng(3)
+    n = 600
+    if layout == 'uniform':
+        xy = rng.uniform(0.0, 100.0, size=(n, 2))
+    elif layout == 'clustered':
+        xy = rng.normal(scale=2.0, size=(n, 2)) + rng.integers(0, 4, size=(n, 1)) * 40.0
+    else:
+        xy = np.column_stack((np.linspace(0.0, 100.0, n), np.zeros(n)))
+    positions = np.column_stack((xy, rng.uniform(0.0, 3.0, size=n)))
+    dist = path_matrix(positions, open_end)
+
+    optimizer = LocalSearchOptimizer(neighbor_count=8)
+    expected = optimizer.build_neighbors(dist, open_end)
+    grid = optimizer._grid_neighbors(dist, open_end, positions, 8)
+
+    # Empates podem trocar a ordem; as distâncias dos k vizinhos devem coincidir
+    rows = slice(0, n - 1) if open_end else slice(None)
+    assert np.allclose(np.take_along_axis(dist, grid, axis=1)[rows],
+                       np.take_along_axis(dist, expected, axis=1)[rows])
@@ -0,0 +1,146 @@
+import numpy as np
+
+from src.pid_controller import BatchDroneController, DroneController, PIDBank, PIDController
+
+CONFIG = {
+    'pid': {
+        'position': {'kp': [2.0, 2.0, 5.0], 'ki': [0.3, 0.3, 0.5], 'kd': [0.5, 0.5, 1.0]},
+        'attitude': {'kp': [1.0, 1.0, 1.0], 'ki': [0.1, 0.1, 0.1], 'kd': [0.1, 0.1, 0.1]},
+    },
+    'max_velocity': 5.0,
+    'max_acceleration': 2.0,
+}
+
+
+class ReferencePID:
+    """Fórmula original de PIDController.update (antes dos buffers pré-alocados)."""
+
+    def __init__(self, kp, ki, kd):
+        self.kp, self.ki, self.kd = np.array(kp), np.array(ki), np.array(kd)
+        self.integral = np.zeros(3)
+        self.last_error = np.zeros(3)
+        self.last_time = None
+
+    def update(self, error, dt):
+        error = np.array(error)
+        p_term = self.kp * error
+        self.integral += error * dt
+        self.integral = np.clip(self.integral, -10.0, 10.0)
+        i_term = self.ki * self.integral
+        if self.last_time is not None and dt > 0:
+            derivative = (error - self.last_error) / dt
+        else:
+            derivative = np.zeros(3)
+        control = p_term + i_term + self.kd * derivative
+        self.last_error = error
+        self.last_time = (self.last_time or 0) + dt
+        return control
+
+
+def reference_compute_control(position_pid, attitude_pid, pos, target, vel, attitude, dt,
+                              target_vel=None, target_acc=None, speed_multiplier=1.0):
+    """Fórmula original de DroneController.compute_control."""
+    mass, gravity = 1.0, 9.81
+    pos_error = target - pos
+    desired_velocity = position_pid.update(pos_error, dt) * speed_multiplier * 0.5
+    if target_vel is not None:
+        desired_velocity = desired_velocity + target_vel
+    desired_velocity = np.clip(desired_velocity, -5.0, 5.0)
+    vel_error = desired_velocity - vel
+
+    force_x = pos_error[0] * 2.0 + vel_error[0] * 1.5
+    force_y = pos_error[1] * 2.0 + vel_error[1] * 1.5
+    if target_acc is not None:
+        force_x += mass * target_acc[0]
+        force_y += mass * target_acc[1]
+    force_x = np.clip(force_x, -4.0, 4.0)
+    force_y = np.clip(force_y, -4.0, 4.0)
+
+    if np.linalg.norm(desired_velocity[:2]) > 0.2:
+        direction = desired_velocity[:2] / np.linalg.norm(desired_velocity[:2])
+        desired_roll, desired_pitch = -direction[1] * 0.15, direction[0] * 0.15
+    else:
+        desired_roll = desired_pitch = 0.0
+    att_error = np.array([desired_roll, desired_pitch, attitude[2]]) - attitude
+    while att_error[2] > np.pi:
+        att_error[2] -= 2 * np.pi
+    while att_error[2] < -np.pi:
+        att_error[2] += 2 * np.pi
+
+    torque = attitude_pid.update(att_error, dt)
+    torque[2] = 0.0
+    torque = np.clip(torque, -15.0, 15.0)
+
+    thrust = mass * gravity + pos_error[2] * 12.0 + vel_error[2] * 8.0
+    if target_acc is not None:
+        thrust += mass * target_acc[2]
+    thrust = np.clip(thrust, mass * gravity * 0.8, mass * gravity * 4.0)
+    return np.array([force_x, force_y, thrust]), torque
+
+
+def test_pid_controller_matches_reference_formula():
+    rng = np.random.default_rng(0)
+    gains = CONFIG['pid']['position']
+    pid = PIDController(gains['kp'], gains['ki'], gains['kd'])
+    reference = ReferencePID(gains['kp'], gains['ki'], gains['kd'])
+    out = np.empty(3)
+    for _ in range(500):
+        # Erros grandes o bastante para saturar o integral
+        error = rng.normal(scale=20.0, size=3)
+        expected = reference.update(error, 1 / 240)
+        assert np.allclose(pid.update(error, 1 / 240, out=out), expected, rtol=1e-12, atol=1e-12)
+    assert np.allclose(pid.integral, reference.integral, rtol=1e-12, atol=1e-12)
+
+
+def test_pid_bank_matches_independent_controllers():
+    rng = np.random.default_rng(1)
+    kp = rng.uniform(0.5, 3.0, size=(4, 3))
+    ki = rng.uniform(0.0, 0.5, size=(4, 3))
+    kd = rng.uniform(0.0, 1.0, size=(4, 3))
+    bank = PIDBank(kp, ki, kd, 4)
+    references = [ReferencePID(kp[k], ki[k], kd[k]) for k in range(4)]
+    for step in range(300):
+        if step == 150:
+            # Reset parcial: o derivativo do controlador resetado volta a zero
+            bank.reset(np.array([False, True, False, False]))
+            references[1] = ReferencePID(kp[1], ki[1], kd[1])
+        error = rng.normal(scale=5.0, size=(4, 3))
+        expected = np.array([ref.update(error[k], 1 / 240) for k, ref in enumerate(references)])
+        assert np.allclose(bank.update(error, 1 / 240), expected, rtol=1e-12, atol=1e-12)
+
+
+def test_drone_controllers_match_reference_formula():
+    rng = np.random.default_rng(2)
+    pos_gains, att_gains = CONFIG['pid']['position'], CONFIG['pid']['attitude']
+    position_pid = ReferencePID(pos_gains['kp'], pos_gains['ki'], pos_gains['kd'])
+    attitude_pid = ReferencePID(att_gains['kp'], att_gains['ki'], att_gains['kd'])
+    controller = DroneController(CONFIG)
+    batch = BatchDroneController(CONFIG, 1)
+    dt = 1 / 240
+    for step in range(400):
+        pos = rng.uniform(-20.0, 20.0, size=3)
+        target = pos + rng.normal(scale=0.1 if step % 3 == 0 else 5.0, size=3)
+        vel = rng.normal(scale=2.0, size=3)
+        attitude = rng.uniform(-np.pi, np.pi, size=3)
+        with_trajectory = step % 2 == 0
+        target_vel = rng.normal(size=3) if with_trajectory else None
+        target_acc = rng.normal(size=3) if with_trajectory else None
+        multiplier = 0.5 if step % 5 == 0 else 1.0
+        controller.set_speed_multiplier(multiplier)
+        batch.speed_multiplier = multiplier
+
+        expected_force, expected_torque = reference_compute_control(
+            position_pid, attitude_pid, pos, target, vel, attitude, dt,
+            target_vel, target_acc, multiplier
+        )
+        force, torque = controller.compute_control(pos, target, vel, attitude, dt, target_vel, target_acc)
+        assert np.allclose(force, expected_force, rtol=1e-12, atol=1e-12)
+        assert np.allclose(torque, expected_torque, rtol=1e-12, atol=1e-12)
+
+        batch_force, batch_torque = batch.compute_control(
+            pos[None], target[None], vel[None], attitude[None], dt,
+            None if target_vel is None else target_vel[None],
+            None if target_acc is None else target_acc[None]
+        )
+        assert np.allclose(batch_force[0], expected_force, rtol=1e-12, atol=1e-12)
+        assert np.allclose(batch_torque[0], expected_torque, rtol=1e-12, atol=1e-12)
@@ -0,0 +1,55 @@
+import threading
+import time
+
+import numpy as np
+
+from src.planning_service import PlanningService
+from src.route_planner import RoutePlanner
+from src.sensor import DeliveryPointStore
+
+
+def wait_for_route(service, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        route = service.poll()
+        if route is not None:
+            return route
+        if not service.busy:
+            return None
+        time.sleep(0.01)
+    raise TimeoutError("planejamento não terminou")
+
+
+def test_newer_submission_discards_superseded_result():
+    store = DeliveryPointStore.from_positions([[5.0, 0.0, 0.1], [0.0, 5.0, 0.1], [-5.0, 0.0, 0.1]])
+    points = store.views()
+    planner = RoutePlanner({'plan_cache_size': 0})
+    release = threading.Event()
+    started = threading.Event()
+    replan_route = planner.replan_route
+
+    def blocking_replan(current_pos, current_route, new_points, base_pos=None):
+        # O primeiro pedido fica preso até o segundo ter sido enviado
+        if not started.is_set():
+            started.set()
+            release.wait(5.0)
+        return replan_route(current_pos, current_route, new_points, base_pos)
+
+    planner.replan_route = blocking_replan
+    service = PlanningService(planner)
+    try:
+        base = np.zeros(3)
+        service.submit(base, [], points[:1], base)
+        assert started.wait(5.0)
+        service.submit(base, [], points, base)
+        release.set()
+
+        route = wait_for_route(service)
+        assert route is not None
+        assert {p.id for p in route} == {p.id for p in points}
+        assert service.discarded_count == 1
+        assert service.applied_generation == service.generation == 2
+        assert not service.busy
+    finally:
+        release.set()
+        service.shutdown()
@@ -0,0 +1,31 @@
+from src.replan_trigger import ReplanTrigger
+
+
+def make_trigger():
+    trigger = ReplanTrigger({'replan_debounce': 0.2, 'replan_max_staleness': 100.0, 'replan_deviation': 3.0})
+    trigger.mark_replanned(0.0)
+    return trigger
+
+
+def test_event_without_work_does_not_skip_debounce():
+    trigger = make_trigger()
+    trigger.notify('delivery', 1.0)
+    assert trigger.poll(1.0, has_work=False) is None
+    assert trigger.poll(5.0, has_work=False) is None
+
+    trigger.notify('new_detection', 5.0)
+    assert trigger.poll(5.0, has_work=True) is None
+    assert trigger.poll(5.1, has_work=True) is None
+    assert trigger.poll(5.25, has_work=True) == 'new_detection'
+
+
+def test_deviation_notifies_only_on_crossing():
+    trigger = make_trigger()
+    leg_start, leg_end = [0.0, 0.0, 0.0], [10.0, 0.0, 0.0]
+    for step in range(10):
+        assert trigger.check_deviation([2.0, 5.0, 0.0], leg_start, leg_end, 1.0 + step * 0.01)
+    assert trigger.event_count == 1
+
+    assert not trigger.check_deviation([2.0, 0.5, 0.0], leg_start, leg_end, 2.0)
+    trigger.check_deviation([2.0, 5.0, 0.0], leg_start, leg_end, 2.1)
+    assert trigger.event_count == 2